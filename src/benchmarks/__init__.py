@@ -0,0 +1,5 @@
+"""
+Benchmarks de caminhos quentes da API.
+
+Executar a partir de ``src/``, por exemplo: ``python -m benchmarks.bench_json``.
+"""
@@ -0,0 +1,35 @@
+"""
+Tempo até a primeira requisição de um worker novo e custo do django.setup() de
+um comando de cron, no perfil padrão e no enxuto (PERFIL_ENXUTO).
+
+    python -m benchmarks.bench_inicializacao [--repeticoes 7]
+"""
+import argparse
+import os
+import statistics
+
+
+def main(argv=None):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+    from common.inicializacao import medir_inicializacao
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeticoes', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    print(f"{'alvo':>10} | {'padrão (ms)':>11} | {'enxuto (ms)':>11} | {'ganho':>6}")
+    for alvo in ('setup', 'wsgi', 'requisicao'):
+        medianas = []
+        for enxuto in (False, True):
+            # Processo novo a cada repetição; mediana contra o ruído do disco e do SO
+            tempos = [medir_inicializacao(alvo, enxuto, importtime=False)[0] for _ in range(args.repeticoes)]
+            medianas.append(statistics.median(tempos) * 1000)
+        padrao, enxuto = medianas
+        print(f'{alvo:>10} | {padrao:>11.0f} | {enxuto:>11.0f} | {1 - enxuto / padrao:>6.1%}')
+
+
+if __name__ == '__main__':
+    main()
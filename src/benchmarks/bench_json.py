@@ -0,0 +1,51 @@
+"""
+Compara o JSONRenderer/JSONParser padrão do DRF com os baseados em orjson usando
+payloads do PedidoDetailSerializer.
+
+    python -m benchmarks.bench_json [--repeticoes 200]
+"""
+import argparse
+import io
+import os
+import timeit
+
+
+def _medir(funcao, repeticoes):
+    tempos = timeit.repeat(funcao, number=repeticoes, repeat=5)
+    return min(tempos) / repeticoes * 1_000_000
+
+
+def main(argv=None):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from common.parsers import ORJSONParser
+    from common.renderers import ORJSONRenderer
+    from pedidos.serializers import PedidoDetailSerializer
+    from .payloads import pedido_em_memoria
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(f"{'itens':>6} | {'bytes':>7} | {'render std (µs)':>15} | {'render orjson':>13} | "
+          f"{'parse std (µs)':>14} | {'parse orjson':>12}")
+    for quantidade in (1, 10, 50, 200):
+        dados = PedidoDetailSerializer(pedido_em_memoria(quantidade, quantidade_historico=quantidade)).data
+        conteudo = JSONRenderer().render(dados)
+        assert ORJSONRenderer().render(dados) == conteudo
+
+        render_std = _medir(lambda: JSONRenderer().render(dados), args.repeticoes)
+        render_orjson = _medir(lambda: ORJSONRenderer().render(dados), args.repeticoes)
+        parse_std = _medir(lambda: JSONParser().parse(io.BytesIO(conteudo)), args.repeticoes)
+        parse_orjson = _medir(lambda: ORJSONParser().parse(io.BytesIO(conteudo)), args.repeticoes)
+
+        print(f'{quantidade:>6} | {len(conteudo):>7} | {render_std:>15.1f} | {render_orjson:>13.1f} | '
+              f'{parse_std:>14.1f} | {parse_orjson:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
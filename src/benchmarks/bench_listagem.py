@@ -0,0 +1,81 @@
+"""
+Compara, por página, o caminho do ModelSerializer com a projeção values_list()
+(common.serializers.ProjecaoSerializer) nas listagens de pedidos, produtos e
+clientes. Mede tempo de CPU e pico de memória (tracemalloc). Cria e destrói um
+banco de teste.
+
+    python -m benchmarks.bench_listagem [--repeticoes 20]
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+
+def _medir(funcao, repeticoes):
+    funcao()
+    inicio = time.process_time()
+    for _ in range(repeticoes):
+        funcao()
+    cpu = (time.process_time() - inicio) / repeticoes * 1000
+
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, pico / 1024
+
+
+def main(argv=None):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+    from clientes.views import ClienteViewSet
+    from common.query_plan_scenarios import popular_base
+    from common.serializers import projecao_para
+    from pedidos.serializers import PedidoListSerializer
+    from pedidos.views import PedidoViewSet
+    from produtos.views import ProdutoViewSet
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    listagens = [
+        ('pedidos', PedidoViewSet.queryset.order_by('-created_at'), PedidoListSerializer),
+        ('produtos', ProdutoViewSet.queryset.order_by('-created_at'), ProdutoViewSet.serializer_class),
+        ('clientes', ClienteViewSet.queryset.order_by('-created_at'), ClienteViewSet.serializer_class),
+    ]
+
+    nome_original = connection.settings_dict['NAME']
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        popular_base(quantidade_clientes=500, quantidade_produtos=500, quantidade_pedidos=500)
+
+        print(f"{'listagem':<10} | {'página':>6} | {'CPU serializer (ms)':>19} | {'CPU projeção':>12} | "
+              f"{'mem serializer (KiB)':>20} | {'mem projeção':>12}")
+        for nome, queryset, serializer_class in listagens:
+            projecao = projecao_para(serializer_class)
+            for tamanho in (10, 100, 500):
+                def via_serializer():
+                    return serializer_class(list(queryset.all()[:tamanho]), many=True).data
+
+                def via_projecao():
+                    return projecao.serializar(projecao.projetar(queryset.all())[:tamanho])
+
+                assert via_serializer() == via_projecao()
+                cpu_serializer, mem_serializer = _medir(via_serializer, args.repeticoes)
+                cpu_projecao, mem_projecao = _medir(via_projecao, args.repeticoes)
+                print(f'{nome:<10} | {tamanho:>6} | {cpu_serializer:>19.2f} | {cpu_projecao:>12.2f} | '
+                      f'{mem_serializer:>20.1f} | {mem_projecao:>12.1f}')
+    finally:
+        connection.creation.destroy_test_db(nome_original, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == '__main__':
+    main()
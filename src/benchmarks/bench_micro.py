@@ -0,0 +1,230 @@
+"""
+Microbenchmarks dos caminhos quentes do domínio de pedidos: serviços de criação
+e cancelamento, máquina de estados, serializers e geração de número.
+
+Cada caso roda em `--rodadas` rodadas de `numero` execuções (calibrado para a
+rodada durar ao menos `--tempo-minimo` s); o relatório traz mínimo, mediana,
+média, desvio e IQR por execução. Usa benchmarks.settings (SQLite em memória).
+
+    python -m benchmarks.bench_micro [--casos criar_pedido] [--json atual.json]
+    python -m benchmarks.bench_micro --baseline atual.json [--tolerancia 0.10]
+
+Com --baseline, compara a mediana de cada caso com a gravada e sai com código 1
+se alguma piorar além da tolerância.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from itertools import count
+
+
+class Caso:
+    """
+    `preparar(numero)` roda fora da medição e devolve a função medida, chamada
+    `numero` vezes na rodada (p.ex. cria os pedidos que a rodada vai cancelar).
+    """
+
+    def __init__(self, nome, preparar):
+        self.nome = nome
+        self.preparar = preparar
+
+
+def _medir_rodada(caso, numero):
+    funcao = caso.preparar(numero)
+    inicio = time.perf_counter()
+    for _ in range(numero):
+        funcao()
+    return time.perf_counter() - inicio
+
+
+def calibrar(caso, tempo_minimo, maximo=1_000_000):
+    """Execuções por rodada para a rodada durar ao menos `tempo_minimo` s."""
+    numero = 1
+    while numero < maximo:
+        duracao = _medir_rodada(caso, numero)
+        if duracao >= tempo_minimo:
+            break
+        # Cresce até 10x por passo, mirando um pouco acima do mínimo
+        numero = min(maximo, numero * 10, max(numero + 1, int(numero * tempo_minimo * 1.2 / max(duracao, 1e-9))))
+    return numero
+
+
+def estatisticas(tempos_us):
+    quartis = statistics.quantiles(tempos_us, n=4) if len(tempos_us) > 1 else [tempos_us[0]] * 3
+    return {
+        'min_us': min(tempos_us),
+        'mediana_us': statistics.median(tempos_us),
+        'media_us': statistics.fmean(tempos_us),
+        'desvio_us': statistics.stdev(tempos_us) if len(tempos_us) > 1 else 0.0,
+        'iqr_us': quartis[2] - quartis[0],
+    }
+
+
+def executar_casos(casos, rodadas=10, tempo_minimo=0.2):
+    """{nome: estatísticas em µs por execução} de cada caso, com uma rodada de aquecimento."""
+    resultados = {}
+    for caso in casos:
+        numero = calibrar(caso, tempo_minimo)
+        _medir_rodada(caso, numero)
+        tempos = [_medir_rodada(caso, numero) / numero * 1_000_000 for _ in range(rodadas)]
+        resultados[caso.nome] = {'rodadas': rodadas, 'numero': numero, **estatisticas(tempos)}
+    return resultados
+
+
+def comparar_com_baseline(resultados, baseline, tolerancia):
+    """[(caso, mediana_baseline, mediana_atual, variação, regrediu)] dos casos presentes nos dois."""
+    comparacao = []
+    for nome, atual in resultados.items():
+        anterior = baseline.get(nome)
+        if anterior is None:
+            continue
+        variacao = atual['mediana_us'] / anterior['mediana_us'] - 1
+        comparacao.append((nome, anterior['mediana_us'], atual['mediana_us'], variacao, variacao > tolerancia))
+    return comparacao
+
+
+def casos_padrao():
+    """Casos do domínio de pedidos; precisam do banco de teste criado."""
+    from decimal import Decimal
+
+    from clientes.models import Cliente
+    from pedidos.models import Pedido
+    from pedidos.serializers import PedidoDetailSerializer, PedidoListSerializer
+    from pedidos.services import CancelarPedidoService, CriarPedidoService
+    from pedidos.state_machine import PedidoStateMachine, StatusPedido, TransicaoInvalidaError
+    from produtos.models import Produto
+    from .payloads import pedido_em_memoria
+
+    cliente = Cliente.objects.create(
+        nome='Cliente Benchmark', cpf_cnpj='12345678000199', email='bench@teste.com', ativo=True,
+    )
+    # Estoque que nenhuma rodada esgota: a criação nunca falha por estoque
+    produtos = [
+        Produto.objects.create(sku=f'BENCH-{i:03d}', nome=f'Produto {i}', preco=Decimal('19.90'), quantidade_estoque=10**9)
+        for i in range(100)
+    ]
+    chaves = count()
+
+    def criar_pedido(quantidade_itens):
+        itens = [{'produto_id': produto.id, 'quantidade': 1} for produto in produtos[:quantidade_itens]]
+        servico = CriarPedidoService()
+
+        def preparar(numero):
+            return lambda: servico.executar(cliente.id, itens, f'bench-{next(chaves)}')
+        return preparar
+
+    def cancelar_pedido(numero):
+        servico_criar, servico = CriarPedidoService(), CancelarPedidoService()
+        itens = [{'produto_id': produto.id, 'quantidade': 1} for produto in produtos[:3]]
+        pendentes = iter([
+            servico_criar.executar(cliente.id, itens, f'bench-{next(chaves)}')[0].id for _ in range(numero)
+        ])
+        return lambda: servico.executar(next(pendentes), cancelado_por='bench')
+
+    def validar_transicao(numero):
+        maquina = PedidoStateMachine(StatusPedido.PENDENTE)
+        return lambda: maquina.validar(StatusPedido.CONFIRMADO)
+
+    def validar_transicao_invalida(numero):
+        maquina = PedidoStateMachine(StatusPedido.ENTREGUE)
+
+        def validar():
+            try:
+                maquina.validar(StatusPedido.PENDENTE)
+            except TransicaoInvalidaError:
+                pass
+        return validar
+
+    def construir_transicao_invalida(numero):
+        permitidas = [StatusPedido.EM_PROCESSAMENTO, StatusPedido.CANCELADO]
+        return lambda: TransicaoInvalidaError(StatusPedido.CONFIRMADO, StatusPedido.ENTREGUE, permitidas)
+
+    def serializar_detalhe(quantidade_itens):
+        pedido = pedido_em_memoria(quantidade_itens, quantidade_historico=5)
+        return lambda numero: lambda: PedidoDetailSerializer(pedido).data
+
+    def serializar_listagem(numero):
+        pedidos = [pedido_em_memoria(0, 0, pedido_id=i + 1) for i in range(50)]
+        return lambda: PedidoListSerializer(pedidos, many=True).data
+
+    def gerar_numero(numero):
+        return Pedido()._gerar_numero
+
+    return [
+        Caso('criar_pedido[1]', criar_pedido(1)),
+        Caso('criar_pedido[10]', criar_pedido(10)),
+        Caso('criar_pedido[100]', criar_pedido(100)),
+        Caso('cancelar_pedido', cancelar_pedido),
+        Caso('state_machine.validar', validar_transicao),
+        Caso('state_machine.validar_invalida', validar_transicao_invalida),
+        Caso('TransicaoInvalidaError', construir_transicao_invalida),
+        Caso('PedidoDetailSerializer[20]', serializar_detalhe(20)),
+        Caso('PedidoDetailSerializer[100]', serializar_detalhe(100)),
+        Caso('PedidoListSerializer[50]', serializar_listagem),
+        Caso('Pedido._gerar_numero', gerar_numero),
+    ]
+
+
+def main(argv=None):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--casos', nargs='*', help='Prefixos dos casos a rodar (padrão: todos)')
+    parser.add_argument('--rodadas', type=int, default=10)
+    parser.add_argument('--tempo-minimo', type=float, default=0.2, help='Duração mínima (s) de cada rodada')
+    parser.add_argument('--json', help='Grava os resultados neste arquivo (serve de baseline depois)')
+    parser.add_argument('--baseline', help='Resultados de uma execução anterior (--json) para comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.10, help='Piora aceitável da mediana (0.10 = 10%%)')
+    args = parser.parse_args(argv)
+
+    nome_original = connection.settings_dict['NAME']
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        casos = [
+            caso for caso in casos_padrao()
+            if not args.casos or any(caso.nome.startswith(prefixo) for prefixo in args.casos)
+        ]
+        resultados = executar_casos(casos, args.rodadas, args.tempo_minimo)
+    finally:
+        connection.creation.destroy_test_db(nome_original, verbosity=0)
+        teardown_test_environment()
+
+    print(f"{'caso':<32} | {'execuções':>9} | {'mín (µs)':>10} | {'mediana':>10} | {'média':>10} | "
+          f"{'desvio':>8} | {'IQR':>8}")
+    for nome, r in resultados.items():
+        print(f"{nome:<32} | {r['numero']:>9} | {r['min_us']:>10.1f} | {r['mediana_us']:>10.1f} | "
+              f"{r['media_us']:>10.1f} | {r['desvio_us']:>8.1f} | {r['iqr_us']:>8.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as arquivo:
+            json.dump({
+                'ambiente': {
+                    'python': platform.python_version(), 'django': django.get_version(),
+                    'plataforma': platform.platform(), 'banco': connection.vendor,
+                },
+                'resultados': resultados,
+            }, arquivo, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline) as arquivo:
+            baseline = json.load(arquivo)['resultados']
+        comparacao = comparar_com_baseline(resultados, baseline, args.tolerancia)
+        print(f"\n{'caso':<32} | {'baseline (µs)':>13} | {'atual':>10} | {'variação':>8}")
+        for nome, anterior, atual, variacao, regrediu in comparacao:
+            print(f"{nome:<32} | {anterior:>13.1f} | {atual:>10.1f} | {variacao:>+8.1%}{'  REGRESSÃO' if regrediu else ''}")
+        if any(regrediu for *_, regrediu in comparacao):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
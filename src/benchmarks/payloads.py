@@ -0,0 +1,42 @@
+"""
+Objetos de domínio montados em memória (sem banco) para benchmarks e testes de
+serialização.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+from clientes.models import Cliente
+from pedidos.models import Pedido, ItemPedido, HistoricoStatusPedido, StatusPedido
+from produtos.models import Produto
+
+
+def pedido_em_memoria(quantidade_itens=20, quantidade_historico=5, pedido_id=1):
+    """Pedido com itens e histórico pré-carregados, pronto para o PedidoDetailSerializer."""
+    criado_em = datetime(2026, 3, 14, 10, 30, 15, 123456, tzinfo=ZoneInfo('America/Sao_Paulo'))
+    cliente = Cliente(id=1, nome='Cliente Benchmark Ltda.', cpf_cnpj='12345678000199', email='bench@teste.com')
+    pedido = Pedido(
+        id=pedido_id, numero=f'PED-20260314103015-{pedido_id:06X}', cliente=cliente, status=StatusPedido.CONFIRMADO,
+        valor_total=Decimal('0.00'), observacoes='Entregar no período da manhã — portão 2',
+        chave_idempotencia=f'bench-{pedido_id}', created_at=criado_em, updated_at=criado_em + timedelta(minutes=5),
+    )
+
+    itens = []
+    for i in range(quantidade_itens):
+        produto = Produto(id=i + 1, sku=f'BENCH-{i:05d}', nome=f'Produto Benchmark {i} ção', preco=Decimal('19.90') + i)
+        itens.append(ItemPedido(
+            id=i + 1, pedido=pedido, produto=produto, quantidade=i % 5 + 1, preco_unitario=produto.preco,
+            subtotal=produto.preco * (i % 5 + 1),
+        ))
+    pedido.valor_total = sum((item.subtotal for item in itens), Decimal('0.00'))
+
+    historico = [
+        HistoricoStatusPedido(
+            id=i + 1, pedido=pedido, status_anterior=StatusPedido.PENDENTE, status_novo=StatusPedido.CONFIRMADO,
+            alterado_por='sistema', created_at=criado_em + timedelta(seconds=i),
+        )
+        for i in range(quantidade_historico)
+    ]
+
+    pedido._prefetched_objects_cache = {'itens': itens, 'historico_status': historico}
+    return pedido
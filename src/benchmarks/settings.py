@@ -0,0 +1,14 @@
+"""
+Settings dos microbenchmarks (benchmarks.bench_micro): os de teste com SQLite em
+memória no lugar do MySQL, para rodar em qualquer máquina sem serviços externos.
+Os números servem para comparar versões do código entre si, não com produção.
+"""
+from config.settings_test import *  # noqa: F401,F403
+
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
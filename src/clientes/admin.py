@@ -1,10 +1,13 @@
 from django.contrib import admin
+
+from common.admin import AdminGrandeVolumeMixin
 from .models import Cliente
 
 
 @admin.register(Cliente)
-class ClienteAdmin(admin.ModelAdmin):
+class ClienteAdmin(AdminGrandeVolumeMixin, admin.ModelAdmin):
     list_display = ['id', 'nome', 'cpf_cnpj', 'email', 'telefone', 'ativo', 'created_at']
     list_filter = ['ativo', 'created_at']
-    search_fields = ['nome', 'cpf_cnpj', 'email']
+    # Também usada pelo autocomplete de cliente em PedidoAdmin
+    search_fields = ['^nome', '=cpf_cnpj', '=email']
     ordering = ['-created_at']
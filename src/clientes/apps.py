@@ -5,3 +5,7 @@ class ClientesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'clientes'
     verbose_name = 'Clientes'
+
+    def ready(self):
+        from common.contagens import registrar_invalidacao_de_contagens
+        registrar_invalidacao_de_contagens(self.get_model('Cliente'))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from clientes.services import ImportarClientesService
+from common.comandos import ComandoEnxutoMixin
+from common.importacao import FormatoImportacaoInvalidoError, formato_pela_extensao, ler_registros
+
+
+class Command(ComandoEnxutoMixin, BaseCommand):
+    help = (
+        'Importa clientes de um arquivo CSV (com cabeçalho) ou NDJSON, lido em lotes. '
+        'Linhas rejeitadas vão para stderr com o motivo; as válidas são gravadas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo')
+        parser.add_argument(
+            '--formato', choices=['csv', 'ndjson'],
+            help='Padrão: pela extensão do arquivo (.csv, .ndjson/.jsonl)',
+        )
+        parser.add_argument('--lote', type=int, help='Linhas por lote (padrão: CLIENTES_IMPORTACAO_LOTE)')
+
+    def handle(self, *args, **options):
+        formato = options['formato'] or formato_pela_extensao(options['arquivo'])
+        if formato is None:
+            raise CommandError('Informe --formato (csv ou ndjson): extensão do arquivo não reconhecida')
+
+        def ao_rejeitar(linha, erros):
+            for campo, mensagens in erros.items():
+                self.stderr.write(f'linha {linha}: {campo}: {" ".join(mensagens)}')
+
+        try:
+            with open(options['arquivo'], 'rb') as arquivo:
+                resultado = ImportarClientesService(options['lote']).executar(
+                    ler_registros(arquivo, formato), ao_rejeitar=ao_rejeitar,
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except FormatoImportacaoInvalidoError as exc:
+            raise CommandError(f'{exc} ({exc.resultado["importados"]} cliente(s) importado(s) antes do erro)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado["importados"]} cliente(s) importado(s), {resultado["rejeitados"]} linha(s) rejeitada(s)'
+        ))
+
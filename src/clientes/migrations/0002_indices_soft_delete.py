@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clientes", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="cliente",
+            name="idx_cliente_nome_ativo",
+        ),
+        migrations.RemoveIndex(
+            model_name="cliente",
+            name="idx_cliente_email_ativo",
+        ),
+        migrations.AddIndex(
+            model_name="cliente",
+            index=models.Index(
+                fields=["deleted_at", "created_at"], name="idx_cliente_deleted_created"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cliente",
+            index=models.Index(
+                fields=["deleted_at", "nome"], name="idx_cliente_deleted_nome"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cliente",
+            index=models.Index(
+                fields=["ativo", "deleted_at", "created_at"],
+                name="idx_cliente_ativo_created",
+            ),
+        ),
+    ]
@@ -25,9 +25,12 @@ class Cliente(TimestampMixin, SoftDeleteMixin):
         verbose_name = 'Cliente'
         verbose_name_plural = 'Clientes'
         ordering = ['-created_at']
+        # Compostos alinhados ao filtro deleted_at IS NULL do ClienteManager. Buscas por
+        # e-mail e CPF/CNPJ usam os índices únicos.
         indexes = [
-            models.Index(fields=['nome', 'ativo'], name='idx_cliente_nome_ativo'),
-            models.Index(fields=['email', 'ativo'], name='idx_cliente_email_ativo'),
+            models.Index(fields=['deleted_at', 'created_at'], name='idx_cliente_deleted_created'),
+            models.Index(fields=['deleted_at', 'nome'], name='idx_cliente_deleted_nome'),
+            models.Index(fields=['ativo', 'deleted_at', 'created_at'], name='idx_cliente_ativo_created'),
         ]
     
     def __str__(self):
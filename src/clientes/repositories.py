@@ -0,0 +1,15 @@
+from .models import Cliente
+
+
+class ClienteRepository:
+    def documentos_e_emails_existentes(self, cpfs_cnpjs, emails):
+        """
+        CPFs/CNPJs e e-mails do lote que já estão cadastrados, em duas consultas
+        pelos índices únicos. Inclui soft-deleted: a unicidade vale para eles também.
+        """
+        cpfs = set(Cliente.all_objects.filter(cpf_cnpj__in=cpfs_cnpjs).values_list('cpf_cnpj', flat=True))
+        existentes = set(Cliente.all_objects.filter(email__in=emails).values_list('email', flat=True))
+        return cpfs, existentes
+
+    def criar_em_lote(self, clientes, tamanho_lote):
+        return Cliente.objects.bulk_create(clientes, batch_size=tamanho_lote)
@@ -11,3 +11,13 @@ class ClienteSerializer(serializers.ModelSerializer):
 
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+
+class ClienteImportacaoSerializer(ClienteSerializer):
+    """
+    Validação por linha da importação em lote. A unicidade de CPF/CNPJ e e-mail
+    sai dos validators de campo (uma consulta por linha) e é checada por lote
+    em ImportarClientesService.
+    """
+
+    class Meta(ClienteSerializer.Meta):
+        extra_kwargs = {'cpf_cnpj': {'validators': []}, 'email': {'validators': []}}
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from common.importacao import FormatoImportacaoInvalidoError, em_lotes, mensagens_de_erro, registrar_rejeicoes
+from common.contagens import invalidar_contagens
+from .models import Cliente
+from .repositories import ClienteRepository
+from .serializers import ClienteImportacaoSerializer
+
+
+class ImportarClientesService:
+    """
+    Importa clientes lidos por common.importacao, `CLIENTES_IMPORTACAO_LOTE` por vez:
+    validação de campos por linha, unicidade de CPF/CNPJ e e-mail em duas consultas
+    por lote e um bulk_create. A memória depende do lote, não do tamanho do arquivo.
+
+    Cada lote é uma transação; se a leitura falhar no meio do arquivo, os lotes
+    anteriores continuam gravados (o resultado parcial vai em `exc.resultado`).
+    """
+
+    def __init__(self, tamanho_lote=None):
+        self.repository = ClienteRepository()
+        self.tamanho_lote = tamanho_lote or settings.CLIENTES_IMPORTACAO_LOTE
+        self.max_erros = settings.CLIENTES_IMPORTACAO_MAX_ERROS
+
+    def executar(self, registros, ao_rejeitar=None):
+        """
+        `registros`: iterável de (linha, dados, erro). `ao_rejeitar(linha, erros)` é
+        chamado para toda linha rejeitada; o resultado guarda só as `max_erros` primeiras.
+        """
+        resultado = {'importados': 0, 'rejeitados': 0, 'erros': [], 'erros_omitidos': 0}
+        try:
+            for lote in em_lotes(registros, self.tamanho_lote):
+                importados, rejeicoes = self._importar_lote(lote)
+                resultado['importados'] += importados
+                registrar_rejeicoes(resultado, rejeicoes, self.max_erros, ao_rejeitar)
+        except FormatoImportacaoInvalidoError as exc:
+            exc.resultado = resultado
+            raise
+        return resultado
+
+    def _importar_lote(self, lote):
+        rejeicoes, validos = [], []
+        # Um serializer para o lote todo: montar os campos a cada linha custa mais que validá-la
+        serializer = ClienteImportacaoSerializer()
+        for linha, dados, erro in lote:
+            if erro:
+                rejeicoes.append((linha, {'non_field_errors': [erro]}))
+                continue
+            try:
+                validos.append((linha, serializer.run_validation(dados)))
+            except ValidationError as exc:
+                rejeicoes.append((linha, mensagens_de_erro(exc.detail)))
+
+        if not validos:
+            return 0, rejeicoes
+
+        for tentativa in (1, 2):
+            aceitos, duplicados = self._separar_duplicados(validos)
+            try:
+                with transaction.atomic():
+                    self.repository.criar_em_lote([Cliente(**dados) for _, dados in aceitos], self.tamanho_lote)
+                    invalidar_contagens(Cliente)
+            except IntegrityError:
+                # Outra importação ou cadastro gravou um dos documentos/e-mails entre a
+                # checagem e o INSERT: a segunda checagem já os vê e rejeita
+                if tentativa == 2:
+                    raise
+                continue
+            return len(aceitos), sorted(rejeicoes + duplicados, key=lambda rejeicao: rejeicao[0])
+
+    def _separar_duplicados(self, validos):
+        cpfs, emails = self.repository.documentos_e_emails_existentes(
+            {dados['cpf_cnpj'] for _, dados in validos}, {dados['email'] for _, dados in validos},
+        )
+        # E-mail sem distinção de maiúsculas, como a collation do MySQL no índice único
+        emails = {email.lower() for email in emails}
+        aceitos, duplicados = [], []
+        for linha, dados in validos:
+            erros = {}
+            if dados['cpf_cnpj'] in cpfs:
+                erros['cpf_cnpj'] = ['Já existe cliente com este CPF/CNPJ.']
+            if dados['email'].lower() in emails:
+                erros['email'] = ['Já existe cliente com este e-mail.']
+            if erros:
+                duplicados.append((linha, erros))
+                continue
+            # Repetidos dentro do próprio arquivo também são rejeitados
+            cpfs.add(dados['cpf_cnpj'])
+            emails.add(dados['email'].lower())
+            aceitos.append((linha, dados))
+        return aceitos, duplicados
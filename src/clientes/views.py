@@ -1,9 +1,15 @@
-from rest_framework import viewsets, mixins
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from common.importacao import FORMATOS, FormatoImportacaoInvalidoError, ler_registros
+from common.views import BuscaEmLoteMixin, ListagemCondicionalMixin, ListagemProjetadaMixin
 from .models import Cliente
 from .serializers import ClienteSerializer
+from .services import ImportarClientesService
 
 
 class ClienteViewSet(
+    BuscaEmLoteMixin, ListagemCondicionalMixin, ListagemProjetadaMixin,
     mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
 ):
     queryset = Cliente.objects.all()
@@ -14,3 +20,19 @@ class ClienteViewSet(
     ordering_fields = ['created_at', 'nome']
     ordering = ['-created_at']
 
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def importar(self, request):
+        # O corpo é lido como stream, linha a linha: request.data carregaria o arquivo inteiro
+        formato = FORMATOS.get(request.content_type.split(';')[0].strip())
+        if formato is None:
+            return Response(
+                {'error': f"Content-Type deve ser um de: {', '.join(FORMATOS)}"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+
+        try:
+            resultado = ImportarClientesService().executar(ler_registros(request.stream or [], formato))
+        except FormatoImportacaoInvalidoError as e:
+            return Response({'error': str(e), **e.resultado}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(resultado, status=status.HTTP_200_OK)
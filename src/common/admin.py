@@ -0,0 +1,11 @@
+from .pagination import PaginadorContagemLimitada
+
+
+class AdminGrandeVolumeMixin:
+    """
+    Ajustes de changelist para tabelas grandes: sem o COUNT(*) total ao filtrar/buscar
+    e com a contagem da paginação em cache, limitada e estimada acima do limite.
+    """
+    show_full_result_count = False
+    paginator = PaginadorContagemLimitada
+    list_per_page = 50
@@ -0,0 +1,17 @@
+"""
+Base dos comandos de worker/cron. Sem dependências além do settings: importar
+este módulo não carrega DRF, drf_spectacular nem subprocess.
+"""
+from django.conf import settings
+
+
+class ComandoEnxutoMixin:
+    """
+    Para comandos de worker/cron: no perfil enxuto não rodam as checagens de sistema,
+    que importariam a URLconf inteira (docs/schema) e o admin a cada execução.
+    As checagens continuam no deploy (``manage.py check --deploy``).
+    """
+
+    @property
+    def requires_system_checks(self):
+        return [] if settings.PERFIL_ENXUTO else '__all__'
@@ -0,0 +1,117 @@
+"""
+Versões por tabela: das contagens em cache (ver common.pagination) e das escritas,
+que dão os validadores das listagens (ver common.views.ListagemCondicionalMixin).
+
+Fica fora de common.pagination para os apps ligarem a invalidação no ready()
+sem importar a paginação do DRF no django.setup() de todo processo. O cache é
+opcional: com ele fora do ar as listagens contam sem cache (limitado) e as
+escritas seguem sem invalidar.
+"""
+import hashlib
+import logging
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+
+def _chave_versao(model):
+    return f'contagem:versao:{model._meta.db_table}'
+
+
+def _chave_escrita(model):
+    return f'listagem:escrita:{model._meta.db_table}'
+
+
+def _nova_escrita():
+    # Token aleatório: depois de um flush/evicção a tabela não volta a uma versão já emitida
+    return uuid.uuid4().hex, time.time()
+
+
+def versao_contagens(model):
+    """
+    Versão atual das contagens da tabela; muda a cada invalidar_contagens confirmado.
+    None com o cache indisponível: quem usa não deve ler nem gravar contagens em cache.
+    """
+    try:
+        return cache.get(_chave_versao(model), 0)
+    except Exception:
+        logger.warning('Cache indisponível; contagens de %s sem cache', model._meta.db_table, exc_info=True)
+        return None
+
+
+def invalidar_contagens(model, using=None):
+    """Descarta as contagens em cache da tabela quando a transação corrente confirmar."""
+    def incrementar():
+        chave = _chave_versao(model)
+        try:
+            cache.add(chave, 0, None)
+            try:
+                cache.incr(chave)
+            except ValueError:
+                # Expirou entre o add e o incr
+                cache.set(chave, 1, None)
+        except Exception:
+            # A escrita já foi confirmada: falha do cache não pode virar erro da requisição.
+            # As contagens antigas valem até o PAGINACAO_CONTAGEM_TTL
+            logger.warning('Cache indisponível; contagens de %s não invalidadas', model._meta.db_table,
+                           exc_info=True)
+        _gravar_escrita(model)
+    transaction.on_commit(incrementar, using=using, robust=True)
+
+
+def registrar_escrita(model, using=None):
+    """
+    Marca uma escrita na tabela quando a transação corrente confirmar (muda os validadores
+    das listagens). invalidar_contagens já marca; use em escritas que não mudam contagens.
+    """
+    transaction.on_commit(lambda: _gravar_escrita(model), using=using, robust=True)
+
+
+def _gravar_escrita(model):
+    try:
+        cache.set(_chave_escrita(model), _nova_escrita(), None)
+    except Exception:
+        logger.warning('Cache indisponível; escrita em %s não registrada', model._meta.db_table, exc_info=True)
+
+
+def validadores_de_escrita(models):
+    """
+    (versão, last_modified) das últimas escritas nas tabelas dos models, sem consultar o banco.
+    ``last_modified`` (segundos desde a época) é None enquanto a última escrita for do segundo
+    corrente: o HTTP-date não tem frações, e outra escrita no mesmo segundo não o mudaria.
+    None com o cache indisponível: a listagem segue sem validadores.
+    """
+    chaves = [_chave_escrita(model) for model in models]
+    try:
+        escritas = cache.get_many(chaves)
+        for chave in set(chaves) - escritas.keys():
+            # Sem registro (cache novo ou evicção): vale como escrita agora
+            cache.add(chave, _nova_escrita(), None)
+            escritas[chave] = cache.get(chave) or _nova_escrita()
+    except Exception:
+        logger.warning('Cache indisponível; listagem sem validadores', exc_info=True)
+        return None
+
+    versao = hashlib.md5('|'.join(escritas[chave][0] for chave in chaves).encode()).hexdigest()
+    ultima = int(max(escritas[chave][1] for chave in chaves))
+    return versao, ultima if ultima < int(time.time()) else None
+
+
+def _invalidar_ao_gravar(sender, using=None, created=False, update_fields=None, **kwargs):
+    # Só inserções, exclusões e alterações em colunas não listadas mudam contagens;
+    # save(update_fields=...) de estoque/valores não invalida, mas muda a listagem.
+    if update_fields and not set(update_fields) & {'status', 'ativo', 'deleted_at'}:
+        registrar_escrita(sender, using=using)
+        return
+    invalidar_contagens(sender, using=using)
+
+
+def registrar_invalidacao_de_contagens(model):
+    """Liga post_save/post_delete do model à invalidação das contagens em cache e ao registro de escritas."""
+    post_save.connect(_invalidar_ao_gravar, sender=model, dispatch_uid=f'contagens-save-{model._meta.label}')
+    post_delete.connect(_invalidar_ao_gravar, sender=model, dispatch_uid=f'contagens-delete-{model._meta.label}')
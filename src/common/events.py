@@ -0,0 +1,204 @@
+"""
+Emissor de eventos com buffer em memória.
+
+Os eventos entram no buffer só depois do commit (transaction.on_commit), então
+a transação que os gerou nunca espera pelo broker e eventos de transações
+desfeitas (inclusive tentativas repetidas por deadlock) não são publicados.
+Uma thread em segundo plano esvazia o buffer em lotes para o sink configurado.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DESCARTAR_NOVO = 'descartar_novo'
+DESCARTAR_ANTIGO = 'descartar_antigo'
+BLOQUEAR = 'bloquear'
+POLITICAS = (DESCARTAR_NOVO, DESCARTAR_ANTIGO, BLOQUEAR)
+
+
+def sink_log(lote):
+    """Sink padrão: registra cada evento no log."""
+    for evento in lote:
+        logger.info("Evento emitido: %s | Payload: %s", evento['evento'], evento['payload'])
+
+
+def carregar_sink(caminhos):
+    """Monta o sink a partir de caminhos separados por vírgula; cada lote vai para todos."""
+    sinks = [import_string(caminho.strip()) for caminho in caminhos.split(',') if caminho.strip()]
+    if len(sinks) == 1:
+        return sinks[0]
+
+    def sink_composto(lote):
+        for sink in sinks:
+            sink(lote)
+    return sink_composto
+
+
+class EmissorEventos:
+    def __init__(self, sink, capacidade=1000, tamanho_lote=100, intervalo_flush=1.0,
+                 politica=DESCARTAR_NOVO, timeout_bloqueio=0.1, em_segundo_plano=True):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política de backpressure inválida: {politica}. Use uma de {POLITICAS}")
+        self.sink = sink
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_flush = intervalo_flush
+        self.politica = politica
+        self.timeout_bloqueio = timeout_bloqueio
+        self.em_segundo_plano = em_segundo_plano
+        self._fila = queue.Queue(maxsize=capacidade)
+        self._parar = threading.Event()
+        self._thread = None
+        self._lock_thread = threading.Lock()
+        self._lock_metricas = threading.Lock()
+        self._metricas = {
+            'enfileirados': 0, 'entregues': 0, 'descartados': 0, 'falhas_sink': 0,
+            'latencia_ms_max': 0.0, 'latencia_ms_total': 0.0,
+        }
+
+    def _contar(self, **incrementos):
+        with self._lock_metricas:
+            for campo, valor in incrementos.items():
+                self._metricas[campo] += valor
+
+    def metricas(self):
+        with self._lock_metricas:
+            metricas = dict(self._metricas)
+        total_latencia = metricas.pop('latencia_ms_total')
+        entregues = metricas['entregues']
+        metricas['latencia_ms_media'] = round(total_latencia / entregues, 3) if entregues else 0.0
+        metricas['pendentes'] = self._fila.qsize()
+        return metricas
+
+    def iniciar(self):
+        with self._lock_thread:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._loop, name='emissor-eventos', daemon=True)
+            self._thread.start()
+
+    def enfileirar(self, evento, payload):
+        """Nunca bloqueia além de timeout_bloqueio; descarta conforme a política se o buffer estiver cheio."""
+        if self.em_segundo_plano:
+            self.iniciar()
+        item = {
+            'evento': evento, 'payload': payload, 'emitido_em': timezone.now().isoformat(),
+            '_enfileirado_em': time.monotonic(),
+        }
+        try:
+            if self.politica == BLOQUEAR:
+                self._fila.put(item, timeout=self.timeout_bloqueio)
+            else:
+                self._fila.put_nowait(item)
+        except queue.Full:
+            if self.politica != DESCARTAR_ANTIGO:
+                self._descartar(item)
+                return False
+            try:
+                self._descartar(self._fila.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                self._fila.put_nowait(item)
+            except queue.Full:
+                self._descartar(item)
+                return False
+        self._contar(enfileirados=1)
+        return True
+
+    def _descartar(self, item):
+        self._contar(descartados=1)
+        logger.warning('Buffer de eventos cheio; evento %s descartado', item['evento'])
+
+    def _coletar_lote(self, espera):
+        lote = []
+        try:
+            lote.append(self._fila.get(timeout=espera))
+        except queue.Empty:
+            return lote
+        while len(lote) < self.tamanho_lote:
+            try:
+                lote.append(self._fila.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _entregar(self, lote):
+        agora = time.monotonic()
+        latencias = [(agora - item.pop('_enfileirado_em')) * 1000 for item in lote]
+        try:
+            self.sink(lote)
+        except Exception:
+            self._contar(falhas_sink=1, descartados=len(lote))
+            logger.exception('Falha no sink de eventos; %d evento(s) descartado(s)', len(lote))
+            return
+        with self._lock_metricas:
+            self._metricas['entregues'] += len(lote)
+            self._metricas['latencia_ms_total'] += sum(latencias)
+            self._metricas['latencia_ms_max'] = max(self._metricas['latencia_ms_max'], *latencias)
+
+    def _loop(self):
+        while not self._parar.is_set():
+            lote = self._coletar_lote(self.intervalo_flush)
+            if lote:
+                self._entregar(lote)
+                # Sinks que usam o banco abrem conexões próprias desta thread, ociosas
+                # entre lotes; só aqui, nunca na thread de uma requisição
+                close_old_connections()
+
+    def flush(self):
+        """Entrega tudo o que está no buffer na thread atual."""
+        while True:
+            lote = self._coletar_lote(0)
+            if not lote:
+                return
+            self._entregar(lote)
+
+    def encerrar(self, timeout=5.0):
+        """Para a thread e entrega o restante do buffer (chamado no shutdown do processo)."""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+
+_emissor = None
+_lock_emissor = threading.Lock()
+
+
+def obter_emissor():
+    global _emissor
+    if _emissor is None:
+        with _lock_emissor:
+            if _emissor is None:
+                _emissor = EmissorEventos(
+                    sink=carregar_sink(settings.EVENTOS_SINK),
+                    capacidade=settings.EVENTOS_BUFFER,
+                    tamanho_lote=settings.EVENTOS_LOTE,
+                    intervalo_flush=settings.EVENTOS_INTERVALO_FLUSH,
+                    politica=settings.EVENTOS_BACKPRESSURE,
+                )
+                atexit.register(_emissor.encerrar)
+    return _emissor
+
+
+def publicar_apos_commit(evento, payload, using=None):
+    """Agenda o evento para o buffer quando a transação corrente confirmar (imediato fora de transação)."""
+    if not settings.EVENTOS_ASSINCRONOS:
+        transaction.on_commit(
+            lambda: carregar_sink(settings.EVENTOS_SINK)([
+                {'evento': evento, 'payload': payload, 'emitido_em': timezone.now().isoformat()}
+            ]),
+            using=using,
+        )
+        return
+    transaction.on_commit(lambda: obter_emissor().enfileirar(evento, payload), using=using)
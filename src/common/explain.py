@@ -0,0 +1,26 @@
+"""
+Utilitários para inspecionar o plano de execução (EXPLAIN) das consultas do ORM.
+"""
+from django.db import connections
+
+
+def explicar_sql(sql, params=None, using='default'):
+    """Executa EXPLAIN sobre o SQL informado e retorna as linhas do plano como dicts."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'EXPLAIN {sql}', params)
+        colunas = [coluna[0] for coluna in cursor.description]
+        return [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+
+
+def explicar_queryset(queryset):
+    """Executa EXPLAIN sobre o SQL gerado por um queryset."""
+    sql, params = queryset.query.sql_with_params()
+    return explicar_sql(sql, params, using=queryset.db)
+
+
+def indices_usados(queryset):
+    """Retorna um dict {tabela: índice escolhido} a partir do plano (MySQL)."""
+    return {
+        linha['table']: linha['key']
+        for linha in explicar_queryset(queryset)
+    }
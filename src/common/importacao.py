@@ -0,0 +1,100 @@
+"""
+Leitura incremental dos arquivos de importação em lote (clientes, catálogo de produtos).
+
+Os leitores recebem um iterável de linhas em bytes (arquivo aberto em modo
+binário ou o stream da requisição) e produzem (linha, dados, erro) um registro
+por vez, sem carregar o arquivo inteiro. `erro` é preenchido quando a linha
+não pôde ser interpretada; nesse caso `dados` é None.
+"""
+import csv
+import json
+import os
+from itertools import islice
+
+FORMATOS = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+
+
+class FormatoImportacaoInvalidoError(Exception):
+    pass
+
+
+def _decodificar(linhas):
+    for linha in linhas:
+        # utf-8-sig: planilhas exportadas costumam começar com BOM
+        yield linha.decode('utf-8-sig') if isinstance(linha, bytes) else linha
+
+
+def ler_csv(linhas):
+    """CSV com cabeçalho; colunas vazias ficam de fora (valem os padrões do model)."""
+    leitor = csv.DictReader(_decodificar(linhas))
+    try:
+        for registro in leitor:
+            if None in registro:
+                yield leitor.line_num, None, 'Mais colunas que o cabeçalho'
+                continue
+            yield leitor.line_num, {campo: valor for campo, valor in registro.items() if valor not in ('', None)}, None
+    except (csv.Error, UnicodeDecodeError) as exc:
+        raise FormatoImportacaoInvalidoError(f'CSV inválido na linha {leitor.line_num}: {exc}')
+
+
+def ler_ndjson(linhas):
+    """Um objeto JSON por linha; linhas em branco são ignoradas."""
+    numero = 0
+    try:
+        for numero, linha in enumerate(_decodificar(linhas), start=1):
+            if not linha.strip():
+                continue
+            try:
+                registro = json.loads(linha)
+            except ValueError as exc:
+                yield numero, None, f'JSON inválido: {exc}'
+                continue
+            if not isinstance(registro, dict):
+                yield numero, None, 'Cada linha deve ser um objeto JSON'
+                continue
+            yield numero, registro, None
+    except UnicodeDecodeError as exc:
+        raise FormatoImportacaoInvalidoError(f'Codificação inválida após a linha {numero} (use UTF-8): {exc}')
+
+
+def ler_registros(linhas, formato):
+    if formato == 'csv':
+        return ler_csv(linhas)
+    if formato == 'ndjson':
+        return ler_ndjson(linhas)
+    raise FormatoImportacaoInvalidoError(f"Formato '{formato}' não suportado (use csv ou ndjson)")
+
+
+def formato_pela_extensao(caminho):
+    """'csv' ou 'ndjson' pela extensão do arquivo; None se não reconhecida."""
+    return {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}.get(os.path.splitext(caminho)[1].lower())
+
+
+def em_lotes(registros, tamanho):
+    registros = iter(registros)
+    while lote := list(islice(registros, tamanho)):
+        yield lote
+
+
+def mensagens_de_erro(erros):
+    """ValidationError.detail do DRF como dict de listas de str."""
+    return {campo: [str(mensagem) for mensagem in mensagens] for campo, mensagens in erros.items()}
+
+
+def registrar_rejeicoes(resultado, rejeicoes, max_erros, ao_rejeitar=None):
+    """
+    Acumula (linha, erros) em `resultado`: conta todas em `rejeitados`, guarda as
+    `max_erros` primeiras em `erros` e só conta as demais em `erros_omitidos`.
+    """
+    resultado['rejeitados'] += len(rejeicoes)
+    for linha, erros in rejeicoes:
+        if ao_rejeitar:
+            ao_rejeitar(linha, erros)
+        if len(resultado['erros']) < max_erros:
+            resultado['erros'].append({'linha': linha, 'erros': erros})
+        else:
+            resultado['erros_omitidos'] += 1
@@ -0,0 +1,95 @@
+"""
+Tempo de inicialização dos processos (workers do gunicorn, manage.py, cron).
+
+As medições rodam em um processo novo: no processo corrente tudo já foi
+importado. `medir_inicializacao` executa um dos ALVOS com ``-X importtime`` e
+devolve o tempo por módulo; o comando relatorio_inicializacao e o benchmark
+benchmarks.bench_inicializacao usam estas funções.
+
+O perfil enxuto (PERFIL_ENXUTO) adia admin e docs/schema até o primeiro uso
+(ver config.urls e common.schemas.AutoSchemaAdiado) e tira as checagens de
+sistema dos comandos de worker/cron (common.comandos.ComandoEnxutoMixin).
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+
+_PRIMEIRA_REQUISICAO = '''
+from config.wsgi import application
+from io import BytesIO
+status = []
+corpo = application({
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': '/health/live', 'QUERY_STRING': '', 'SERVER_NAME': 'localhost',
+    'SERVER_PORT': '80', 'wsgi.input': BytesIO(), 'wsgi.url_scheme': 'http', 'wsgi.errors': __import__('sys').stderr,
+}, lambda codigo, cabecalhos: status.append(codigo))
+b''.join(corpo)
+assert status[0].startswith('200'), status
+'''
+
+ALVOS = {
+    # django.setup(): o que todo manage.py e comando de cron paga
+    'setup': 'import django; django.setup()',
+    # Aplicação WSGI carregada pelo worker do gunicorn, antes da primeira requisição
+    'wsgi': 'from config.wsgi import application',
+    # Primeira requisição servida: carrega URLconf, middlewares e a view
+    'requisicao': _PRIMEIRA_REQUISICAO,
+}
+
+_LINHA_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+
+class MedicaoInicializacaoError(Exception):
+    pass
+
+
+def analisar_importtime(texto):
+    """
+    Linhas do ``python -X importtime`` como (módulo, próprio_us, acumulado_us, profundidade).
+    Módulos carregados via importlib (import_string, autodiscover) não aparecem, só o que importam.
+    """
+    modulos = []
+    for linha in texto.splitlines():
+        casamento = _LINHA_IMPORTTIME.match(linha)
+        if casamento:
+            proprio, acumulado, recuo, modulo = casamento.groups()
+            modulos.append((modulo, int(proprio), int(acumulado), len(recuo) // 2))
+    return modulos
+
+
+def agrupar_por_pacote(modulos):
+    """Tempo próprio (µs) somado por pacote de topo (django, rest_framework, pedidos...)."""
+    totais = Counter()
+    for modulo, proprio, _, _ in modulos:
+        totais[modulo.split('.')[0]] += proprio
+    return totais
+
+
+def ambiente_do_perfil(enxuto):
+    """Variáveis de ambiente do processo filho: mesmo settings e sys.path, perfil escolhido."""
+    ambiente = dict(os.environ)
+    ambiente['DJANGO_SETTINGS_MODULE'] = os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')
+    ambiente['PYTHONPATH'] = os.pathsep.join(caminho for caminho in sys.path if caminho)
+    ambiente['PERFIL_ENXUTO'] = 'true' if enxuto else 'false'
+    return ambiente
+
+
+def medir_inicializacao(alvo, enxuto=False, importtime=True):
+    """
+    Executa ALVOS[alvo] em um processo novo. Retorna (segundos de parede, módulos),
+    com módulos vazio quando importtime=False (o -X importtime tem custo próprio).
+    """
+    comando = [sys.executable, *(['-X', 'importtime'] if importtime else []), '-c', ALVOS[alvo]]
+    inicio = time.perf_counter()
+    processo = subprocess.run(
+        comando, cwd=settings.BASE_DIR, env=ambiente_do_perfil(enxuto), capture_output=True, text=True,
+    )
+    duracao = time.perf_counter() - inicio
+    if processo.returncode != 0:
+        erros = [linha for linha in processo.stderr.splitlines() if not linha.startswith('import time:')]
+        raise MedicaoInicializacaoError(f"Alvo '{alvo}' falhou:\n" + '\n'.join(erros[-20:]))
+    return duracao, analisar_importtime(processo.stderr) if importtime else []
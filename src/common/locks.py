@@ -0,0 +1,75 @@
+"""
+Modos de aquisição de lock de linha (SELECT ... FOR UPDATE) por operação.
+
+- nowait: falha imediatamente se a linha estiver com lock (FOR UPDATE NOWAIT);
+- timeout: espera no máximo LOCK_WAIT_TIMEOUT segundos (innodb_lock_wait_timeout
+  da sessão, ajustado só durante o SELECT de lock e restaurado em seguida);
+- bloqueante: comportamento padrão do servidor.
+
+A contenção vira LockIndisponivelError, que as views respondem com 409 e
+Retry-After, em vez de prender o worker até o timeout padrão do MySQL (50s).
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+MODO_NOWAIT = 'nowait'
+MODO_TIMEOUT = 'timeout'
+MODO_BLOQUEANTE = 'bloqueante'
+MODOS = (MODO_NOWAIT, MODO_TIMEOUT, MODO_BLOQUEANTE)
+
+ERRO_LOCK_WAIT_TIMEOUT = 1205
+ERRO_LOCK_NOWAIT = 3572
+
+
+class LockIndisponivelError(Exception):
+    def __init__(self, recurso, retry_after=None):
+        self.recurso = recurso
+        self.retry_after = retry_after if retry_after is not None else settings.LOCK_RETRY_AFTER
+        super().__init__(
+            f"{recurso} está sendo alterado por outra operação. "
+            f"Tente novamente em {self.retry_after}s."
+        )
+
+
+def modo_da_operacao(operacao):
+    modo = settings.LOCK_MODES.get(operacao, settings.LOCK_MODE_DEFAULT)
+    if modo not in MODOS:
+        raise ValueError(f"Modo de lock inválido para '{operacao}': {modo}. Use um de {MODOS}")
+    return modo
+
+
+def _erro_de_contencao(erro):
+    return bool(erro.args) and erro.args[0] in (ERRO_LOCK_WAIT_TIMEOUT, ERRO_LOCK_NOWAIT)
+
+
+@contextmanager
+def _timeout_de_sessao(using):
+    conexao = connections[using]
+    if conexao.vendor != 'mysql':
+        yield
+        return
+
+    with conexao.cursor() as cursor:
+        cursor.execute('SET SESSION innodb_lock_wait_timeout = %s', [settings.LOCK_WAIT_TIMEOUT])
+    try:
+        yield
+    finally:
+        with conexao.cursor() as cursor:
+            cursor.execute('SET SESSION innodb_lock_wait_timeout = DEFAULT')
+
+
+def com_lock(queryset, modo, recurso):
+    """Avalia o queryset com select_for_update no modo informado e retorna a lista."""
+    try:
+        if modo == MODO_NOWAIT:
+            return list(queryset.select_for_update(nowait=True))
+        if modo == MODO_TIMEOUT:
+            with _timeout_de_sessao(queryset.db):
+                return list(queryset.select_for_update())
+        return list(queryset.select_for_update())
+    except DatabaseError as err:
+        if _erro_de_contencao(err):
+            raise LockIndisponivelError(recurso) from err
+        raise
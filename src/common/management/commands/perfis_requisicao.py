@@ -0,0 +1,91 @@
+import os
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.comandos import ComandoEnxutoMixin
+from common.profiling import BufferCircularPerfis, PerfilNaoEncontradoError
+
+
+class Command(ComandoEnxutoMixin, BaseCommand):
+    help = (
+        'Lista os perfis de requisição gravados pelo PerfilRequisicaoMiddleware ou mostra um '
+        'deles: funções mais caras (ou pilhas amostradas), consultas mais lentas e repetidas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('perfil_id', nargs='?', help='Perfil a mostrar (sem id, lista os gravados)')
+        parser.add_argument('--top', type=int, default=20, help='Funções, pilhas e consultas listadas')
+        parser.add_argument('--limite', type=int, default=50, help='Perfis listados')
+        parser.add_argument('--folded', action='store_true', help='Só as pilhas no formato folded (flamegraph)')
+        parser.add_argument('--limpar', action='store_true', help='Apaga todos os perfis gravados')
+
+    def handle(self, *args, **options):
+        buffer = BufferCircularPerfis()
+        if options['limpar']:
+            self.stdout.write(f'{buffer.limpar()} perfil(is) apagado(s) de {buffer.diretorio}')
+        elif options['perfil_id']:
+            try:
+                perfil = buffer.obter(options['perfil_id'])
+            except PerfilNaoEncontradoError as exc:
+                raise CommandError(str(exc))
+            if options['folded']:
+                for pilha, amostras in perfil.get('pilhas', {}).items():
+                    self.stdout.write(f'{pilha} {amostras}')
+            else:
+                self._mostrar(buffer, perfil, options['top'])
+        else:
+            self._listar(buffer, options['limite'])
+
+    def _listar(self, buffer, limite):
+        perfis = buffer.listar()[:limite]
+        if not perfis:
+            self.stdout.write(f'Nenhum perfil em {buffer.diretorio}')
+            return
+        for perfil in perfis:
+            self.stdout.write(
+                f"{perfil['id']}  {perfil['metodo']:<6} {perfil['caminho']:<40} {perfil['status']}  "
+                f"{perfil['duracao_ms']:>9.1f} ms  {perfil['consultas']:>4} SQL ({perfil['sql_ms']:.1f} ms)  "
+                f"{perfil['modo']}/{perfil['motivo']}"
+            )
+
+    def _mostrar(self, buffer, perfil, top):
+        caminho = perfil['caminho'] + (f"?{perfil['query_string']}" if perfil['query_string'] else '')
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{perfil['metodo']} {caminho} → {perfil['status']} em {perfil['duracao_ms']:.1f} ms "
+            f"({perfil['inicio']}, {perfil['modo']}, {perfil['motivo']})"
+        ))
+
+        if 'funcoes' in perfil:
+            self.stdout.write('\nFunções por tempo acumulado:')
+            for funcao in perfil['funcoes'][:top]:
+                self.stdout.write(
+                    f"  {funcao['acumulado_ms']:>9.1f} ms {funcao['proprio_ms']:>9.1f} ms próprio "
+                    f"{funcao['chamadas']:>7}x  {funcao['funcao']}"
+                )
+            prof = buffer.caminho(perfil['id'], 'prof')
+            if os.path.exists(prof):
+                self.stdout.write(f'  pstats completo: {prof}')
+        else:
+            total = perfil['amostras'] or 1
+            folhas = Counter()
+            for pilha, amostras in perfil['pilhas'].items():
+                folhas[pilha.rsplit(';', 1)[-1]] += amostras
+            self.stdout.write(
+                f"\n{perfil['amostras']} amostras a cada {perfil['intervalo_s'] * 1000:g} ms; "
+                "funções em execução (tempo próprio):"
+            )
+            for funcao, amostras in folhas.most_common(top):
+                self.stdout.write(f'  {amostras / total:>6.1%}  {funcao}')
+
+        consultas = perfil['sql']
+        self.stdout.write(f"\n{perfil['consultas']} consulta(s), {perfil['sql_ms']:.1f} ms em SQL. Mais lentas:")
+        for consulta in sorted(consultas, key=lambda consulta: consulta['duracao_ms'], reverse=True)[:top]:
+            self.stdout.write(f"  {consulta['duracao_ms']:>9.2f} ms  {consulta['sql'][:200]}")
+
+        # O mesmo SQL várias vezes na requisição costuma ser N+1
+        repetidas = [(sql, vezes) for sql, vezes in Counter(c['sql'] for c in consultas).most_common(top) if vezes > 1]
+        if repetidas:
+            self.stdout.write('\nConsultas repetidas:')
+            for sql, vezes in repetidas:
+                self.stdout.write(f'  {vezes:>4}x  {sql[:200]}')
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from common.comandos import ComandoEnxutoMixin
+from common.inicializacao import ALVOS, MedicaoInicializacaoError, agrupar_por_pacote, medir_inicializacao
+
+
+class Command(ComandoEnxutoMixin, BaseCommand):
+    help = (
+        'Mede a inicialização em um processo novo (python -X importtime) e mostra o tempo de '
+        'import por pacote e os módulos mais caros. Compara o perfil padrão com o enxuto.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--alvo', choices=list(ALVOS), default='requisicao',
+            help='setup: django.setup(); wsgi: aplicação carregada; requisicao: até a primeira resposta',
+        )
+        parser.add_argument('--perfil', choices=['padrao', 'enxuto', 'ambos'], default='ambos')
+        parser.add_argument('--top', type=int, default=15, help='Pacotes e módulos listados')
+
+    def handle(self, *args, **options):
+        perfis = {'padrao': [False], 'enxuto': [True], 'ambos': [False, True]}[options['perfil']]
+        medicoes = {}
+        for enxuto in perfis:
+            try:
+                medicoes['enxuto' if enxuto else 'padrao'] = medir_inicializacao(options['alvo'], enxuto)
+            except MedicaoInicializacaoError as exc:
+                raise CommandError(str(exc))
+
+        for perfil, (duracao, modulos) in medicoes.items():
+            self._relatorio(perfil, options['alvo'], duracao, modulos, options['top'])
+
+        if len(medicoes) == 2:
+            (_, padrao), (_, enxuto) = medicoes.values()
+            evitados = sorted({m for m, *_ in padrao} - {m for m, *_ in enxuto})
+            pacotes = agrupar_por_pacote([m for m in padrao if m[0] in evitados])
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'\nMódulos não importados no perfil enxuto: {len(evitados)}'
+            ))
+            for pacote, proprio in pacotes.most_common(options['top']):
+                self.stdout.write(f'  {pacote:<32} {proprio / 1000:>8.1f} ms')
+
+    def _relatorio(self, perfil, alvo, duracao, modulos, top):
+        total_import = sum(proprio for _, proprio, _, _ in modulos)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'\nPerfil {perfil} — alvo {alvo}: {duracao * 1000:.0f} ms de parede, '
+            f'{len(modulos)} módulos, {total_import / 1000:.0f} ms em imports (com o custo do -X importtime)'
+        ))
+
+        self.stdout.write('  Por pacote (tempo próprio):')
+        for pacote, proprio in agrupar_por_pacote(modulos).most_common(top):
+            self.stdout.write(f'    {pacote:<30} {proprio / 1000:>8.1f} ms {proprio / total_import:>6.1%}')
+
+        # Acumulado inclui os imports feitos pelo módulo: aponta quem puxou cada pacote pesado
+        self.stdout.write('  Módulos do projeto e de terceiros por tempo acumulado:')
+        caros = sorted(modulos, key=lambda modulo: modulo[2], reverse=True)
+        for modulo, _, acumulado, profundidade in caros[:top]:
+            self.stdout.write(f'    {modulo:<50} {acumulado / 1000:>8.1f} ms (nível {profundidade})')
@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from common.query_plans import (
+    executar_cenarios, comparar_com_baseline, formatar_regressao, carregar_baseline, salvar_baseline,
+)
+from common.query_plan_scenarios import popular_base, cenarios_padrao
+
+
+class Command(BaseCommand):
+    help = (
+        'Executa os fluxos principais da API em um banco de teste populado, roda EXPLAIN '
+        'em cada consulta e falha se algum plano regredir em relação ao baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--baseline', default=str(settings.QUERY_PLANS_BASELINE),
+            help='Caminho do arquivo JSON com o baseline de planos.',
+        )
+        parser.add_argument(
+            '--atualizar', action='store_true',
+            help='Regrava o baseline com os planos atuais em vez de comparar.',
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        conexao = connections[using]
+        if conexao.vendor != 'mysql':
+            raise CommandError(f'Análise de planos requer MySQL (banco atual: {conexao.vendor}).')
+
+        verbosity = options['verbosity']
+        nome_original = conexao.settings_dict['NAME']
+
+        setup_test_environment()
+        conexao.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+        try:
+            contexto = popular_base()
+            resultados = executar_cenarios(cenarios_padrao(contexto), using=using)
+        finally:
+            conexao.creation.destroy_test_db(nome_original, verbosity=verbosity)
+            teardown_test_environment()
+
+        total_consultas = sum(len(planos) for planos in resultados.values())
+
+        if options['atualizar']:
+            salvar_baseline(options['baseline'], resultados)
+            self.stdout.write(self.style.SUCCESS(
+                f"Baseline gravado em {options['baseline']} "
+                f'({len(resultados)} cenários, {total_consultas} consultas).'
+            ))
+            return
+
+        baseline = carregar_baseline(options['baseline'])
+        if baseline is None:
+            raise CommandError(
+                f"Baseline não encontrado em {options['baseline']}. Gere com --atualizar."
+            )
+
+        regressoes = comparar_com_baseline(resultados, baseline)
+        for regressao in regressoes:
+            self.stderr.write(formatar_regressao(regressao))
+
+        if regressoes:
+            raise CommandError(f'{len(regressoes)} regressão(ões) de plano encontrada(s).')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Nenhuma regressão em {len(resultados)} cenários ({total_consultas} consultas).'
+        ))
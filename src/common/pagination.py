@@ -0,0 +1,117 @@
+"""
+Contagens baratas para listagens de tabelas grandes.
+
+Um COUNT(*) exato em tabelas com milhões de linhas custa mais do que a própria
+página. A contagem exata fica em cache por combinação de filtros (TTL curto,
+invalidada por escritas na tabela) e, quando precisa ir ao banco, lê no máximo
+limite + 1 linhas; acima do limite vale a estimativa do otimizador (EXPLAIN,
+calculada a partir das estatísticas do InnoDB).
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+from .contagens import versao_contagens
+from .explain import explicar_queryset
+
+logger = logging.getLogger(__name__)
+
+
+def estimar_linhas(queryset):
+    """Linhas estimadas pelo otimizador do MySQL para o queryset; None em outros bancos."""
+    if connections[queryset.db].vendor != 'mysql':
+        return None
+    # Sem os JOINs do select_related; com filtros por relação o otimizador pode começar
+    # por outra tabela, então vale a linha do plano da tabela contada, não a primeira
+    tabela = queryset.model._meta.db_table
+    plano = explicar_queryset(queryset.order_by().select_related(None))
+    linha = next((linha for linha in plano if linha.get('table') == tabela), None)
+    if linha is None or linha.get('rows') is None:
+        return None
+    filtrado = linha.get('filtered') or 100
+    return int(linha['rows'] * filtrado / 100)
+
+
+def contar_limitado(queryset, limite):
+    """COUNT(*) que lê no máximo limite + 1 linhas."""
+    return queryset.order_by()[:limite + 1].count()
+
+
+class PaginadorContagemLimitada(Paginator):
+    """
+    Paginator que evita o COUNT(*) completo: usa a contagem em cache se houver,
+    conta exatamente até `limite` linhas e estima acima disso (`contagem_exata`
+    indica qual caso valeu).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limite = settings.PAGINACAO_CONTAGEM_LIMITE
+        self.ttl = settings.PAGINACAO_CONTAGEM_TTL
+        self.contagem_exata = True
+
+    def _chave_cache(self, queryset):
+        versao = versao_contagens(queryset.model)
+        if versao is None:
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        resumo = hashlib.md5(repr((sql, params)).encode()).hexdigest()
+        return f'contagem:{queryset.model._meta.db_table}:{versao}:{resumo}'
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        chave = self._chave_cache(queryset) if self.ttl else None
+        if chave:
+            total = self._ler_cache(chave)
+            if total is not None:
+                return total
+
+        total = contar_limitado(queryset, self.limite)
+        self.contagem_exata = total <= self.limite
+        if self.contagem_exata:
+            if chave:
+                self._gravar_cache(chave, total)
+            return total
+        return max(estimar_linhas(queryset) or 0, total)
+
+    # Cache fora do ar não derruba a listagem (como no throttling): vale a contagem limitada
+    def _ler_cache(self, chave):
+        try:
+            return cache.get(chave)
+        except Exception:
+            logger.warning('Cache indisponível para a contagem %s', chave, exc_info=True)
+            return None
+
+    def _gravar_cache(self, chave, total):
+        try:
+            cache.set(chave, total, self.ttl)
+        except Exception:
+            logger.warning('Cache indisponível para a contagem %s', chave, exc_info=True)
+
+
+class PaginacaoContagemEstimada(PageNumberPagination):
+    """PageNumberPagination com o PaginadorContagemLimitada; `count_is_exact` indica se `count` é exato."""
+
+    django_paginator_class = PaginadorContagemLimitada
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_is_exact': self.page.paginator.contagem_exata,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        resposta = super().get_paginated_response_schema(schema)
+        resposta['properties']['count_is_exact'] = {'type': 'boolean', 'example': True}
+        return resposta
@@ -0,0 +1,24 @@
+"""
+Parsers JSON de alto desempenho para o DRF.
+"""
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser baseado em orjson. Rejeita NaN/Infinity, como o parser padrão em modo strict."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        conteudo = stream.read() if stream is not None else b''
+
+        if encoding.lower().replace('-', '') != 'utf8':
+            conteudo = conteudo.decode(encoding)
+
+        try:
+            return orjson.loads(conteudo)
+        except (orjson.JSONDecodeError, UnicodeDecodeError) as exc:
+            raise ParseError(f'JSON parse error - {exc}')
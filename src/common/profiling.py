@@ -0,0 +1,300 @@
+"""
+Profiling de requisições sob demanda.
+
+O PerfilRequisicaoMiddleware perfila a requisição quando ela traz o cabeçalho
+X-Profile com o PROFILING_TOKEN ou quando cai numa regra de PROFILING_AMOSTRAGEM
+("METODO /prefixo/=taxa", separadas por vírgula; '*' vale qualquer método). O
+perfil (cProfile ou amostragem de pilhas) e o SQL executado, com a duração de
+cada consulta, vão para um buffer circular em disco (PROFILING_DIR, no máximo
+PROFILING_MAX_PERFIS perfis); o comando perfis_requisicao lista e mostra os
+perfis gravados. Sem token nem regras o middleware nem entra na cadeia.
+"""
+import cProfile
+import hmac
+import json
+import logging
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+MODOS = ('deterministico', 'amostragem')
+
+# Limites do que vai para o disco por perfil
+MAX_CONSULTAS = 1000
+MAX_FUNCOES = 200
+MAX_PILHAS = 2000
+MAX_BYTES_PROF = 10 * 1024 * 1024
+
+_lock_cprofile = threading.Lock()
+
+
+class PerfilNaoEncontradoError(Exception):
+    pass
+
+
+def regras_de_amostragem(texto):
+    """'POST /api/v1/orders/=0.01,* /api/v1/products/=0.001' -> [(metodo, prefixo, taxa)]."""
+    regras = []
+    for regra in filter(None, (parte.strip() for parte in texto.split(','))):
+        alvo, _, taxa = regra.rpartition('=')
+        metodo, _, prefixo = alvo.strip().partition(' ')
+        if not prefixo.strip() or not taxa:
+            raise ValueError(f"Regra de amostragem inválida: '{regra}' (esperado 'METODO /prefixo/=taxa')")
+        regras.append((metodo.upper(), prefixo.strip(), float(taxa)))
+    return regras
+
+
+class AmostradorPilhas:
+    """
+    Profiler estatístico: uma thread lê a pilha da thread da requisição a cada
+    `intervalo` s e conta as pilhas no formato "folded" (a;b;c -> amostras), o
+    mesmo dos flamegraphs. Custo independe do número de chamadas da view.
+    Passando de `max_pilhas` pilhas distintas, as novas só entram em `descartadas`.
+    """
+
+    def __init__(self, intervalo, raiz=None, max_pilhas=MAX_PILHAS):
+        self.intervalo = intervalo
+        # Frame a partir do qual as pilhas são registradas (a view, não o servidor)
+        self.raiz = raiz
+        self.max_pilhas = max_pilhas
+        self.pilhas = Counter()
+        self.descartadas = 0
+        self._parar = threading.Event()
+
+    def __enter__(self):
+        self._thread_alvo = threading.get_ident()
+        self._thread = threading.Thread(target=self._amostrar, name='amostrador-perfil', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._parar.set()
+        self._thread.join()
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self._thread_alvo)
+            pilha = []
+            while frame is not None and frame is not self.raiz:
+                pilha.append(f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_qualname}")
+                frame = frame.f_back
+            if not pilha:
+                continue
+            chave = ';'.join(reversed(pilha))
+            if chave in self.pilhas or len(self.pilhas) < self.max_pilhas:
+                self.pilhas[chave] += 1
+            else:
+                self.descartadas += 1
+
+
+def _funcoes_mais_caras(profiler):
+    estatisticas = pstats.Stats(profiler).stats
+    funcoes = [
+        {
+            'funcao': f'{nome} ({arquivo}:{linha})',
+            'chamadas': chamadas,
+            'proprio_ms': round(proprio * 1000, 3),
+            'acumulado_ms': round(acumulado * 1000, 3),
+        }
+        for (arquivo, linha, nome), (_, chamadas, proprio, acumulado, _) in estatisticas.items()
+    ]
+    funcoes.sort(key=lambda funcao: funcao['acumulado_ms'], reverse=True)
+    return funcoes[:MAX_FUNCOES]
+
+
+class BufferCircularPerfis:
+    """
+    Perfis em disco, um JSON por requisição (mais o .prof do cProfile no modo
+    determinístico); ao passar de `maximo` os mais antigos são apagados. Os ids
+    começam pelo instante da requisição, então a ordem dos nomes é a cronológica.
+    """
+
+    def __init__(self, diretorio=None, maximo=None):
+        self.diretorio = diretorio or settings.PROFILING_DIR
+        self.maximo = maximo or settings.PROFILING_MAX_PERFIS
+
+    def novo_id(self):
+        return f"{timezone.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:6]}"
+
+    def caminho(self, perfil_id, extensao='json'):
+        return os.path.join(self.diretorio, f'{perfil_id}.{extensao}')
+
+    def salvar(self, perfil, profiler=None):
+        os.makedirs(self.diretorio, exist_ok=True)
+        try:
+            if profiler is not None:
+                # O mesmo formato do dump_stats; acima de MAX_BYTES_PROF fica só o resumo do JSON
+                dados = marshal.dumps(pstats.Stats(profiler).stats)
+                if len(dados) <= MAX_BYTES_PROF:
+                    with open(self.caminho(perfil['id'], 'prof'), 'wb') as arquivo:
+                        arquivo.write(dados)
+            # Escrita atômica: outro worker listando o diretório nunca lê um JSON pela metade
+            temporario = self.caminho(perfil['id'], 'json.tmp')
+            with open(temporario, 'w') as arquivo:
+                json.dump(perfil, arquivo, ensure_ascii=False)
+            os.replace(temporario, self.caminho(perfil['id']))
+        except Exception:
+            # Sem o JSON o perfil não é listado: nada pode sobrar no diretório
+            self._apagar(perfil['id'])
+            raise
+        self._descartar_antigos()
+
+    def _ids(self):
+        try:
+            nomes = os.listdir(self.diretorio)
+        except FileNotFoundError:
+            return []
+        return sorted(nome[:-len('.json')] for nome in nomes if nome.endswith('.json'))
+
+    def _descartar_antigos(self):
+        ids = self._ids()
+        for perfil_id in ids[:max(len(ids) - self.maximo, 0)]:
+            self._apagar(perfil_id)
+
+    def _apagar(self, perfil_id):
+        for extensao in ('json', 'prof', 'json.tmp'):
+            try:
+                os.remove(self.caminho(perfil_id, extensao))
+            except FileNotFoundError:
+                # Outro worker descartou o mesmo perfil
+                pass
+
+    def listar(self):
+        """Resumo dos perfis gravados, do mais recente ao mais antigo."""
+        resumos = []
+        for perfil_id in reversed(self._ids()):
+            try:
+                perfil = self.obter(perfil_id)
+            except PerfilNaoEncontradoError:
+                continue
+            resumos.append({chave: valor for chave, valor in perfil.items() if chave not in ('sql', 'funcoes', 'pilhas')})
+        return resumos
+
+    def obter(self, perfil_id):
+        try:
+            with open(self.caminho(perfil_id)) as arquivo:
+                return json.load(arquivo)
+        except FileNotFoundError:
+            raise PerfilNaoEncontradoError(f"Perfil '{perfil_id}' não encontrado em {self.diretorio}")
+
+    def limpar(self):
+        ids = self._ids()
+        for perfil_id in ids:
+            self._apagar(perfil_id)
+        return len(ids)
+
+
+class PerfilRequisicaoMiddleware:
+    """
+    Fica por último em MIDDLEWARE: o perfil cobre a view (e a renderização da
+    resposta), não os outros middlewares. A resposta perfilada leva X-Profile-Id.
+    """
+
+    def __init__(self, get_response):
+        self.token = settings.PROFILING_TOKEN
+        self.regras = regras_de_amostragem(settings.PROFILING_AMOSTRAGEM)
+        if not self.token and not self.regras:
+            raise MiddlewareNotUsed
+        if settings.PROFILING_MODO not in MODOS:
+            raise ValueError(f"PROFILING_MODO deve ser um de {MODOS}, não '{settings.PROFILING_MODO}'")
+        self.get_response = get_response
+        self.buffer = BufferCircularPerfis()
+
+    def __call__(self, request):
+        motivo = self._motivo(request)
+        if motivo is None:
+            return self.get_response(request)
+        return self._perfilar(request, motivo)
+
+    def _motivo(self, request):
+        cabecalho = request.headers.get('X-Profile')
+        if self.token and cabecalho and hmac.compare_digest(cabecalho.encode(), self.token.encode()):
+            return 'cabecalho'
+        for metodo, prefixo, taxa in self.regras:
+            if metodo in ('*', request.method) and request.path.startswith(prefixo) and random.random() < taxa:
+                return 'amostragem'
+        return None
+
+    def _perfilar(self, request, motivo):
+        consultas = []
+
+        def registrar_consulta(execute, sql, params, many, context):
+            inicio = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                if len(consultas) < MAX_CONSULTAS:
+                    consultas.append({
+                        'banco': context['connection'].alias,
+                        'sql': sql,
+                        'duracao_ms': round((time.perf_counter() - inicio) * 1000, 3),
+                        'muitos': many,
+                    })
+
+        modo = settings.PROFILING_MODO
+        # cProfile é um por processo a partir do Python 3.12 (sys.monitoring): com
+        # outra requisição já perfilada em outra thread, esta vai por amostragem
+        if modo == 'deterministico' and not _lock_cprofile.acquire(blocking=False):
+            modo = 'amostragem'
+        perfil = {
+            'id': self.buffer.novo_id(),
+            'inicio': timezone.now().isoformat(),
+            'metodo': request.method,
+            'caminho': request.path,
+            'query_string': request.META.get('QUERY_STRING', ''),
+            'motivo': motivo,
+            'modo': modo,
+        }
+
+        profiler = amostrador = None
+        with ExitStack() as pilha:
+            for conexao in connections.all():
+                pilha.enter_context(conexao.execute_wrapper(registrar_consulta))
+            inicio = time.perf_counter()
+            if modo == 'deterministico':
+                pilha.callback(_lock_cprofile.release)
+                profiler = cProfile.Profile()
+                with profiler:
+                    response = self.get_response(request)
+            else:
+                amostrador = AmostradorPilhas(settings.PROFILING_INTERVALO_AMOSTRAGEM, raiz=sys._getframe())
+                with amostrador:
+                    response = self.get_response(request)
+            duracao = time.perf_counter() - inicio
+
+        perfil.update({
+            'status': response.status_code,
+            'duracao_ms': round(duracao * 1000, 3),
+            'consultas': len(consultas),
+            'sql_ms': round(sum(consulta['duracao_ms'] for consulta in consultas), 3),
+            'sql': consultas,
+        })
+        # O perfil é diagnóstico: disco cheio ou sem permissão não pode virar 500 para o cliente
+        try:
+            if profiler:
+                perfil['funcoes'] = _funcoes_mais_caras(profiler)
+            else:
+                perfil['amostras'] = sum(amostrador.pilhas.values()) + amostrador.descartadas
+                perfil['pilhas_descartadas'] = amostrador.descartadas
+                perfil['intervalo_s'] = amostrador.intervalo
+                perfil['pilhas'] = dict(amostrador.pilhas.most_common())
+            self.buffer.salvar(perfil, profiler)
+        except Exception:
+            logger.exception('Falha ao gravar o perfil %s de %s %s', perfil['id'], request.method, request.path)
+            return response
+        response['X-Profile-Id'] = perfil['id']
+        return response
@@ -0,0 +1,97 @@
+"""
+Plugin pytest de desempenho de consultas.
+
+- ``guarda_planos``: compara planos de execução com o baseline (``--atualizar-planos``
+  regrava o baseline em vez de comparar).
+- ``orcamento_consultas``: mede o número de queries por endpoint; a tabela com as
+  medições e orçamentos é impressa no resumo final da execução.
+"""
+import os
+
+import pytest
+from django.conf import settings
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from .query_plans import (
+    executar_cenarios, comparar_com_baseline, formatar_regressao, carregar_baseline, salvar_baseline,
+)
+
+
+_MEDICOES_CONSULTAS = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--atualizar-planos', action='store_true', default=False,
+        help='Regrava o baseline de planos de consulta com os planos atuais.',
+    )
+
+
+@pytest.fixture
+def guarda_planos(request, db):
+    if connections['default'].vendor != 'mysql':
+        pytest.skip('Análise de planos de consulta requer MySQL')
+
+    caminho = settings.QUERY_PLANS_BASELINE
+    atualizar = request.config.getoption('--atualizar-planos')
+
+    def verificar(cenarios):
+        resultados = executar_cenarios(cenarios)
+        if atualizar:
+            salvar_baseline(caminho, resultados)
+            return resultados
+
+        baseline = carregar_baseline(caminho)
+        if baseline is None:
+            mensagem = f'Baseline de planos ausente em {caminho}; rode com --atualizar-planos'
+            # No CI o baseline é obrigatório: pular esconderia a falta do arquivo
+            if os.environ.get('CI'):
+                pytest.fail(mensagem, pytrace=False)
+            pytest.skip(mensagem)
+
+        regressoes = comparar_com_baseline(resultados, baseline)
+        if regressoes:
+            pytest.fail(
+                f'{len(regressoes)} regressão(ões) de plano:\n'
+                + '\n'.join(formatar_regressao(regressao) for regressao in regressoes),
+                pytrace=False,
+            )
+        return resultados
+
+    return verificar
+
+
+def pytest_configure(config):
+    config.stash[_MEDICOES_CONSULTAS] = {}
+
+
+@pytest.fixture
+def orcamento_consultas(request):
+    medicoes = request.config.stash[_MEDICOES_CONSULTAS]
+
+    def medir(rota, tamanho, funcao, orcamento=None):
+        with CaptureQueriesContext(connections['default']) as contexto:
+            resultado = funcao()
+        registro = medicoes.setdefault(rota, {'orcamento': orcamento, 'tamanhos': {}})
+        registro['tamanhos'][tamanho] = len(contexto)
+        return len(contexto), resultado
+
+    return medir
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    medicoes = config.stash.get(_MEDICOES_CONSULTAS, {})
+    if not medicoes:
+        return
+
+    tamanhos = sorted({tamanho for registro in medicoes.values() for tamanho in registro['tamanhos']})
+    largura = max(len(rota) for rota in medicoes)
+    cabecalho = f"{'Rota':<{largura}} | " + ' | '.join(f'n={t:<4}' for t in tamanhos) + ' | Orçamento'
+
+    terminalreporter.section('Orçamento de queries por endpoint')
+    terminalreporter.write_line(cabecalho)
+    terminalreporter.write_line('-' * len(cabecalho))
+    for rota, registro in sorted(medicoes.items()):
+        colunas = ' | '.join(f"{registro['tamanhos'].get(t, '-'):<6}" for t in tamanhos)
+        terminalreporter.write_line(f"{rota:<{largura}} | {colunas} | {'-' if registro['orcamento'] is None else registro['orcamento']}")
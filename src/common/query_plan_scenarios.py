@@ -0,0 +1,148 @@
+"""
+Cenários usados pela guarda de planos de consulta: população da base e fluxos
+principais da API (criação, alteração de status, cancelamento e listagens).
+"""
+import itertools
+from decimal import Decimal
+
+from django.db import connection
+from django.utils import timezone
+
+
+class CenarioFalhouError(Exception):
+    pass
+
+
+def popular_base(quantidade_clientes=50, quantidade_produtos=200, quantidade_pedidos=500):
+    """Popula a base com volume suficiente para o otimizador preferir índices."""
+    from clientes.models import Cliente
+    from pedidos.models import Pedido, ItemPedido, StatusPedido
+    from produtos.models import Produto
+
+    agora = timezone.now()
+    clientes = Cliente.all_objects.bulk_create([
+        Cliente(
+            nome=f'Cliente Plano {i:04d}', cpf_cnpj=f'9{i:010d}', email=f'plano{i}@teste.com',
+            ativo=i % 5 != 0, deleted_at=agora if i % 10 == 9 else None,
+        )
+        for i in range(quantidade_clientes)
+    ])
+    produtos = Produto.all_objects.bulk_create([
+        Produto(
+            sku=f'PLANO-{i:05d}', nome=f'Produto Plano {i:05d}', preco=Decimal('10.00') + i,
+            quantidade_estoque=1000, ativo=i % 5 != 0, deleted_at=agora if i % 10 == 9 else None,
+        )
+        for i in range(quantidade_produtos)
+    ])
+    status = [valor for valor, _ in StatusPedido.choices]
+    pedidos = Pedido.all_objects.bulk_create([
+        Pedido(
+            numero=f'PED-PLANO-{i:06d}', cliente=clientes[i % quantidade_clientes],
+            status=status[i % len(status)], valor_total=Decimal('10.00'),
+            chave_idempotencia=f'plano-{i}', deleted_at=agora if i % 10 == 9 else None,
+        )
+        for i in range(quantidade_pedidos)
+    ])
+    ItemPedido.objects.bulk_create([
+        ItemPedido(
+            pedido=pedido, produto=produtos[i % quantidade_produtos], quantidade=1,
+            preco_unitario=Decimal('10.00'), subtotal=Decimal('10.00'),
+        )
+        for i, pedido in enumerate(pedidos)
+    ])
+
+    if connection.vendor == 'mysql':
+        with connection.cursor() as cursor:
+            for tabela in ('clientes', 'produtos', 'pedidos', 'itens_pedido'):
+                cursor.execute(f'ANALYZE TABLE {tabela}')
+                cursor.fetchall()
+
+    cliente = next(c for c in clientes if c.ativo and c.deleted_at is None)
+    produto = next(p for p in produtos if p.ativo and p.deleted_at is None)
+    return {'cliente': cliente, 'produto': produto, 'pedido': {}}
+
+
+def combinacoes_listagem(viewset, valores_filtro):
+    """Gera os query params de cada combinação de filterset_fields x ordering_fields."""
+    filtros = list(viewset.filterset_fields)
+    ordenacoes = [None] + [
+        f'{prefixo}{campo}' for campo in viewset.ordering_fields for prefixo in ('', '-')
+    ]
+    for tamanho in range(len(filtros) + 1):
+        for combinacao in itertools.combinations(filtros, tamanho):
+            for ordenacao in ordenacoes:
+                params = {campo: valores_filtro[campo] for campo in combinacao}
+                if ordenacao:
+                    params['ordering'] = ordenacao
+                yield params
+
+
+def _nome_listagem(recurso, params):
+    partes = [campo for campo in params if campo != 'ordering']
+    if 'ordering' in params:
+        partes.append(f"ordering={params['ordering']}")
+    return f"{recurso}.listar?{'&'.join(partes)}" if partes else f'{recurso}.listar'
+
+
+def _verificar(resposta):
+    if resposta.status_code >= 400:
+        raise CenarioFalhouError(
+            f'{resposta.request["REQUEST_METHOD"]} {resposta.request["PATH_INFO"]} '
+            f'retornou {resposta.status_code}: {resposta.content[:200]!r}'
+        )
+    return resposta
+
+
+def cenarios_padrao(contexto):
+    """Retorna a lista de (nome, callable) com os fluxos principais da API."""
+    from rest_framework.test import APIClient
+    from clientes.views import ClienteViewSet
+    from pedidos.views import PedidoViewSet
+    from produtos.views import ProdutoViewSet
+
+    client = APIClient()
+    cliente = contexto['cliente']
+    produto = contexto['produto']
+    pedido = contexto['pedido']
+
+    def criar_pedido():
+        resposta = _verificar(client.post('/api/v1/orders/', {
+            'cliente_id': cliente.id,
+            'itens': [{'produto_id': produto.id, 'quantidade': 1}],
+            'idempotency_key': 'plano-criacao',
+        }, format='json'))
+        pedido['id'] = resposta.json()['id']
+
+    def alterar_status():
+        _verificar(client.patch(
+            f"/api/v1/orders/{pedido['id']}/status/", {'status': 'confirmado'}, format='json'
+        ))
+
+    def cancelar_pedido():
+        _verificar(client.delete(f"/api/v1/orders/{pedido['id']}/"))
+
+    def obter_pedido():
+        _verificar(client.get(f"/api/v1/orders/{pedido['id']}/"))
+
+    cenarios = [
+        ('pedidos.criar', criar_pedido),
+        ('pedidos.alterar_status', alterar_status),
+        ('pedidos.obter', obter_pedido),
+        ('pedidos.cancelar', cancelar_pedido),
+    ]
+
+    listagens = [
+        ('pedidos', '/api/v1/orders/', PedidoViewSet, {'status': 'pendente', 'cliente': cliente.id}),
+        ('produtos', '/api/v1/products/', ProdutoViewSet, {'ativo': 'true', 'sku': produto.sku}),
+        ('clientes', '/api/v1/customers/', ClienteViewSet, {
+            'ativo': 'true', 'email': cliente.email, 'cpf_cnpj': cliente.cpf_cnpj,
+        }),
+    ]
+    for recurso, url, viewset, valores in listagens:
+        for params in combinacoes_listagem(viewset, valores):
+            cenarios.append((
+                _nome_listagem(recurso, params),
+                lambda url=url, params=params: _verificar(client.get(url, params)),
+            ))
+
+    return cenarios
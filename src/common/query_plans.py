@@ -0,0 +1,133 @@
+"""
+Guarda contra regressões de plano de consulta.
+
+Executa cenários (fluxos da API), captura o SQL emitido, roda EXPLAIN em cada
+SELECT/UPDATE/DELETE e compara os problemas encontrados (full scan, filesort e
+tabela temporária) com um baseline versionado em JSON.
+"""
+import json
+import re
+from pathlib import Path
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from .explain import explicar_sql
+
+
+PROBLEMA_FULL_SCAN = 'full_scan'
+PROBLEMA_FILESORT = 'filesort'
+PROBLEMA_TEMPORARIA = 'tabela_temporaria'
+
+COMANDOS_EXPLICAVEIS = ('SELECT', 'UPDATE', 'DELETE')
+
+
+class PlanoNaoSuportadoError(Exception):
+    pass
+
+
+def normalizar_sql(sql):
+    """Remove literais do SQL para que a mesma consulta gere sempre a mesma chave."""
+    sql = re.sub(r"'(?:[^'\\]|\\.)*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(...)', sql)
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+def classificar_plano(linhas):
+    """Resume as linhas do EXPLAIN (MySQL) em {tabela: {tipo, indice, problemas}}."""
+    resultado = {}
+    for linha in linhas:
+        tabela = linha.get('table')
+        if not tabela:
+            continue
+
+        extra = linha.get('Extra') or ''
+        problemas = set()
+        if linha.get('type') == 'ALL':
+            problemas.add(PROBLEMA_FULL_SCAN)
+        if 'Using filesort' in extra:
+            problemas.add(PROBLEMA_FILESORT)
+        if 'Using temporary' in extra:
+            problemas.add(PROBLEMA_TEMPORARIA)
+
+        if tabela in resultado:
+            problemas.update(resultado[tabela]['problemas'])
+
+        resultado[tabela] = {
+            'tipo': linha.get('type'),
+            'indice': linha.get('key'),
+            'problemas': sorted(problemas),
+        }
+    return resultado
+
+
+def capturar_planos(cenario, using='default'):
+    """Executa o cenário e retorna {sql_normalizado: plano_classificado}."""
+    conexao = connections[using]
+    if conexao.vendor != 'mysql':
+        raise PlanoNaoSuportadoError(
+            f"Análise de planos requer MySQL (banco '{using}' usa {conexao.vendor})"
+        )
+
+    with CaptureQueriesContext(conexao) as contexto:
+        cenario()
+
+    planos = {}
+    for consulta in contexto.captured_queries:
+        sql = consulta['sql']
+        if not sql.lstrip().upper().startswith(COMANDOS_EXPLICAVEIS):
+            continue
+        planos[normalizar_sql(sql)] = classificar_plano(explicar_sql(sql, using=using))
+    return planos
+
+
+def executar_cenarios(cenarios, using='default'):
+    """Executa uma lista de (nome, callable) e retorna {nome: planos}."""
+    return {nome: capturar_planos(funcao, using=using) for nome, funcao in cenarios}
+
+
+def comparar_com_baseline(resultados, baseline):
+    """
+    Retorna as regressões: problemas presentes no plano atual que não constam no
+    baseline para o mesmo cenário, consulta e tabela.
+    """
+    regressoes = []
+    for cenario, planos in resultados.items():
+        esperado_cenario = baseline.get(cenario, {})
+        for sql, tabelas in planos.items():
+            esperado_sql = esperado_cenario.get(sql, {})
+            for tabela, plano in tabelas.items():
+                aceitos = set(esperado_sql.get(tabela, {}).get('problemas', []))
+                novos = sorted(set(plano['problemas']) - aceitos)
+                if novos:
+                    regressoes.append({
+                        'cenario': cenario,
+                        'sql': sql,
+                        'tabela': tabela,
+                        'indice': plano['indice'],
+                        'problemas': novos,
+                    })
+    return regressoes
+
+
+def formatar_regressao(regressao):
+    return (
+        f"[{regressao['cenario']}] {regressao['tabela']} "
+        f"(índice: {regressao['indice'] or 'nenhum'}): {', '.join(regressao['problemas'])}\n"
+        f"    {regressao['sql']}"
+    )
+
+
+def carregar_baseline(caminho):
+    caminho = Path(caminho)
+    if not caminho.exists():
+        return None
+    return json.loads(caminho.read_text(encoding='utf-8'))
+
+
+def salvar_baseline(caminho, resultados):
+    Path(caminho).write_text(
+        json.dumps(resultados, indent=2, sort_keys=True, ensure_ascii=False) + '\n',
+        encoding='utf-8',
+    )
@@ -0,0 +1,68 @@
+"""
+Renderers JSON de alto desempenho para o DRF.
+"""
+import datetime
+import decimal
+import ipaddress
+
+import orjson
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+
+TIPOS_IP = (ipaddress.IPv4Address, ipaddress.IPv6Address, ipaddress.IPv4Network, ipaddress.IPv6Network)
+
+
+def orjson_default(obj):
+    """
+    Tipos que o orjson não serializa nativamente, com a mesma representação do
+    encoder do DRF. Decimal vira string (como os DecimalField dos serializers) para
+    não perder precisão em valores monetários, a menos que COERCE_DECIMAL_TO_STRING
+    esteja desligado.
+    """
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return str(obj) if api_settings.COERCE_DECIMAL_TO_STRING else float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, TIPOS_IP):
+        return str(obj)
+    if isinstance(obj, QuerySet):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__getitem__'):
+        try:
+            return dict(obj)
+        except Exception:
+            pass
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f'Tipo {type(obj).__name__} não é serializável em JSON')
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer baseado em orjson, com saída idêntica à do renderer padrão para
+    respostas compactas. Pedidos com indentação (``Accept: application/json; indent=4``)
+    caem no renderer padrão, já que o orjson só suporta indentação de 2 espaços.
+    """
+    opcoes = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=orjson_default, option=self.opcoes)
+        # Mesmo escape de \u2028 e \u2029 do JSONRenderer padrão
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,31 @@
+"""
+Schema OpenAPI adiado do perfil enxuto (PERFIL_ENXUTO): as views declaram o
+AutoSchemaAdiado e o drf_spectacular só é importado na primeira requisição
+à documentação.
+"""
+import functools
+import sys
+
+from rest_framework.schemas.inspectors import ViewInspector
+
+
+class AutoSchemaAdiado(ViewInspector):
+    """
+    DEFAULT_SCHEMA_CLASS do perfil enxuto. Montar as rotas instancia o schema de
+    cada viewset; o AutoSchema do drf_spectacular só é importado (e usado) depois
+    que a URLconf de docs carregou o gerador, na primeira requisição a /api/schema/.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        if 'drf_spectacular.generators' not in sys.modules:
+            return super().__new__(cls)
+        from drf_spectacular.openapi import AutoSchema
+        if issubclass(cls, AutoSchema):
+            return super().__new__(cls)
+        # Subclasses criadas pelo extend_schema herdam daqui: mantêm seus métodos sobre o AutoSchema
+        return _com_autoschema(cls, AutoSchema)(*args, **kwargs)
+
+
+@functools.lru_cache(maxsize=None)
+def _com_autoschema(classe, autoschema):
+    return type(classe.__name__, (classe, autoschema), {})
@@ -0,0 +1,145 @@
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+
+
+class ProjecaoNaoSuportadaError(Exception):
+    pass
+
+
+class ProjecaoSerializer:
+    """
+    Serializa linhas de ``values_list()`` reaproveitando os conversores
+    (``to_representation``) dos campos de um ModelSerializer, sem instanciar models.
+
+    A saída é idêntica à do serializer de origem. Só suporta campos simples,
+    ``source`` com atributos encadeados (``cliente.nome``) e PrimaryKeyRelatedField.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.nomes = []
+        self.lookups = []
+        self.conversores = []
+
+        for nome, campo in serializer_class().fields.items():
+            if campo.write_only:
+                continue
+            if isinstance(campo, (serializers.BaseSerializer, serializers.SerializerMethodField,
+                                  serializers.ManyRelatedField, serializers.HiddenField)) \
+                    or campo.source == '*':
+                raise ProjecaoNaoSuportadaError(
+                    f'{serializer_class.__name__}.{nome} ({type(campo).__name__}) não suporta projeção'
+                )
+
+            if isinstance(campo, PrimaryKeyRelatedField):
+                conversor = campo.pk_field.to_representation if campo.pk_field is not None else None
+            else:
+                conversor = campo.to_representation
+
+            self.nomes.append(nome)
+            self.lookups.append('__'.join(campo.source_attrs))
+            self.conversores.append(conversor)
+
+    def projetar(self, queryset):
+        """Restringe o queryset às colunas usadas pelo serializer."""
+        return queryset.values_list(*self.lookups)
+
+    def serializar(self, linhas):
+        colunas = list(zip(self.nomes, self.conversores))
+        return [
+            {
+                nome: valor if valor is None or conversor is None else conversor(valor)
+                for (nome, conversor), valor in zip(colunas, linha)
+            }
+            for linha in linhas
+        ]
+
+
+@lru_cache(maxsize=None)
+def projecao_para(serializer_class):
+    """Projeção (cacheada por classe) de um ModelSerializer."""
+    return ProjecaoSerializer(serializer_class)
+
+
+class BuscaEmLoteSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+
+    def validate_ids(self, ids):
+        limite = settings.BATCH_GET_MAX_IDS
+        if len(ids) > limite:
+            raise serializers.ValidationError(f'No máximo {limite} IDs por chamada (recebidos {len(ids)})')
+        # Sem repetidos, na ordem da requisição
+        return list(dict.fromkeys(ids))
+
+
+class CamposSelecionaveisMixin:
+    """Serializer que recebe `campos` no construtor e só serializa esse subconjunto."""
+
+    def __init__(self, *args, campos=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if campos is not None:
+            for nome in set(self.fields) - set(campos):
+                self.fields.pop(nome)
+
+
+def _lista_do_parametro(query_params, nome):
+    valor = query_params.get(nome)
+    if valor is None:
+        return None
+    return [campo.strip() for campo in valor.split(',') if campo.strip()]
+
+
+def campos_solicitados(query_params, serializer_class, expansiveis):
+    """
+    Campos a serializar segundo ?fields= e ?expand=. Campos em `expansiveis`
+    (listas aninhadas) só entram se pedidos em expand ou em fields; sem nenhum
+    dos dois parâmetros, vale o serializer completo.
+    """
+    fields = _lista_do_parametro(query_params, 'fields')
+    expand = _lista_do_parametro(query_params, 'expand')
+    disponiveis = list(serializer_class().fields)
+    if fields is None and expand is None:
+        return disponiveis
+
+    erros = {}
+    invalidos = sorted(set(fields or []) - set(disponiveis))
+    if invalidos:
+        erros['fields'] = [f"Campos inexistentes: {', '.join(invalidos)}. Disponíveis: {', '.join(disponiveis)}"]
+    invalidos = sorted(set(expand or []) - set(expansiveis))
+    if invalidos:
+        erros['expand'] = [f"Expansões inexistentes: {', '.join(invalidos)}. Disponíveis: {', '.join(expansiveis)}"]
+    if erros:
+        raise serializers.ValidationError(erros)
+
+    selecionados = set(fields) if fields is not None else set(disponiveis) - set(expansiveis)
+    selecionados |= set(expand or [])
+    return [nome for nome in disponiveis if nome in selecionados]
+
+
+def otimizar_para_campos(queryset, serializer_class, campos, prefetches):
+    """
+    Restringe o queryset às colunas e joins que os `campos` do serializer usam:
+    only() das colunas, select_related só das relações lidas e prefetch só das
+    listas aninhadas pedidas (`prefetches`: {campo: lookup ou Prefetch}).
+    """
+    colunas = {queryset.model._meta.pk.name}
+    relacoes = set()
+    lookups_prefetch = []
+    declarados = serializer_class().fields
+    for nome in campos:
+        if nome in prefetches:
+            lookups_prefetch.append(prefetches[nome])
+            continue
+        atributos = declarados[nome].source_attrs
+        colunas.add('__'.join(atributos))
+        for fim in range(1, len(atributos)):
+            relacao = '__'.join(atributos[:fim])
+            relacoes.add(relacao)
+            colunas.add(relacao)
+    queryset = queryset.select_related(None).prefetch_related(None).only(*colunas)
+    if relacoes:
+        queryset = queryset.select_related(*sorted(relacoes))
+    return queryset.prefetch_related(*lookups_prefetch)
@@ -0,0 +1,121 @@
+"""
+Throttling com janela deslizante executada atomicamente no Redis.
+
+Os throttles padrão do DRF guardam a lista de timestamps no cache do Django:
+um get e um set por requisição, sujeitos a corrida entre workers. Aqui a janela
+(log em um sorted set) é avaliada e atualizada por um script Lua, em uma única
+ida ao Redis (EVALSHA).
+"""
+import logging
+import threading
+import uuid
+
+import redis
+from django.conf import settings
+from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle, UserRateThrottle
+
+logger = logging.getLogger(__name__)
+
+
+# KEYS[1]: chave da janela; ARGV: limite, duração (s), membro único.
+# Retorna {permitido, segundos até liberar} (o tempo vem do relógio do Redis).
+SCRIPT_JANELA_DESLIZANTE = """
+local tempo = redis.call('TIME')
+local agora = tonumber(tempo[1]) + tonumber(tempo[2]) / 1000000
+local limite = tonumber(ARGV[1])
+local duracao = tonumber(ARGV[2])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', agora - duracao)
+if redis.call('ZCARD', KEYS[1]) < limite then
+    redis.call('ZADD', KEYS[1], agora, ARGV[3])
+    redis.call('EXPIRE', KEYS[1], duracao)
+    return {1, '0'}
+end
+
+local primeira = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {0, tostring(tonumber(primeira[2]) + duracao - agora)}
+"""
+
+
+_cliente = None
+_script = None
+_lock = threading.Lock()
+
+
+def obter_script():
+    """Script registrado no cliente Redis do throttling (um pool por processo)."""
+    global _cliente, _script
+    if _script is None:
+        with _lock:
+            if _script is None:
+                _cliente = redis.Redis.from_url(settings.THROTTLE_REDIS_URL)
+                _script = _cliente.register_script(SCRIPT_JANELA_DESLIZANTE)
+    return _script
+
+
+def consumir(chave, limite, duracao):
+    """Registra uma requisição na janela. Retorna (permitido, espera_em_segundos)."""
+    permitido, espera = obter_script()(keys=[chave], args=[limite, duracao, uuid.uuid4().hex])
+    return bool(permitido), float(espera)
+
+
+class RedisThrottleMixin:
+    """Substitui o histórico em cache do SimpleRateThrottle pelo script atômico."""
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        try:
+            permitido, self.espera = consumir(self.key, self.num_requests, self.duration)
+        except redis.RedisError:
+            # Indisponibilidade do Redis não derruba a API: libera a requisição
+            logger.warning('Redis indisponível para throttling; requisição liberada', exc_info=True)
+            return True
+        return permitido
+
+    def wait(self):
+        return getattr(self, 'espera', None)
+
+
+class RedisAnonRateThrottle(RedisThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class RedisUserRateThrottle(RedisThrottleMixin, UserRateThrottle):
+    pass
+
+
+class RedisEndpointRateThrottle(RedisThrottleMixin, SimpleRateThrottle):
+    """
+    Taxa por endpoint. A view declara `throttle_scopes`, mapeando a action (ou o
+    método HTTP) para um escopo de DEFAULT_THROTTLE_RATES, p.ex.
+    {'create': 'orders-create'}. Actions sem escopo não são limitadas.
+    """
+
+    cache_format = 'throttle_%(scope)s_%(ident)s'
+
+    def __init__(self):
+        # A taxa depende da view; é resolvida em allow_request
+        pass
+
+    def allow_request(self, request, view):
+        escopos = getattr(view, 'throttle_scopes', {})
+        self.scope = escopos.get(getattr(view, 'action', None)) or escopos.get(request.method)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
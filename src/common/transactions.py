@@ -0,0 +1,123 @@
+"""
+Transações com retentativa automática em deadlock (MySQL 1213) e timeout de
+espera por lock (1205).
+
+A unidade inteira é reexecutada em uma nova transação, então só pode ser
+usada em funções cujo único efeito seja no banco (nada de chamadas externas
+ou eventos fora de transaction.on_commit).
+"""
+import functools
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, transaction
+
+logger = logging.getLogger(__name__)
+
+ERRO_DEADLOCK = 1213
+ERRO_LOCK_WAIT_TIMEOUT = 1205
+ERROS_RETENTAVEIS = (ERRO_DEADLOCK, ERRO_LOCK_WAIT_TIMEOUT)
+
+
+class TransacaoConcorrenteError(Exception):
+    def __init__(self, nome, tentativas, erro):
+        self.nome = nome
+        self.tentativas = tentativas
+        self.codigo = erro.args[0] if erro.args else None
+        super().__init__(
+            f"Operação interrompida por concorrência no banco após {tentativas} tentativa(s). "
+            f"Tente novamente."
+        )
+
+
+class MetricasRetentativa:
+    """Contadores por serviço, por processo."""
+
+    CAMPOS = ('execucoes', 'retentativas', 'sucessos_apos_retentativa', 'esgotadas')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contadores = defaultdict(lambda: dict.fromkeys(self.CAMPOS, 0))
+
+    def incrementar(self, nome, campo):
+        with self._lock:
+            self._contadores[nome][campo] += 1
+
+    def obter(self):
+        with self._lock:
+            return {nome: dict(contadores) for nome, contadores in self._contadores.items()}
+
+    def limpar(self):
+        with self._lock:
+            self._contadores.clear()
+
+
+metricas = MetricasRetentativa()
+
+
+def erro_retentavel(erro):
+    return isinstance(erro, OperationalError) and bool(erro.args) and erro.args[0] in ERROS_RETENTAVEIS
+
+
+def calcular_espera(tentativa, base, maximo):
+    """Backoff exponencial com jitter completo: uniforme em [0, min(maximo, base * 2^(n-1))]."""
+    return random.uniform(0, min(maximo, base * 2 ** (tentativa - 1)))
+
+
+def transacao_com_retentativa(funcao=None, *, nome=None, tentativas=None, using=DEFAULT_DB_ALIAS):
+    """
+    Substitui @transaction.atomic reexecutando a função em deadlock/lock wait
+    timeout, até TRANSACTION_RETRY_ATTEMPTS tentativas. Dentro de uma transação
+    já aberta não há retentativa (o rollback atinge a transação externa).
+    """
+    def decorador(funcao):
+        nome_metrica = nome or funcao.__qualname__
+
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            if transaction.get_connection(using).in_atomic_block:
+                with transaction.atomic(using=using):
+                    return funcao(*args, **kwargs)
+
+            maximo_tentativas = tentativas or settings.TRANSACTION_RETRY_ATTEMPTS
+            metricas.incrementar(nome_metrica, 'execucoes')
+            tentativa = 1
+            while True:
+                try:
+                    with transaction.atomic(using=using):
+                        resultado = funcao(*args, **kwargs)
+                except OperationalError as err:
+                    if not erro_retentavel(err):
+                        raise
+                    if tentativa >= maximo_tentativas:
+                        metricas.incrementar(nome_metrica, 'esgotadas')
+                        logger.warning(
+                            '%s: erro %s após %d tentativa(s); desistindo', nome_metrica, err.args[0], tentativa,
+                        )
+                        raise TransacaoConcorrenteError(nome_metrica, tentativa, err) from err
+
+                    espera = calcular_espera(
+                        tentativa, settings.TRANSACTION_RETRY_BASE_DELAY, settings.TRANSACTION_RETRY_MAX_DELAY,
+                    )
+                    metricas.incrementar(nome_metrica, 'retentativas')
+                    logger.info(
+                        '%s: erro %s na tentativa %d; nova tentativa em %.3fs',
+                        nome_metrica, err.args[0], tentativa, espera,
+                    )
+                    time.sleep(espera)
+                    tentativa += 1
+                    continue
+
+                if tentativa > 1:
+                    metricas.incrementar(nome_metrica, 'sucessos_apos_retentativa')
+                return resultado
+
+        return wrapper
+
+    if funcao is not None:
+        return decorador(funcao)
+    return decorador
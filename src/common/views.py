@@ -0,0 +1,104 @@
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .contagens import validadores_de_escrita
+from .serializers import BuscaEmLoteSerializer, projecao_para
+
+
+def resposta_conflito(err):
+    """409 com Retry-After para contenção de lock/transação (LockIndisponivelError, TransacaoConcorrenteError)."""
+    retry_after = getattr(err, 'retry_after', settings.LOCK_RETRY_AFTER)
+    return Response(
+        {'error': str(err), 'retry_after': retry_after},
+        status=status.HTTP_409_CONFLICT,
+        headers={'Retry-After': str(retry_after)},
+    )
+
+
+class ListagemProjetadaMixin:
+    """
+    Substitui o ``list()`` do ListModelMixin por uma projeção ``values_list()``:
+    mesma resposta do serializer da listagem, sem instanciar models nem passar
+    cada campo pela maquinaria do ModelSerializer. Desligável via
+    ``LISTAGEM_PROJETADA = False``.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not settings.LISTAGEM_PROJETADA:
+            return super().list(request, *args, **kwargs)
+
+        projecao = projecao_para(self.get_serializer_class())
+        queryset = projecao.projetar(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(projecao.serializar(page))
+
+        return Response(projecao.serializar(queryset))
+
+
+class ListagemCondicionalMixin:
+    """
+    GET condicional nas listagens. ETag e Last-Modified vêm das escritas registradas por
+    tabela em ``modelos_validador`` (common.contagens.validadores_de_escrita: só cache,
+    nenhuma query); se o cliente já tem essa versão (If-None-Match/If-Modified-Since) a
+    resposta é 304 sem corpo. Qualquer escrita confirmada na tabela, inclusive exclusões e
+    mudanças que tiram linhas do filtro, muda os validadores. Desligável via
+    ``LISTAGEM_CONDICIONAL = False``.
+    """
+    # Models cujas escritas mudam a listagem (inclua os de relações exibidas); padrão: o do queryset
+    modelos_validador = None
+
+    def list(self, request, *args, **kwargs):
+        if not settings.LISTAGEM_CONDICIONAL:
+            return super().list(request, *args, **kwargs)
+
+        validadores = validadores_de_escrita(self.modelos_validador or [self.get_queryset().model])
+        if validadores is None:
+            return super().list(request, *args, **kwargs)
+        versao, last_modified = validadores
+
+        # A representação depende também da query string (filtros, página) e do formato
+        chave = '|'.join(map(str, (request.get_full_path(), request.accepted_media_type, versao)))
+        etag = f'W/"{hashlib.md5(chave.encode()).hexdigest()}"'
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class BuscaEmLoteMixin:
+    """
+    ``GET <recurso>/batch-get/?ids=3,1,2`` ou ``POST <recurso>/batch-get/ {"ids": [...]}``:
+    busca todos os IDs com as mesmas queries de um único detalhe (uma por relação),
+    devolve na ordem pedida e lista em ``missing`` os que não existem.
+    Limite de IDs por chamada: ``BATCH_GET_MAX_IDS``.
+    """
+
+    @action(detail=False, methods=['get', 'post'], url_path='batch-get', url_name='batch-get')
+    def batch_get(self, request):
+        if request.method == 'GET':
+            dados = {'ids': [valor.strip() for valor in request.query_params.get('ids', '').split(',') if valor.strip()]}
+        else:
+            # O corpo vai inteiro ao serializer: lista ou escalar viram 400, não AttributeError
+            dados = request.data
+        serializer = BuscaEmLoteSerializer(data=dados)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+
+        encontrados = {objeto.pk: objeto for objeto in self.get_queryset().filter(pk__in=ids)}
+        objetos = [encontrados[id_] for id_ in ids if id_ in encontrados]
+        return Response({
+            'results': self.get_serializer(objetos, many=True).data,
+            'missing': [id_ for id_ in ids if id_ not in encontrados],
+        })
@@ -10,8 +10,14 @@ DEBUG = os.environ.get('DEBUG', 'True').lower() in ('true', '1', 'yes')
 ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
 
 
+# Perfil enxuto (ver common.inicializacao): admin e docs/schema carregados só no primeiro uso
+# e comandos de worker/cron sem checagens de sistema. Menos tempo de boot por worker e por cron.
+PERFIL_ENXUTO = os.environ.get('PERFIL_ENXUTO', 'False').lower() in ('true', '1', 'yes')
+
+
 DJANGO_APPS = [
-    'django.contrib.admin',
+    # SimpleAdminConfig não faz o autodiscover dos admin.py no setup (ver config.urls_admin)
+    'django.contrib.admin.apps.SimpleAdminConfig' if PERFIL_ENXUTO else 'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -31,6 +37,7 @@ LOCAL_APPS = [
     'clientes',
     'produtos',
     'pedidos',
+    'webhooks',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -44,6 +51,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Por último: o perfil cobre só a view
+    'common.profiling.PerfilRequisicaoMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -111,12 +120,47 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Backend JSON da API: 'orjson' (padrão, mais rápido) ou 'stdlib' (renderer/parser padrão do DRF)
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'orjson')
+
+JSON_BACKENDS = {
+    'orjson': ('common.renderers.ORJSONRenderer', 'common.parsers.ORJSONParser'),
+    'stdlib': ('rest_framework.renderers.JSONRenderer', 'rest_framework.parsers.JSONParser'),
+}
+
+JSON_RENDERER_CLASS, JSON_PARSER_CLASS = JSON_BACKENDS[JSON_BACKEND]
+
+
+# Listagens de pedidos, produtos e clientes via projeção values_list (ver common.views)
+LISTAGEM_PROJETADA = os.environ.get('LISTAGEM_PROJETADA', 'True').lower() in ('true', '1', 'yes')
+
+# Importação de clientes em lote (ver clientes.services.ImportarClientesService): linhas por
+# validação/INSERT e máximo de erros devolvidos na resposta (os demais só são contados)
+CLIENTES_IMPORTACAO_LOTE = int(os.environ.get('CLIENTES_IMPORTACAO_LOTE', '1000'))
+CLIENTES_IMPORTACAO_MAX_ERROS = int(os.environ.get('CLIENTES_IMPORTACAO_MAX_ERROS', '1000'))
+
+# Upsert do catálogo por SKU (ver produtos.services.SincronizarCatalogoService)
+PRODUTOS_SINCRONIZACAO_LOTE = int(os.environ.get('PRODUTOS_SINCRONIZACAO_LOTE', '1000'))
+PRODUTOS_SINCRONIZACAO_MAX_ERROS = int(os.environ.get('PRODUTOS_SINCRONIZACAO_MAX_ERROS', '1000'))
+
+# Ajuste de estoque em lote (ver produtos.services.AjustarEstoqueEmLoteService): itens por
+# chamada e itens por transação (um SELECT ... FOR UPDATE e um UPDATE por transação)
+PRODUTOS_ESTOQUE_MAX_ITENS = int(os.environ.get('PRODUTOS_ESTOQUE_MAX_ITENS', '10000'))
+PRODUTOS_ESTOQUE_LOTE = int(os.environ.get('PRODUTOS_ESTOQUE_LOTE', '500'))
+
+# Máximo de IDs por chamada dos endpoints batch-get (ver common.views.BuscaEmLoteMixin)
+BATCH_GET_MAX_IDS = int(os.environ.get('BATCH_GET_MAX_IDS', '100'))
+
+# ETag/Last-Modified nas listagens e 304 para If-None-Match/If-Modified-Since (ver common.views)
+LISTAGEM_CONDICIONAL = os.environ.get('LISTAGEM_CONDICIONAL', 'True').lower() in ('true', '1', 'yes')
+
+
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        JSON_RENDERER_CLASS,
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        JSON_PARSER_CLASS,
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -126,20 +170,122 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
+        'common.throttling.RedisAnonRateThrottle',
+        'common.throttling.RedisUserRateThrottle',
+        'common.throttling.RedisEndpointRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/minute',
         'user': '200/minute',
+        # Escopos por endpoint (throttle_scopes das views)
+        'orders-create': '20/minute',
     },
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'common.pagination.PaginacaoContagemEstimada',
     'PAGE_SIZE': 10,
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # O router lê o atributo schema de cada viewset ao montar as rotas; no perfil enxuto
+    # isso não carrega o drf_spectacular (ver common.schemas.AutoSchemaAdiado)
+    'DEFAULT_SCHEMA_CLASS': (
+        'common.schemas.AutoSchemaAdiado' if PERFIL_ENXUTO else 'drf_spectacular.openapi.AutoSchema'
+    ),
 }
 
 
+# Contagem das listagens paginadas (ver common.pagination): exata e em cache por PAGINACAO_CONTAGEM_TTL s
+# até PAGINACAO_CONTAGEM_LIMITE linhas; acima disso, estimada pelo otimizador. TTL 0 desliga o cache.
+PAGINACAO_CONTAGEM_LIMITE = int(os.environ.get('PAGINACAO_CONTAGEM_LIMITE', '10000'))
+PAGINACAO_CONTAGEM_TTL = int(os.environ.get('PAGINACAO_CONTAGEM_TTL', '30'))
+
+
+# Redis usado pelo throttling (janela deslizante em script Lua, ver common.throttling)
+THROTTLE_REDIS_URL = os.environ.get('THROTTLE_REDIS_URL', os.environ.get('REDIS_URL', 'redis://redis:6379/1'))
+
+
+# Retentativa de transações em deadlock/lock wait timeout (ver common.transactions)
+TRANSACTION_RETRY_ATTEMPTS = int(os.environ.get('TRANSACTION_RETRY_ATTEMPTS', '3'))
+TRANSACTION_RETRY_BASE_DELAY = float(os.environ.get('TRANSACTION_RETRY_BASE_DELAY', '0.05'))
+TRANSACTION_RETRY_MAX_DELAY = float(os.environ.get('TRANSACTION_RETRY_MAX_DELAY', '1.0'))
+
+
+# Modo de lock de linha por operação: 'nowait', 'timeout' (LOCK_WAIT_TIMEOUT s) ou 'bloqueante'
+# (ver common.locks). Contenção responde 409 com Retry-After: LOCK_RETRY_AFTER.
+LOCK_MODE_DEFAULT = os.environ.get('LOCK_MODE_DEFAULT', 'timeout')
+LOCK_MODES = {
+    'pedidos.criar': os.environ.get('LOCK_MODE_CRIAR_PEDIDO', 'timeout'),
+    'pedidos.alterar_status': os.environ.get('LOCK_MODE_ALTERAR_STATUS', 'nowait'),
+    'pedidos.cancelar': os.environ.get('LOCK_MODE_CANCELAR_PEDIDO', 'nowait'),
+    'pedidos.cancelar.estoque': os.environ.get('LOCK_MODE_CANCELAR_ESTOQUE', 'timeout'),
+    'pedidos.expirar.estoque': os.environ.get('LOCK_MODE_EXPIRAR_ESTOQUE', 'timeout'),
+    'produtos.estoque_em_lote': os.environ.get('LOCK_MODE_ESTOQUE_EM_LOTE', 'timeout'),
+}
+LOCK_WAIT_TIMEOUT = int(os.environ.get('LOCK_WAIT_TIMEOUT', '5'))
+LOCK_RETRY_AFTER = int(os.environ.get('LOCK_RETRY_AFTER', '1'))
+
+
+# Worker de separação (comando processar_pedidos)
+PROCESSAMENTO_LOTE = int(os.environ.get('PROCESSAMENTO_LOTE', '10'))
+PROCESSAMENTO_INTERVALO = float(os.environ.get('PROCESSAMENTO_INTERVALO', '2'))
+PROCESSAMENTO_HANDLER = os.environ.get('PROCESSAMENTO_HANDLER', 'pedidos.workers.registrar_processamento')
+
+
+# Expiração de pedidos pendentes (comando expirar_pedidos_pendentes)
+PEDIDO_PENDENTE_TTL_MINUTOS = int(os.environ.get('PEDIDO_PENDENTE_TTL_MINUTOS', '1440'))
+EXPIRACAO_LOTE = int(os.environ.get('EXPIRACAO_LOTE', '100'))
+EXPIRACAO_PAUSA = float(os.environ.get('EXPIRACAO_PAUSA', '0.5'))
+
+
+# Contadores de pedidos por status (ver pedidos.repositories.ContadorStatusPedidoRepository).
+# O total geral é dividido em SLOTS linhas por status para reduzir disputa de lock.
+PEDIDOS_CONTADORES_SLOTS = int(os.environ.get('PEDIDOS_CONTADORES_SLOTS', '8'))
+PEDIDOS_CONTADORES_POR_CLIENTE = os.environ.get('PEDIDOS_CONTADORES_POR_CLIENTE', 'False').lower() in ('true', '1', 'yes')
+PEDIDOS_STATS_CACHE_TTL = int(os.environ.get('PEDIDOS_STATS_CACHE_TTL', '2'))
+
+
+# Eventos de pedido: buffer em memória esvaziado em lotes por uma thread (ver common.events).
+# Backpressure com buffer cheio: 'descartar_novo', 'descartar_antigo' ou 'bloquear'.
+# EVENTOS_SINK aceita vários caminhos separados por vírgula.
+EVENTOS_SINK = os.environ.get('EVENTOS_SINK', 'common.events.sink_log')
+EVENTOS_ASSINCRONOS = os.environ.get('EVENTOS_ASSINCRONOS', 'True').lower() in ('true', '1', 'yes')
+EVENTOS_BUFFER = int(os.environ.get('EVENTOS_BUFFER', '1000'))
+EVENTOS_LOTE = int(os.environ.get('EVENTOS_LOTE', '100'))
+EVENTOS_INTERVALO_FLUSH = float(os.environ.get('EVENTOS_INTERVALO_FLUSH', '1.0'))
+EVENTOS_BACKPRESSURE = os.environ.get('EVENTOS_BACKPRESSURE', 'descartar_novo')
+
+
+# Webhooks (comando entregar_webhooks)
+WEBHOOK_CONCORRENCIA = int(os.environ.get('WEBHOOK_CONCORRENCIA', '8'))
+WEBHOOK_LOTE = int(os.environ.get('WEBHOOK_LOTE', '50'))
+WEBHOOK_EVENTOS_POR_ENTREGA = int(os.environ.get('WEBHOOK_EVENTOS_POR_ENTREGA', '100'))
+WEBHOOK_TIMEOUT = float(os.environ.get('WEBHOOK_TIMEOUT', '5'))
+# 0 deriva o lease do pior caso do ciclo (ver webhooks.entrega.calcular_lease_minimo)
+WEBHOOK_LEASE = int(os.environ.get('WEBHOOK_LEASE', '0'))
+WEBHOOK_MAX_TENTATIVAS = int(os.environ.get('WEBHOOK_MAX_TENTATIVAS', '8'))
+WEBHOOK_BACKOFF_BASE = float(os.environ.get('WEBHOOK_BACKOFF_BASE', '5'))
+WEBHOOK_BACKOFF_MAX = float(os.environ.get('WEBHOOK_BACKOFF_MAX', '3600'))
+WEBHOOK_INTERVALO = float(os.environ.get('WEBHOOK_INTERVALO', '1'))
+
+
+# Health checks: intervalo das probes em segundo plano e idade máxima aceita do resultado
+HEALTH_PROBE_INTERVAL = float(os.environ.get('HEALTH_PROBE_INTERVAL', '5'))
+HEALTH_PROBE_MAX_AGE = float(os.environ.get('HEALTH_PROBE_MAX_AGE', str(HEALTH_PROBE_INTERVAL * 3)))
+HEALTH_PROBE_BACKGROUND = os.environ.get('HEALTH_PROBE_BACKGROUND', 'True').lower() in ('true', '1', 'yes')
+
+
+# Profiling sob demanda (ver common.profiling): requisições com X-Profile: <PROFILING_TOKEN> ou que
+# caem em PROFILING_AMOSTRAGEM ('METODO /prefixo/=taxa', separadas por vírgula). Sem token nem regras
+# o middleware não é carregado. Modo 'deterministico' (cProfile) ou 'amostragem' (pilhas a cada intervalo).
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN', '')
+PROFILING_AMOSTRAGEM = os.environ.get('PROFILING_AMOSTRAGEM', '')
+PROFILING_MODO = os.environ.get('PROFILING_MODO', 'deterministico')
+PROFILING_INTERVALO_AMOSTRAGEM = float(os.environ.get('PROFILING_INTERVALO_AMOSTRAGEM', '0.001'))
+PROFILING_DIR = os.environ.get('PROFILING_DIR', '/tmp/erp_perfis')
+PROFILING_MAX_PERFIS = int(os.environ.get('PROFILING_MAX_PERFIS', '100'))
+
+
+# Baseline versionado dos planos de consulta (ver comando verificar_planos_consulta)
+QUERY_PLANS_BASELINE = os.environ.get('QUERY_PLANS_BASELINE', str(BASE_DIR / 'query_plans_baseline.json'))
+
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'ERP API',
     'DESCRIPTION': 'API para gestão de pedidos, clientes e produtos',
@@ -34,6 +34,20 @@ REST_FRAMEWORK['DEFAULT_THROTTLE_CLASSES'] = []
 REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = {}
 
 
+# Probes de health na própria requisição (sem thread em segundo plano) e sem cache entre chamadas
+HEALTH_PROBE_BACKGROUND = False
+HEALTH_PROBE_INTERVAL = 0
+
+
+# Contagens das listagens e estatísticas sem cache entre testes (o cache local sobreviveria ao rollback)
+PAGINACAO_CONTAGEM_TTL = 0
+PEDIDOS_STATS_CACHE_TTL = 0
+
+
+# Eventos entregues ao sink no commit, sem thread em segundo plano
+EVENTOS_ASSINCRONOS = False
+
+
 # Desabilita migrações para testes mais rápidos
 class DisableMigrations:
     def __contains__(self, item):
@@ -1,15 +1,31 @@
-from django.contrib import admin
-from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from django.conf import settings
+from django.urls import URLResolver, include, path
+from django.urls.resolvers import RoutePattern
+
+
+def include_adiado(rota, urlconf, namespace=None):
+    """
+    Como path(rota, include(urlconf)), mas o módulo só é importado quando uma URL
+    sob `rota` é resolvida (ou, sem namespace, no primeiro reverse()).
+    """
+    return URLResolver(RoutePattern(rota, is_endpoint=False), urlconf, app_name=namespace, namespace=namespace)
+
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('health/', include('health.urls')),
     path('api/v1/', include('clientes.urls')),
     path('api/v1/', include('produtos.urls')),
     path('api/v1/', include('pedidos.urls')),
-    
-    # OpenAPI Schema e Documentação
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
 ]
+
+if settings.PERFIL_ENXUTO:
+    # Admin e OpenAPI (drf_spectacular) fora do boot dos workers: carregados na primeira requisição a eles
+    urlpatterns += [
+        include_adiado('admin/', 'config.urls_admin', namespace='admin'),
+        include_adiado('api/', 'config.urls_docs'),
+    ]
+else:
+    urlpatterns += [
+        path('admin/', include(('config.urls_admin', 'admin'), namespace='admin')),
+        path('api/', include('config.urls_docs')),
+    ]
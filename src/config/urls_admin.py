@@ -0,0 +1,7 @@
+from django.contrib import admin
+
+# No-op com django.contrib.admin (já feito no setup); no perfil enxuto, com
+# SimpleAdminConfig, registra os admin.py na primeira requisição ao admin
+admin.autodiscover()
+
+urlpatterns = admin.site.get_urls()
@@ -2,6 +2,9 @@ import pytest
 from decimal import Decimal
 
 
+pytest_plugins = ['common.pytest_plugin']
+
+
 @pytest.fixture
 def api_client():
     from rest_framework.test import APIClient
@@ -0,0 +1,127 @@
+"""
+Probes de prontidão executadas fora do ciclo da requisição.
+
+Uma thread em segundo plano (por processo) roda as probes a cada
+HEALTH_PROBE_INTERVAL segundos e guarda o último resultado; o endpoint de
+readiness apenas lê esse resultado. Com HEALTH_PROBE_BACKGROUND desligado, as
+probes rodam na própria requisição quando o resultado expira.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def verificar_banco():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def verificar_cache():
+    cache.set('health_check', 'ok', 10)
+    if cache.get('health_check') != 'ok':
+        raise Exception('Cache read/write failed')
+
+
+PROBES = {
+    'database': verificar_banco,
+    'cache': verificar_cache,
+}
+
+
+class MonitorProntidao:
+    def __init__(self, probes, intervalo, idade_maxima=None, em_segundo_plano=True):
+        self.probes = probes
+        self.intervalo = intervalo
+        self.idade_maxima = idade_maxima or intervalo * 3
+        self.em_segundo_plano = em_segundo_plano
+        # (resultados, time.monotonic() da coleta); substituído atomicamente
+        self._ultimo = None
+        self._thread = None
+        self._lock_thread = threading.Lock()
+        self._lock_execucao = threading.Lock()
+
+    def executar_probes(self):
+        resultados = {}
+        for nome, probe in self.probes.items():
+            inicio = time.perf_counter()
+            try:
+                probe()
+                resultado = {'status': 'healthy'}
+            except Exception as err:
+                resultado = {'status': 'unhealthy', 'error': str(err)}
+            resultado['latency_ms'] = round((time.perf_counter() - inicio) * 1000, 2)
+            resultado['checked_at'] = timezone.now().isoformat()
+            resultados[nome] = resultado
+
+        self._ultimo = (resultados, time.monotonic())
+        return resultados
+
+    def iniciar(self):
+        with self._lock_thread:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, name='health-probes', daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            try:
+                self.executar_probes()
+            except Exception:
+                logger.exception('Falha inesperada ao executar probes de prontidão')
+            finally:
+                # A thread tem conexão própria; não a mantém aberta entre execuções
+                connection.close()
+            time.sleep(self.intervalo)
+
+    def obter_estado(self):
+        """Retorna (saudavel, resultados, idade_em_segundos) sem tocar nas dependências."""
+        if self.em_segundo_plano:
+            self.iniciar()
+
+        ultimo = self._ultimo
+        expirado = ultimo is None or (
+            not self.em_segundo_plano and time.monotonic() - ultimo[1] >= self.intervalo
+        )
+        if expirado:
+            # Primeira chamada (ou modo síncrono): coleta uma vez, sem concorrência
+            with self._lock_execucao:
+                if self._ultimo is ultimo:
+                    self.executar_probes()
+            ultimo = self._ultimo
+
+        resultados, coletado_em = ultimo
+        idade = time.monotonic() - coletado_em
+        if idade > self.idade_maxima:
+            resultados = {
+                nome: {**resultado, 'status': 'unhealthy', 'error': f'Resultado obsoleto ({idade:.1f}s)'}
+                for nome, resultado in resultados.items()
+            }
+
+        saudavel = all(resultado['status'] == 'healthy' for resultado in resultados.values())
+        return saudavel, resultados, round(idade, 3)
+
+
+_monitor = None
+_lock_monitor = threading.Lock()
+
+
+def obter_monitor():
+    global _monitor
+    if _monitor is None:
+        with _lock_monitor:
+            if _monitor is None:
+                _monitor = MonitorProntidao(
+                    PROBES,
+                    intervalo=settings.HEALTH_PROBE_INTERVAL,
+                    idade_maxima=settings.HEALTH_PROBE_MAX_AGE,
+                    em_segundo_plano=settings.HEALTH_PROBE_BACKGROUND,
+                )
+    return _monitor
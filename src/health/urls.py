@@ -5,4 +5,6 @@ app_name = 'health'
 
 urlpatterns = [
     path('', views.health_check, name='health-check'),
+    path('live', views.liveness, name='liveness'),
+    path('ready', views.readiness, name='readiness'),
 ]
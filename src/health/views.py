@@ -1,40 +1,67 @@
-from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from django.db import connection
-from django.core.cache import cache
+from rest_framework.views import APIView
 
+from .probes import obter_monitor
 
-@api_view(['GET'])
-def health_check(request):
+
+class ProbeView(APIView):
+    """
+    Probes de orquestrador não passam por autenticação nem throttling (que
+    consultariam o cache). Classes e não @api_view: o decorator instancia o
+    schema ao importar o módulo, antes do AutoSchemaAdiado poder escolher o
+    do drf_spectacular (ver common.schemas).
+    """
+    authentication_classes = []
+    permission_classes = []
+    throttle_classes = []
+
+
+class LivenessView(ProbeView):
+    def get(self, request):
+        """
+        Liveness: o processo está de pé e respondendo. Não toca em dependências.
+        """
+        return Response({'status': 'alive'}, status=status.HTTP_200_OK)
+
+
+class ReadinessView(ProbeView):
+    def get(self, request):
+        """
+        Readiness: último resultado das probes de banco e cache, coletado em segundo
+        plano, com a latência de cada dependência.
+        """
+        saudavel, resultados, idade = obter_monitor().obter_estado()
+
+        health_status = self.montar_estado(saudavel, resultados, idade)
+
+        status_code = status.HTTP_200_OK if saudavel else status.HTTP_503_SERVICE_UNAVAILABLE
+
+        return Response(health_status, status=status_code)
+
+    def montar_estado(self, saudavel, resultados, idade):
+        return {
+            'status': 'healthy' if saudavel else 'unhealthy',
+            **{nome: resultado['status'] for nome, resultado in resultados.items()},
+            'checks': resultados,
+            'age_seconds': idade,
+        }
+
+
+class HealthCheckView(ReadinessView):
     """
-    Endpoint para verificar a saúde da aplicação.
+    /health/ legado: o mesmo que readiness, mais as chaves database_error e
+    cache_error no topo da resposta, como antes da separação das probes.
     """
-    health_status = {
-        'status': 'healthy',
-        'database': 'healthy',
-        'cache': 'healthy',
-    }
-    
-    # Vendo a conexão com o banco de dados
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute('SELECT 1')
-    except Exception as err:
-        health_status['database'] = 'unhealthy'
-        health_status['database_error'] = str(err)
-        health_status['status'] = 'unhealthy'
-    
-    # Vendo se aplicação consegue ler e escrever no cache
-    try:
-        cache.set('health_check', 'ok', 10)
-        if cache.get('health_check') != 'ok':
-            raise Exception('Cache read/write failed')
-    except Exception as err:
-        health_status['cache'] = 'unhealthy'
-        health_status['cache_error'] = str(err)
-        health_status['status'] = 'unhealthy'
-    
-    status_code = status.HTTP_200_OK if health_status['status'] == 'healthy' else status.HTTP_503_SERVICE_UNAVAILABLE
-    
-    return Response(health_status, status=status_code)
+
+    def montar_estado(self, saudavel, resultados, idade):
+        health_status = super().montar_estado(saudavel, resultados, idade)
+        for nome, resultado in resultados.items():
+            if 'error' in resultado:
+                health_status[f'{nome}_error'] = resultado['error']
+        return health_status
+
+
+liveness = LivenessView.as_view()
+readiness = ReadinessView.as_view()
+health_check = HealthCheckView.as_view()
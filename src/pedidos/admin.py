@@ -1,11 +1,21 @@
 from django.contrib import admin
+
+from common.admin import AdminGrandeVolumeMixin
 from .models import Pedido, ItemPedido, HistoricoStatusPedido
 
 
 class ItemPedidoInline(admin.TabularInline):
     model = ItemPedido
     extra = 0
-    readonly_fields = ['subtotal']
+    # Produto somente leitura: o widget de um FK editável faz uma consulta por linha.
+    # Itens novos entram pelo CriarPedidoService, que reserva o estoque.
+    readonly_fields = ['produto', 'preco_unitario', 'subtotal']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('pedido', 'produto')
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 class HistoricoStatusPedidoInline(admin.TabularInline):
@@ -14,27 +24,41 @@ class HistoricoStatusPedidoInline(admin.TabularInline):
     readonly_fields = ['status_anterior', 'status_novo', 'alterado_por', 'created_at']
     can_delete = False
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('pedido')
+
 
 @admin.register(Pedido)
-class PedidoAdmin(admin.ModelAdmin):
+class PedidoAdmin(AdminGrandeVolumeMixin, admin.ModelAdmin):
     list_display = ['id', 'numero', 'cliente', 'status', 'valor_total', 'created_at']
-    list_filter = ['status', 'created_at']
-    search_fields = ['numero', 'cliente__nome', 'cliente__cpf_cnpj']
+    list_select_related = ['cliente']
+    list_filter = ['status']
+    date_hierarchy = 'created_at'
+    # '=' e '^' viram igualdade e LIKE 'x%', que usam os índices de numero, cpf_cnpj e nome
+    search_fields = ['=numero', '=cliente__cpf_cnpj', '^cliente__nome']
+    search_help_text = 'Número exato do pedido, CPF/CNPJ exato ou início do nome do cliente'
+    autocomplete_fields = ['cliente']
     readonly_fields = ['numero', 'chave_idempotencia', 'valor_total', 'created_at', 'updated_at']
     inlines = [ItemPedidoInline, HistoricoStatusPedidoInline]
     ordering = ['-created_at']
 
 
 @admin.register(ItemPedido)
-class ItemPedidoAdmin(admin.ModelAdmin):
+class ItemPedidoAdmin(AdminGrandeVolumeMixin, admin.ModelAdmin):
     list_display = ['id', 'pedido', 'produto', 'quantidade', 'preco_unitario', 'subtotal']
+    list_select_related = ['pedido', 'produto']
     list_filter = ['pedido__status']
-    search_fields = ['pedido__numero', 'produto__nome', 'produto__sku']
+    search_fields = ['=pedido__numero', '=produto__sku', '^produto__nome']
+    search_help_text = 'Número exato do pedido, SKU exato ou início do nome do produto'
+    raw_id_fields = ['pedido']
+    autocomplete_fields = ['produto']
 
 
 @admin.register(HistoricoStatusPedido)
-class HistoricoStatusPedidoAdmin(admin.ModelAdmin):
+class HistoricoStatusPedidoAdmin(AdminGrandeVolumeMixin, admin.ModelAdmin):
     list_display = ['id', 'pedido', 'status_anterior', 'status_novo', 'alterado_por', 'created_at']
-    list_filter = ['status_novo', 'created_at']
-    search_fields = ['pedido__numero']
+    list_select_related = ['pedido']
+    list_filter = ['status_novo']
+    date_hierarchy = 'created_at'
+    search_fields = ['=pedido__numero']
     readonly_fields = ['pedido', 'status_anterior', 'status_novo', 'alterado_por', 'created_at']
@@ -5,3 +5,7 @@ class PedidosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pedidos'
     verbose_name = 'Pedidos'
+
+    def ready(self):
+        from common.contagens import registrar_invalidacao_de_contagens
+        registrar_invalidacao_de_contagens(self.get_model('Pedido'))
@@ -1,7 +1,9 @@
-import logging
 from enum import Enum
 
-logger = logging.getLogger(__name__)
+from django.utils import timezone
+
+from common.events import publicar_apos_commit
+from webhooks.services import RegistrarEntregasService
 
 
 class EventoPedido(str, Enum):
@@ -14,12 +16,22 @@ class EventoPedido(str, Enum):
     PEDIDO_CANCELADO = 'pedido.cancelado'
 
 
+def emitir_eventos(eventos):
+    """
+    Emite eventos de pedido [(evento, payload)]. As entregas de webhook são
+    gravadas na transação corrente (outbox): confirmadas junto com a mudança de
+    status ou desfeitas com ela. O sink de EVENTOS_SINK recebe os eventos só
+    após o commit, pelo emissor com buffer de common.events.
+    """
+    emitido_em = timezone.now().isoformat()
+    RegistrarEntregasService().executar([
+        {'evento': evento.value, 'payload': payload, 'emitido_em': emitido_em}
+        for evento, payload in eventos
+    ])
+    for evento, payload in eventos:
+        publicar_apos_commit(evento.value, payload)
+
+
 def emitir_evento(evento, payload):
-    """Emite um evento de pedido (loga por enquanto)."""
-    logger.info(
-        "Evento emitido: %s | Payload: %s",
-        evento.value,
-        payload
-    )
-    
-    # TODO - Willyam cutrim: Implementar emissão de eventos (Redis pub/sub, Celery, etc.) esquece ñ papai
+    """Emite um único evento de pedido (ver emitir_eventos)."""
+    emitir_eventos([(evento, payload)])
@@ -0,0 +1,46 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from common.comandos import ComandoEnxutoMixin
+from pedidos.services import ExpirarPedidosPendentesService
+
+
+class Command(ComandoEnxutoMixin, BaseCommand):
+    help = (
+        'Cancela pedidos pendentes mais antigos que o TTL, em lotes transacionais, devolvendo '
+        'o estoque reservado. Pode rodar via cron ou continuamente (--repetir) em vários nós.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl-minutos', type=int, default=settings.PEDIDO_PENDENTE_TTL_MINUTOS,
+                            help='Idade mínima (min) de um pedido pendente para expirar.')
+        parser.add_argument('--lote', type=int, default=settings.EXPIRACAO_LOTE,
+                            help='Pedidos por transação.')
+        parser.add_argument('--pausa', type=float, default=settings.EXPIRACAO_PAUSA,
+                            help='Pausa (s) entre lotes.')
+        parser.add_argument('--max-lotes', type=int, default=None,
+                            help='Encerra após N lotes (o restante fica para a próxima execução).')
+        parser.add_argument('--repetir', type=float, default=None, metavar='SEGUNDOS',
+                            help='Executa continuamente, aguardando SEGUNDOS entre execuções.')
+
+    def handle(self, *args, **options):
+        service = ExpirarPedidosPendentesService()
+        while True:
+            total = service.executar(
+                ttl=timedelta(minutes=options['ttl_minutos']),
+                lote=options['lote'],
+                pausa=options['pausa'],
+                max_lotes=options['max_lotes'],
+            )
+            self.stdout.write(self.style.SUCCESS(f'{total} pedido(s) pendente(s) expirado(s)'))
+            if options['repetir'] is None:
+                return
+            # Como no entregador de webhooks: a conexão não atravessa a espera, em que um
+            # restart do MySQL ou o wait_timeout a derrubariam
+            if not connection.in_atomic_block:
+                connection.close()
+            time.sleep(options['repetir'])
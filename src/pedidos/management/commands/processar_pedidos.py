@@ -0,0 +1,44 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from common.comandos import ComandoEnxutoMixin
+from pedidos.workers import WorkerProcessamento, identificador_padrao
+
+
+class Command(ComandoEnxutoMixin, BaseCommand):
+    help = (
+        'Worker de separação: reivindica pedidos confirmados em lotes (SELECT ... FOR UPDATE '
+        'SKIP LOCKED), move-os para em_processamento e entrega cada um ao handler.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=settings.PROCESSAMENTO_LOTE,
+                            help='Pedidos reivindicados por ciclo.')
+        parser.add_argument('--intervalo', type=float, default=settings.PROCESSAMENTO_INTERVALO,
+                            help='Espera (s) quando a fila está vazia.')
+        parser.add_argument('--worker', default=None, help='Identificador gravado no histórico (alterado_por).')
+        parser.add_argument('--handler', default=settings.PROCESSAMENTO_HANDLER,
+                            help='Caminho do callable que recebe cada pedido reivindicado.')
+        parser.add_argument('--max-ciclos', type=int, default=None, help='Encerra após N ciclos.')
+
+    def handle(self, *args, **options):
+        worker = WorkerProcessamento(
+            processar=import_string(options['handler']),
+            lote=options['lote'],
+            intervalo_ocioso=options['intervalo'],
+            identificador=options['worker'] or identificador_padrao(),
+        )
+
+        def encerrar(signum, frame):
+            self.stdout.write('Encerrando após o ciclo atual...')
+            worker.parar.set()
+
+        signal.signal(signal.SIGTERM, encerrar)
+        signal.signal(signal.SIGINT, encerrar)
+
+        self.stdout.write(f'Worker {worker.identificador} iniciado (lote={worker.lote})')
+        total = worker.executar(max_ciclos=options['max_ciclos'])
+        self.stdout.write(self.style.SUCCESS(f'{total} pedido(s) reivindicado(s)'))
@@ -0,0 +1,27 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from common.comandos import ComandoEnxutoMixin
+from pedidos.repositories import ContadorStatusPedidoRepository
+
+
+class Command(ComandoEnxutoMixin, BaseCommand):
+    help = (
+        'Recalcula os contadores de pedidos por status a partir da tabela de pedidos, '
+        'corrigindo desvios (p.ex. status alterado fora dos services, pelo admin).'
+    )
+
+    def handle(self, *args, **options):
+        repository = ContadorStatusPedidoRepository()
+        antes = repository.totais_por_status()
+        repository.reconstruir()
+        depois = repository.totais_por_status()
+        cache.delete('pedidos:stats:todos')
+
+        for status, total in depois.items():
+            desvio = total - antes[status]
+            if desvio:
+                self.stdout.write(f'{status}: {antes[status]} -> {total} ({desvio:+d})')
+        self.stdout.write(self.style.SUCCESS(
+            f'Contadores reconstruídos: {sum(depois.values())} pedido(s)'
+        ))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pedidos", "0002_alter_pedido_numero"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="pedido",
+            name="idx_pedido_cliente_status",
+        ),
+        migrations.RemoveIndex(
+            model_name="pedido",
+            name="idx_pedido_status_created",
+        ),
+        migrations.AddIndex(
+            model_name="pedido",
+            index=models.Index(
+                fields=["deleted_at", "created_at"], name="idx_pedido_deleted_created"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pedido",
+            index=models.Index(
+                fields=["cliente", "deleted_at", "created_at"],
+                name="idx_pedido_cliente_created",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pedido",
+            index=models.Index(
+                fields=["cliente", "status", "deleted_at", "created_at"],
+                name="idx_pedido_cliente_status",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pedido",
+            index=models.Index(
+                fields=["status", "deleted_at", "created_at"],
+                name="idx_pedido_status_created",
+            ),
+        ),
+    ]
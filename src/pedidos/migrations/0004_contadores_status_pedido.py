@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0003_indices_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorStatusPedido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cliente_id', models.PositiveBigIntegerField(default=0, help_text='0 = todos os clientes', verbose_name='Cliente')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('confirmado', 'Confirmado'), ('em_processamento', 'Em Processamento'), ('enviado', 'Enviado'), ('entregue', 'Entregue'), ('cancelado', 'Cancelado')], max_length=20, verbose_name='Status')),
+                ('slot', models.PositiveSmallIntegerField(default=0, verbose_name='Slot')),
+                ('total', models.BigIntegerField(default=0, verbose_name='Total')),
+            ],
+            options={
+                'verbose_name': 'Contador de Status',
+                'verbose_name_plural': 'Contadores de Status',
+                'db_table': 'contadores_status_pedido',
+                'constraints': [models.UniqueConstraint(fields=('cliente_id', 'status', 'slot'), name='unique_contador_status_slot')],
+            },
+        ),
+    ]
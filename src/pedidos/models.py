@@ -53,9 +53,15 @@ class Pedido(TimestampMixin, SoftDeleteMixin):
         verbose_name = 'Pedido'
         verbose_name_plural = 'Pedidos'
         ordering = ['-created_at']
+        # Toda consulta do PedidoManager filtra deleted_at IS NULL, por isso deleted_at
+        # entra nos compostos logo antes da coluna de ordenação (created_at).
         indexes = [
-            models.Index(fields=['cliente', 'status'], name='idx_pedido_cliente_status'),
-            models.Index(fields=['status', 'created_at'], name='idx_pedido_status_created'),
+            models.Index(fields=['deleted_at', 'created_at'], name='idx_pedido_deleted_created'),
+            models.Index(fields=['cliente', 'deleted_at', 'created_at'], name='idx_pedido_cliente_created'),
+            models.Index(
+                fields=['cliente', 'status', 'deleted_at', 'created_at'], name='idx_pedido_cliente_status'
+            ),
+            models.Index(fields=['status', 'deleted_at', 'created_at'], name='idx_pedido_status_created'),
             models.Index(fields=['numero'], name='idx_pedido_numero'),
         ]
         constraints = [
@@ -153,3 +159,28 @@ class HistoricoStatusPedido(models.Model):
     
     def __str__(self):
         return f'{self.pedido.numero}: {self.status_anterior} -> {self.status_novo}'
+
+
+class ContadorStatusPedido(models.Model):
+    """
+    Quantidade de pedidos por status, ajustada na mesma transação que muda o status.
+
+    cliente_id = 0 guarda o total geral; com PEDIDOS_CONTADORES_POR_CLIENTE também
+    há linhas por cliente. O total geral é dividido em `slot`s (somados na leitura)
+    para que criações concorrentes não disputem a mesma linha.
+    """
+    cliente_id = models.PositiveBigIntegerField('Cliente', default=0, help_text='0 = todos os clientes')
+    status = models.CharField('Status', max_length=20, choices=StatusPedido.choices)
+    slot = models.PositiveSmallIntegerField('Slot', default=0)
+    total = models.BigIntegerField('Total', default=0)
+    
+    class Meta:
+        db_table = 'contadores_status_pedido'
+        verbose_name = 'Contador de Status'
+        verbose_name_plural = 'Contadores de Status'
+        constraints = [
+            models.UniqueConstraint(fields=['cliente_id', 'status', 'slot'], name='unique_contador_status_slot'),
+        ]
+    
+    def __str__(self):
+        return f'{self.cliente_id}/{self.status}/{self.slot}: {self.total}'
@@ -1,7 +1,14 @@
+import random
+from collections import Counter
 from decimal import Decimal
-from django.db import transaction
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
 
-from .models import Pedido, ItemPedido, HistoricoStatusPedido, StatusPedido
+from common.locks import MODO_BLOQUEANTE, com_lock
+from common.contagens import invalidar_contagens, registrar_escrita
+from .models import Pedido, ItemPedido, HistoricoStatusPedido, StatusPedido, ContadorStatusPedido
 
 
 class PedidoRepository:
@@ -12,11 +19,38 @@ class PedidoRepository:
         except Pedido.DoesNotExist:
             return None
     
-    def obter_com_lock(self, pedido_id):
-        try:
-            return Pedido.objects.select_for_update().get(id=pedido_id)
-        except Pedido.DoesNotExist:
-            return None
+    def obter_com_lock(self, pedido_id, modo_lock=MODO_BLOQUEANTE):
+        pedidos = com_lock(Pedido.objects.filter(id=pedido_id), modo_lock, f'Pedido {pedido_id}')
+        return pedidos[0] if pedidos else None
+    
+    def reivindicar_por_status(self, status, limite, criado_antes=None):
+        """
+        Trava até `limite` pedidos no status, do mais antigo para o mais novo,
+        pulando os que outra transação já travou (SKIP LOCKED). Percorre
+        idx_pedido_status_created (status, deleted_at, created_at).
+        """
+        filtros = {'status': status}
+        if criado_antes is not None:
+            filtros['created_at__lt'] = criado_antes
+        return list(
+            Pedido.objects
+            .filter(**filtros)
+            .select_related('cliente')
+            .select_for_update(skip_locked=True, of=('self',))
+            .order_by('created_at', 'id')[:limite]
+        )
+    
+    def atualizar_status_em_lote(self, pedidos, novo_status):
+        agora = timezone.now()
+        Pedido.objects.filter(id__in=[pedido.id for pedido in pedidos]).update(
+            status=novo_status, updated_at=agora
+        )
+        # update() não dispara post_save
+        invalidar_contagens(Pedido)
+        for pedido in pedidos:
+            pedido.status = novo_status
+            pedido.updated_at = agora
+        return pedidos
     
     def obter_por_chave_idempotencia(self, chave):
         try:
@@ -56,6 +90,17 @@ class PedidoRepository:
     
     def obter_itens(self, pedido):
         return list(pedido.itens.all())
+    
+    def somar_quantidades_por_produto(self, pedidos):
+        """Retorna {produto_id: quantidade total} dos itens dos pedidos, agregado no banco."""
+        return dict(
+            ItemPedido.objects
+            .filter(pedido__in=[pedido.id for pedido in pedidos])
+            .values('produto_id')
+            .annotate(total=Sum('quantidade'))
+            .order_by('produto_id')
+            .values_list('produto_id', 'total')
+        )
 
 
 class ItemPedidoRepository:
@@ -67,6 +112,19 @@ class ItemPedidoRepository:
             preco_unitario=preco_unitario,
             subtotal=subtotal
         )
+    
+    def criar_em_lote(self, pedido, itens):
+        """Cria todos os itens do pedido em um único INSERT."""
+        return ItemPedido.objects.bulk_create([
+            ItemPedido(
+                pedido=pedido,
+                produto=item['produto'],
+                quantidade=item['quantidade'],
+                preco_unitario=item['preco_unitario'],
+                subtotal=item['subtotal']
+            )
+            for item in itens
+        ])
 
 
 class HistoricoStatusPedidoRepository:
@@ -77,6 +135,93 @@ class HistoricoStatusPedidoRepository:
             status_novo=status_novo,
             alterado_por=alterado_por
         )
+    
+    def criar_em_lote(self, transicoes, status_novo, alterado_por=None):
+        """Registra [(pedido, status_anterior)] em um único INSERT."""
+        return HistoricoStatusPedido.objects.bulk_create([
+            HistoricoStatusPedido(
+                pedido=pedido,
+                status_anterior=status_anterior,
+                status_novo=status_novo,
+                alterado_por=alterado_por
+            )
+            for pedido, status_anterior in transicoes
+        ])
+
+
+class ContadorStatusPedidoRepository:
+    TODOS_OS_CLIENTES = 0
+    
+    def ajustar(self, transicoes):
+        """
+        Aplica [(cliente_id, status_anterior, status_novo)] aos contadores em um único
+        upsert (status_anterior None = pedido novo). Deve rodar na transação que mudou
+        os pedidos, para os contadores confirmarem ou desfazerem junto com eles.
+        """
+        deltas = Counter()
+        slot = random.randrange(settings.PEDIDOS_CONTADORES_SLOTS)
+        for cliente_id, status_anterior, status_novo in transicoes:
+            escopos = [(self.TODOS_OS_CLIENTES, slot)]
+            if settings.PEDIDOS_CONTADORES_POR_CLIENTE:
+                escopos.append((cliente_id, 0))
+            for escopo, slot_escopo in escopos:
+                if status_anterior is not None:
+                    deltas[(escopo, str(status_anterior), slot_escopo)] -= 1
+                deltas[(escopo, str(status_novo), slot_escopo)] += 1
+        
+        # Ordem fixa de chaves: upserts concorrentes travam as linhas na mesma sequência
+        linhas = sorted((chave, delta) for chave, delta in deltas.items() if delta)
+        if not linhas:
+            return
+        valores = ', '.join(['(%s, %s, %s, %s)'] * len(linhas))
+        params = [valor for (cliente_id, status, slot_linha), delta in linhas
+                  for valor in (cliente_id, status, slot_linha, delta)]
+        tabela = ContadorStatusPedido._meta.db_table
+        if connection.vendor == 'mysql':
+            conflito = f'AS novo ON DUPLICATE KEY UPDATE total = {tabela}.total + novo.total'
+        else:
+            conflito = 'ON CONFLICT (cliente_id, status, slot) DO UPDATE SET total = total + excluded.total'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {tabela} (cliente_id, status, slot, total) VALUES {valores} {conflito}', params
+            )
+    
+    def totais_por_status(self, cliente_id=None):
+        """{status: total} de todos os clientes (cliente_id None) ou de um cliente."""
+        escopo = self.TODOS_OS_CLIENTES if cliente_id is None else cliente_id
+        totais = dict(
+            ContadorStatusPedido.objects
+            .filter(cliente_id=escopo)
+            .values('status')
+            .annotate(soma=Sum('total'))
+            .order_by('status')
+            .values_list('status', 'soma')
+        )
+        return {status: totais.get(status, 0) for status in StatusPedido.values}
+    
+    @transaction.atomic
+    def reconstruir(self):
+        """
+        Recalcula os contadores a partir da tabela de pedidos. Os contadores ficam
+        travados durante a reconstrução: transações que mudarem status nesse meio
+        tempo esperam e aplicam seus ajustes sobre os valores já recalculados.
+        """
+        list(ContadorStatusPedido.objects.select_for_update().values_list('id', flat=True))
+        agregados = [(self.TODOS_OS_CLIENTES, status, total) for status, total in
+                     Pedido.objects.values('status').annotate(total=Count('id')).order_by('status')
+                     .values_list('status', 'total')]
+        if settings.PEDIDOS_CONTADORES_POR_CLIENTE:
+            agregados += list(
+                Pedido.objects.values('cliente_id', 'status').annotate(total=Count('id'))
+                .order_by('cliente_id', 'status').values_list('cliente_id', 'status', 'total')
+            )
+        ContadorStatusPedido.objects.all().delete()
+        ContadorStatusPedido.objects.bulk_create(
+            [ContadorStatusPedido(cliente_id=cliente_id, status=status, slot=0, total=total)
+             for cliente_id, status, total in agregados],
+            batch_size=1000,
+        )
+        return agregados
 
 
 class ClienteRepository:
@@ -89,13 +234,12 @@ class ClienteRepository:
 
 
 class ProdutoRepository:
-    def obter_por_ids_com_lock(self, produto_ids):
+    def obter_por_ids_com_lock(self, produto_ids, modo_lock=MODO_BLOQUEANTE):
         from produtos.models import Produto
-        return list(
-            Produto.all_objects
-            .select_for_update()
-            .filter(id__in=produto_ids)
-            .order_by('id')
+        return com_lock(
+            Produto.all_objects.filter(id__in=produto_ids).order_by('id'),
+            modo_lock,
+            'Estoque dos produtos do pedido',
         )
     
     def atualizar_estoque(self, produto, nova_quantidade):
@@ -112,3 +256,25 @@ class ProdutoRepository:
         produto.quantidade_estoque += quantidade
         produto.save(update_fields=['quantidade_estoque', 'updated_at'])
         return produto
+    
+    def decrementar_estoque_em_lote(self, movimentos):
+        """Aplica [(produto, quantidade)] em um único UPDATE. Produtos já devem estar com lock."""
+        for produto, quantidade in movimentos:
+            produto.quantidade_estoque -= quantidade
+        return self._salvar_estoques([produto for produto, _ in movimentos])
+    
+    def incrementar_estoque_em_lote(self, movimentos):
+        """Aplica [(produto, quantidade)] em um único UPDATE. Produtos já devem estar com lock."""
+        for produto, quantidade in movimentos:
+            produto.quantidade_estoque += quantidade
+        return self._salvar_estoques([produto for produto, _ in movimentos])
+    
+    def _salvar_estoques(self, produtos):
+        from produtos.models import Produto
+        # bulk_update não dispara auto_now
+        agora = timezone.now()
+        for produto in produtos:
+            produto.updated_at = agora
+        Produto.all_objects.bulk_update(produtos, ['quantidade_estoque', 'updated_at'])
+        registrar_escrita(Produto)
+        return produtos
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from common.serializers import CamposSelecionaveisMixin
 from .models import Pedido, ItemPedido, HistoricoStatusPedido
 
 
@@ -25,7 +27,7 @@ class PedidoListSerializer(serializers.ModelSerializer):
         fields = ['id', 'numero', 'cliente', 'cliente_nome', 'status', 'valor_total', 'created_at',]
 
 
-class PedidoDetailSerializer(serializers.ModelSerializer):
+class PedidoDetailSerializer(CamposSelecionaveisMixin, serializers.ModelSerializer):
     cliente_nome = serializers.CharField(source='cliente.nome', read_only=True)
     itens = ItemPedidoSerializer(many=True, read_only=True)
     historico = HistoricoStatusSerializer(source='historico_status', many=True, read_only=True)
@@ -53,3 +55,11 @@ class CriarPedidoSerializer(serializers.Serializer):
 
 class AlterarStatusSerializer(serializers.Serializer):
     status = serializers.CharField()
+
+
+class ReivindicarPedidosSerializer(serializers.Serializer):
+    limite = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class EstatisticasPedidosQuerySerializer(serializers.Serializer):
+    cliente = serializers.IntegerField(min_value=1, required=False)
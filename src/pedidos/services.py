@@ -1,10 +1,18 @@
-from django.db import transaction
+import time
+from datetime import timedelta
 
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from common.locks import modo_da_operacao
+from common.transactions import transacao_com_retentativa
+from .events import EventoPedido, emitir_evento, emitir_eventos
 from .models import StatusPedido
 from .state_machine import PedidoStateMachine
 from .repositories import (
     PedidoRepository, ItemPedidoRepository, HistoricoStatusPedidoRepository, ClienteRepository,
-    ProdutoRepository,
+    ProdutoRepository, ContadorStatusPedidoRepository,
 )
 
 
@@ -16,11 +24,12 @@ class AlterarStatusPedidoService:
     def __init__(self):
         self.pedido_repository = PedidoRepository()
         self.historico_repository = HistoricoStatusPedidoRepository()
+        self.contador_repository = ContadorStatusPedidoRepository()
     
-    @transaction.atomic
+    @transacao_com_retentativa(nome='AlterarStatusPedidoService')
     def executar(self, pedido_id, novo_status, alterado_por=None):
         
-        pedido = self._obter_pedido_com_lock(pedido_id)
+        pedido = self._obter_pedido_com_lock(pedido_id, modo_da_operacao('pedidos.alterar_status'))
         
         status_anterior = pedido.status
         
@@ -28,6 +37,7 @@ class AlterarStatusPedidoService:
         state_machine.validar(novo_status)
         
         self.pedido_repository.atualizar_status(pedido, novo_status)
+        self.contador_repository.ajustar([(pedido.cliente_id, status_anterior, novo_status)])
         
         self._registrar_historico(
             pedido=pedido,
@@ -36,10 +46,22 @@ class AlterarStatusPedidoService:
             alterado_por=alterado_por
         )
         
+        emitir_evento(
+            EventoPedido(f'pedido.{StatusPedido(novo_status).value}'),
+            {
+                'pedido_id': pedido.id,
+                'numero': pedido.numero,
+                'cliente_id': pedido.cliente_id,
+                'status_anterior': status_anterior,
+                'status_novo': novo_status,
+                'alterado_por': alterado_por,
+            }
+        )
+        
         return pedido
     
-    def _obter_pedido_com_lock(self, pedido_id):
-        pedido = self.pedido_repository.obter_com_lock(pedido_id)
+    def _obter_pedido_com_lock(self, pedido_id, modo_lock):
+        pedido = self.pedido_repository.obter_com_lock(pedido_id, modo_lock)
         if pedido is None:
             raise PedidoNaoEncontradoError(
                 f"Pedido com ID {pedido_id} não encontrado"
@@ -97,6 +119,7 @@ class CriarPedidoService:
         self.item_pedido_repository = ItemPedidoRepository()
         self.cliente_repository = ClienteRepository()
         self.produto_repository = ProdutoRepository()
+        self.contador_repository = ContadorStatusPedidoRepository()
     
     def executar(self, cliente_id, itens, chave_idempotencia, observacoes=None):
         pedido_existente = self._buscar_pedido_por_idempotencia(chave_idempotencia)
@@ -129,14 +152,16 @@ class CriarPedidoService:
                     f"Produto ID {item.get('produto_id')} com quantidade {qtd}"
                 )
     
-    @transaction.atomic
+    @transacao_com_retentativa(nome='CriarPedidoService')
     def _criar_pedido_atomico(self, cliente_id, itens, chave_idempotencia, observacoes):
         from decimal import Decimal
         
         cliente = self._obter_cliente_ativo(cliente_id)
         
         produtos_ids = [item['produto_id'] for item in itens]
-        produtos = self.produto_repository.obter_por_ids_com_lock(produtos_ids)
+        produtos = self.produto_repository.obter_por_ids_com_lock(
+            produtos_ids, modo_da_operacao('pedidos.criar')
+        )
         
         produtos_map = {p.id: p for p in produtos}
         self._validar_produtos_e_estoque(itens, produtos_map, produtos_ids)
@@ -150,6 +175,8 @@ class CriarPedidoService:
         )
         
         valor_total = Decimal('0.00')
+        novos_itens = []
+        movimentos = []
         
         for item_data in itens:
             produto = produtos_map[item_data['produto_id']]
@@ -157,19 +184,34 @@ class CriarPedidoService:
             preco_unitario = produto.preco
             subtotal = preco_unitario * quantidade
             
-            self.item_pedido_repository.criar(
-                pedido=pedido,
-                produto=produto,
-                quantidade=quantidade,
-                preco_unitario=preco_unitario,
-                subtotal=subtotal
-            )
-            
-            self.produto_repository.decrementar_estoque(produto, quantidade)
+            novos_itens.append({
+                'produto': produto,
+                'quantidade': quantidade,
+                'preco_unitario': preco_unitario,
+                'subtotal': subtotal,
+            })
+            movimentos.append((produto, quantidade))
             
             valor_total += subtotal
         
+        self.item_pedido_repository.criar_em_lote(pedido, novos_itens)
+        self.produto_repository.decrementar_estoque_em_lote(movimentos)
         self.pedido_repository.atualizar_valor_total(pedido, valor_total)
+        self.contador_repository.ajustar([(cliente.id, None, StatusPedido.PENDENTE)])
+        
+        emitir_evento(
+            EventoPedido.PEDIDO_CRIADO,
+            {
+                'pedido_id': pedido.id,
+                'numero': pedido.numero,
+                'cliente_id': pedido.cliente_id,
+                'valor_total': str(valor_total),
+                'itens': [
+                    {'produto_id': item['produto'].id, 'quantidade': item['quantidade']}
+                    for item in novos_itens
+                ],
+            }
+        )
         
         return pedido
     
@@ -233,12 +275,11 @@ class CancelarPedidoService:
         self.pedido_repository = PedidoRepository()
         self.produto_repository = ProdutoRepository()
         self.historico_repository = HistoricoStatusPedidoRepository()
+        self.contador_repository = ContadorStatusPedidoRepository()
     
-    @transaction.atomic
+    @transacao_com_retentativa(nome='CancelarPedidoService')
     def executar(self, pedido_id, cancelado_por=None, motivo=None):
-        from .events import EventoPedido, emitir_evento
-        
-        pedido = self._obter_pedido_com_lock(pedido_id)
+        pedido = self._obter_pedido_com_lock(pedido_id, modo_da_operacao('pedidos.cancelar'))
         
         if pedido.status == StatusPedido.CANCELADO:
             return pedido
@@ -250,7 +291,9 @@ class CancelarPedidoService:
         
         if itens:
             produto_ids = [item.produto_id for item in itens]
-            produtos = self.produto_repository.obter_por_ids_com_lock(produto_ids)
+            produtos = self.produto_repository.obter_por_ids_com_lock(
+                produto_ids, modo_da_operacao('pedidos.cancelar.estoque')
+            )
             produtos_map = {p.id: p for p in produtos}
             
             self._devolver_estoque(itens, produtos_map)
@@ -262,6 +305,7 @@ class CancelarPedidoService:
         self.pedido_repository.atualizar_status_e_observacoes(
             pedido, StatusPedido.CANCELADO, observacoes
         )
+        self.contador_repository.ajustar([(pedido.cliente_id, status_anterior, StatusPedido.CANCELADO)])
         
         self._registrar_historico(
             pedido=pedido,
@@ -283,8 +327,8 @@ class CancelarPedidoService:
         
         return pedido
     
-    def _obter_pedido_com_lock(self, pedido_id):
-        pedido = self.pedido_repository.obter_com_lock(pedido_id)
+    def _obter_pedido_com_lock(self, pedido_id, modo_lock):
+        pedido = self.pedido_repository.obter_com_lock(pedido_id, modo_lock)
         if pedido is None:
             raise PedidoNaoEncontradoError(
                 f"Pedido com ID {pedido_id} não encontrado"
@@ -302,10 +346,12 @@ class CancelarPedidoService:
             )
     
     def _devolver_estoque(self, itens, produtos_map):
-        for item in itens:
-            produto = produtos_map.get(item.produto_id)
-            if produto:
-                self.produto_repository.incrementar_estoque(produto, item.quantidade)
+        movimentos = [
+            (produtos_map[item.produto_id], item.quantidade)
+            for item in itens
+            if item.produto_id in produtos_map
+        ]
+        self.produto_repository.incrementar_estoque_em_lote(movimentos)
     
     def _registrar_historico(self, pedido, status_anterior, cancelado_por):
         return self.historico_repository.criar(
@@ -314,3 +360,168 @@ class CancelarPedidoService:
             status_novo=StatusPedido.CANCELADO,
             alterado_por=cancelado_por
         )
+
+
+class ReivindicarPedidosService:
+    """
+    Reivindica pedidos confirmados para processamento (separação). Cada
+    chamada trava até `limite` pedidos com SKIP LOCKED, então workers
+    concorrentes recebem lotes disjuntos sem esperar uns pelos outros.
+    """
+    
+    def __init__(self):
+        self.pedido_repository = PedidoRepository()
+        self.historico_repository = HistoricoStatusPedidoRepository()
+        self.contador_repository = ContadorStatusPedidoRepository()
+    
+    @transacao_com_retentativa(nome='ReivindicarPedidosService')
+    def executar(self, limite, reivindicado_por=None):
+        pedidos = self.pedido_repository.reivindicar_por_status(StatusPedido.CONFIRMADO, limite)
+        if not pedidos:
+            return []
+        
+        transicoes = []
+        for pedido in pedidos:
+            PedidoStateMachine(pedido.status).validar(StatusPedido.EM_PROCESSAMENTO)
+            transicoes.append((pedido, pedido.status))
+        
+        self.pedido_repository.atualizar_status_em_lote(pedidos, StatusPedido.EM_PROCESSAMENTO)
+        self.contador_repository.ajustar([
+            (pedido.cliente_id, status_anterior, StatusPedido.EM_PROCESSAMENTO) for pedido, status_anterior in transicoes
+        ])
+        self.historico_repository.criar_em_lote(
+            transicoes, StatusPedido.EM_PROCESSAMENTO, alterado_por=reivindicado_por
+        )
+        
+        emitir_eventos([
+            (
+                EventoPedido.PEDIDO_EM_PROCESSAMENTO,
+                {
+                    'pedido_id': pedido.id,
+                    'numero': pedido.numero,
+                    'status_anterior': status_anterior,
+                    'reivindicado_por': reivindicado_por,
+                }
+            )
+            for pedido, status_anterior in transicoes
+        ])
+        
+        return pedidos
+
+
+ALTERADO_POR_SISTEMA = 'system'
+
+
+class ExpirarPedidosPendentesService:
+    """
+    Cancela pedidos pendentes mais antigos que PEDIDO_PENDENTE_TTL, devolvendo o
+    estoque reservado. Trabalha em lotes, cada um na própria transação: o
+    progresso de um lote não se perde se o job for interrompido, e uma nova
+    execução continua pelos pedidos ainda pendentes. Os pedidos são travados com
+    SKIP LOCKED, então várias instâncias em nós diferentes não se bloqueiam nem
+    expiram o mesmo pedido, e pedidos sendo alterados por usuários são pulados.
+    """
+    
+    def __init__(self):
+        self.pedido_repository = PedidoRepository()
+        self.produto_repository = ProdutoRepository()
+        self.historico_repository = HistoricoStatusPedidoRepository()
+        self.contador_repository = ContadorStatusPedidoRepository()
+    
+    def executar(self, ttl=None, lote=None, pausa=None, max_lotes=None):
+        """Processa lotes até esgotar os pedidos expirados (ou max_lotes). Retorna o total expirado."""
+        ttl = ttl if ttl is not None else timedelta(minutes=settings.PEDIDO_PENDENTE_TTL_MINUTOS)
+        lote = lote or settings.EXPIRACAO_LOTE
+        pausa = pausa if pausa is not None else settings.EXPIRACAO_PAUSA
+        # Corte fixo na execução: pedidos que expirarem durante o job ficam para a próxima
+        corte = timezone.now() - ttl
+        
+        total = 0
+        lotes = 0
+        while max_lotes is None or lotes < max_lotes:
+            expirados = self.executar_lote(corte, lote)
+            total += len(expirados)
+            lotes += 1
+            if len(expirados) < lote:
+                break
+            # Limita a taxa de escrita para não competir com o tráfego da API
+            time.sleep(pausa)
+        return total
+    
+    @transacao_com_retentativa(nome='ExpirarPedidosPendentesService')
+    def executar_lote(self, corte, limite):
+        pedidos = self.pedido_repository.reivindicar_por_status(StatusPedido.PENDENTE, limite, criado_antes=corte)
+        if not pedidos:
+            return []
+        
+        for pedido in pedidos:
+            PedidoStateMachine(pedido.status).validar(StatusPedido.CANCELADO)
+        
+        quantidades = self.pedido_repository.somar_quantidades_por_produto(pedidos)
+        if quantidades:
+            # Uma devolução por produto, com locks em ordem de id (sem deadlock entre nós)
+            produtos = self.produto_repository.obter_por_ids_com_lock(
+                list(quantidades), modo_da_operacao('pedidos.expirar.estoque')
+            )
+            self.produto_repository.incrementar_estoque_em_lote(
+                [(produto, quantidades[produto.id]) for produto in produtos]
+            )
+        
+        transicoes = [(pedido, pedido.status) for pedido in pedidos]
+        self.pedido_repository.atualizar_status_em_lote(pedidos, StatusPedido.CANCELADO)
+        self.contador_repository.ajustar([
+            (pedido.cliente_id, status_anterior, StatusPedido.CANCELADO) for pedido, status_anterior in transicoes
+        ])
+        self.historico_repository.criar_em_lote(
+            transicoes, StatusPedido.CANCELADO, alterado_por=ALTERADO_POR_SISTEMA
+        )
+        
+        emitir_eventos([
+            (
+                EventoPedido.PEDIDO_CANCELADO,
+                {
+                    'pedido_id': pedido.id,
+                    'numero': pedido.numero,
+                    'cliente_id': pedido.cliente_id,
+                    'status_anterior': status_anterior,
+                    'cancelado_por': ALTERADO_POR_SISTEMA,
+                    'motivo': 'expirado',
+                }
+            )
+            for pedido, status_anterior in transicoes
+        ])
+        
+        return pedidos
+
+
+class ContadoresPorClienteDesativadosError(Exception):
+    pass
+
+
+class EstatisticasPedidosService:
+    """
+    Pedidos por status lidos dos contadores (ContadorStatusPedido), sem GROUP BY
+    sobre a tabela de pedidos, com cache de PEDIDOS_STATS_CACHE_TTL segundos.
+    """
+    
+    def __init__(self):
+        self.contador_repository = ContadorStatusPedidoRepository()
+    
+    def executar(self, cliente_id=None):
+        if cliente_id is not None and not settings.PEDIDOS_CONTADORES_POR_CLIENTE:
+            raise ContadoresPorClienteDesativadosError(
+                "Contadores por cliente desativados (PEDIDOS_CONTADORES_POR_CLIENTE)"
+            )
+        
+        chave = f'pedidos:stats:{cliente_id or "todos"}'
+        estatisticas = cache.get(chave) if settings.PEDIDOS_STATS_CACHE_TTL else None
+        if estatisticas is None:
+            por_status = self.contador_repository.totais_por_status(cliente_id)
+            estatisticas = {
+                'cliente_id': cliente_id,
+                'total': sum(por_status.values()),
+                'por_status': por_status,
+            }
+            if settings.PEDIDOS_STATS_CACHE_TTL:
+                cache.set(chave, estatisticas, settings.PEDIDOS_STATS_CACHE_TTL)
+        return estatisticas
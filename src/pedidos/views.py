@@ -1,20 +1,41 @@
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from .models import Pedido
+from clientes.models import Cliente
+from common.locks import LockIndisponivelError
+from common.serializers import campos_solicitados, otimizar_para_campos
+from common.transactions import TransacaoConcorrenteError
+from common.views import BuscaEmLoteMixin, ListagemCondicionalMixin, ListagemProjetadaMixin, resposta_conflito
+from .models import Pedido, ItemPedido
 from .serializers import (
     PedidoListSerializer, PedidoDetailSerializer, CriarPedidoSerializer, AlterarStatusSerializer,
+    ReivindicarPedidosSerializer, EstatisticasPedidosQuerySerializer,
 )
 from .services import (
-    CriarPedidoService, AlterarStatusPedidoService, CancelarPedidoService, ClienteNaoEncontradoError,
-    ClienteInativoError, ProdutoNaoEncontradoError, ProdutoInativoError, EstoqueInsuficienteError,
+    CriarPedidoService, AlterarStatusPedidoService, CancelarPedidoService, ReivindicarPedidosService,
+    EstatisticasPedidosService, ContadoresPorClienteDesativadosError,
+    ClienteNaoEncontradoError, ClienteInativoError, ProdutoNaoEncontradoError, ProdutoInativoError, EstoqueInsuficienteError,
     ItensVaziosError, QuantidadeInvalidaError, PedidoNaoEncontradoError, PedidoNaoPodeCancelarError,
 )
 from .state_machine import TransicaoInvalidaError
 
 
+def _prefetches_por_campo():
+    """Prefetch de cada lista aninhada do PedidoDetailSerializer: queries constantes no total de itens."""
+    return {
+        'itens': Prefetch('itens', queryset=ItemPedido.objects.select_related('produto')),
+        'historico': 'historico_status',
+    }
+
+
+def _prefetch_detalhe():
+    return list(_prefetches_por_campo().values())
+
+
 class PedidoViewSet(
+    BuscaEmLoteMixin, ListagemCondicionalMixin, ListagemProjetadaMixin,
     mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
 ):
     queryset = Pedido.objects.all().select_related('cliente')
@@ -23,12 +44,44 @@ class PedidoViewSet(
     
     ordering_fields = ['created_at', 'valor_total', 'status']
     ordering = ['-created_at']
+
+    # Escopos de common.throttling.RedisEndpointRateThrottle
+    throttle_scopes = {'create': 'orders-create'}
+    
+    # cliente_nome vem do cliente: renomear o cliente também muda a listagem
+    modelos_validador = [Pedido, Cliente]
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('retrieve', 'batch_get'):
+            # Só as colunas, joins e prefetches dos campos pedidos em ?fields=/?expand=
+            queryset = otimizar_para_campos(
+                queryset, PedidoDetailSerializer, self._campos_detalhe(), _prefetches_por_campo()
+            )
+        return queryset
+    
+    def _campos_detalhe(self):
+        if not hasattr(self, '_campos'):
+            self._campos = campos_solicitados(
+                self.request.query_params, PedidoDetailSerializer, list(_prefetches_por_campo())
+            )
+        return self._campos
+    
+    def get_serializer(self, *args, **kwargs):
+        # ?fields=status,... limita os campos e ?expand=itens,historico inclui as listas
+        if self.action in ('retrieve', 'batch_get'):
+            kwargs['campos'] = self._campos_detalhe()
+        return super().get_serializer(*args, **kwargs)
     
     def get_serializer_class(self):
         if self.action == 'list':
             return PedidoListSerializer
         return PedidoDetailSerializer
     
+    def _serializar_detalhe(self, pedido):
+        prefetch_related_objects([pedido], *_prefetch_detalhe())
+        return PedidoDetailSerializer(pedido).data
+    
     def create(self, request):
         serializer = CriarPedidoSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -43,11 +96,9 @@ class PedidoViewSet(
                 chave_idempotencia=data['idempotency_key'],
                 observacoes=data.get('observacoes'),
             )
-            serializer = PedidoDetailSerializer(pedido)
-            
             response_status = status.HTTP_201_CREATED if criado else status.HTTP_200_OK
             return Response(
-                serializer.data,
+                self._serializar_detalhe(pedido),
                 status=response_status
             )
             
@@ -76,6 +127,8 @@ class PedidoViewSet(
                 {'error': str(err)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        except (LockIndisponivelError, TransacaoConcorrenteError) as err:
+            return resposta_conflito(err)
     
     @action(detail=True, methods=['patch'], url_path='status')
     def status_action(self, request, pk=None):
@@ -89,11 +142,9 @@ class PedidoViewSet(
                 novo_status=serializer.validated_data['status'],
                 alterado_por=request.user.username if request.user.is_authenticated else None,
             )
-
-            serializer = PedidoDetailSerializer(pedido)
             
             return Response(
-                serializer.data,
+                self._serializar_detalhe(pedido),
                 status=status.HTTP_200_OK
             )
             
@@ -112,6 +163,37 @@ class PedidoViewSet(
                 },
                 status=status.HTTP_400_BAD_REQUEST
             )
+        except (LockIndisponivelError, TransacaoConcorrenteError) as err:
+            return resposta_conflito(err)
+    
+    @action(detail=False, methods=['post'], url_path='claim')
+    def claim(self, request):
+        """Reivindica até `limite` pedidos confirmados, movendo-os para em_processamento."""
+        serializer = ReivindicarPedidosSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            pedidos = ReivindicarPedidosService().executar(
+                limite=serializer.validated_data['limite'],
+                reivindicado_por=request.user.username if request.user.is_authenticated else None,
+            )
+        except TransacaoConcorrenteError as err:
+            return resposta_conflito(err)
+        
+        return Response(PedidoListSerializer(pedidos, many=True).data, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['get'], url_path='stats')
+    def stats(self, request):
+        """Pedidos por status (todos os clientes ou ?cliente=<id>), lidos dos contadores."""
+        serializer = EstatisticasPedidosQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            estatisticas = EstatisticasPedidosService().executar(serializer.validated_data.get('cliente'))
+        except ContadoresPorClienteDesativadosError as err:
+            return Response({'error': str(err)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(estatisticas, status=status.HTTP_200_OK)
     
     def destroy(self, request, pk=None):
         try:
@@ -122,9 +204,8 @@ class PedidoViewSet(
                 motivo=request.data.get('motivo'),
             )
             
-            serializer = PedidoDetailSerializer(pedido)
             return Response(
-                serializer.data,
+                self._serializar_detalhe(pedido),
                 status=status.HTTP_200_OK
             )
             
@@ -138,3 +219,5 @@ class PedidoViewSet(
                 {'error': str(err)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        except (LockIndisponivelError, TransacaoConcorrenteError) as err:
+            return resposta_conflito(err)
@@ -0,0 +1,63 @@
+"""
+Worker de processamento (separação) de pedidos confirmados.
+
+Cada processo reivindica lotes com ReivindicarPedidosService (SKIP LOCKED) e
+entrega cada pedido ao handler configurado em PROCESSAMENTO_HANDLER. Vários
+workers rodam em paralelo sem disputar os mesmos pedidos.
+"""
+import logging
+import os
+import socket
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from .services import ReivindicarPedidosService
+
+logger = logging.getLogger(__name__)
+
+
+def registrar_processamento(pedido):
+    """Handler padrão: apenas registra o pedido reivindicado."""
+    logger.info('Pedido %s em processamento', pedido.numero)
+
+
+def identificador_padrao():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+class WorkerProcessamento:
+    def __init__(self, processar=None, lote=None, intervalo_ocioso=None, identificador=None):
+        self.processar = processar or import_string(settings.PROCESSAMENTO_HANDLER)
+        self.lote = lote or settings.PROCESSAMENTO_LOTE
+        self.intervalo_ocioso = intervalo_ocioso if intervalo_ocioso is not None else settings.PROCESSAMENTO_INTERVALO
+        self.identificador = identificador or identificador_padrao()
+        self.parar = threading.Event()
+        self.service = ReivindicarPedidosService()
+
+    def executar_ciclo(self):
+        """Reivindica um lote e processa cada pedido. Retorna a quantidade reivindicada."""
+        pedidos = self.service.executar(self.lote, reivindicado_por=self.identificador)
+        for pedido in pedidos:
+            try:
+                self.processar(pedido)
+            except Exception:
+                # O pedido já está em_processamento; a falha fica registrada para tratamento manual
+                logger.exception('Falha ao processar pedido %s', pedido.numero)
+        return len(pedidos)
+
+    def executar(self, max_ciclos=None):
+        ciclos = 0
+        total = 0
+        while not self.parar.is_set() and (max_ciclos is None or ciclos < max_ciclos):
+            reivindicados = self.executar_ciclo()
+            total += reivindicados
+            ciclos += 1
+            if reivindicados < self.lote:
+                # Fila vazia (ou quase): devolve a conexão e aguarda antes de tentar de novo
+                if not connection.in_atomic_block:
+                    connection.close()
+                self.parar.wait(self.intervalo_ocioso)
+        return total
@@ -1,10 +1,13 @@
 from django.contrib import admin
+
+from common.admin import AdminGrandeVolumeMixin
 from .models import Produto
 
 
 @admin.register(Produto)
-class ProdutoAdmin(admin.ModelAdmin):
+class ProdutoAdmin(AdminGrandeVolumeMixin, admin.ModelAdmin):
     list_display = ['id', 'sku', 'nome', 'preco', 'quantidade_estoque', 'ativo', 'created_at']
     list_filter = ['ativo', 'created_at']
-    search_fields = ['sku', 'nome', 'descricao']
+    # Também usada pelo autocomplete de produto nos itens de pedido
+    search_fields = ['=sku', '^nome']
     ordering = ['-created_at']
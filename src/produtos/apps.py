@@ -5,3 +5,7 @@ class ProdutosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'produtos'
     verbose_name = 'Produtos'
+
+    def ready(self):
+        from common.contagens import registrar_invalidacao_de_contagens
+        registrar_invalidacao_de_contagens(self.get_model('Produto'))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from common.comandos import ComandoEnxutoMixin
+from common.importacao import FormatoImportacaoInvalidoError, formato_pela_extensao, ler_registros
+from common.transactions import TransacaoConcorrenteError
+from produtos.services import SincronizarCatalogoService
+
+
+class Command(ComandoEnxutoMixin, BaseCommand):
+    help = (
+        'Sincroniza o catálogo a partir de um arquivo CSV (com cabeçalho) ou NDJSON: cria os SKUs '
+        'novos e atualiza só os produtos que mudaram. Linhas rejeitadas vão para stderr.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo')
+        parser.add_argument(
+            '--formato', choices=['csv', 'ndjson'],
+            help='Padrão: pela extensão do arquivo (.csv, .ndjson/.jsonl)',
+        )
+        parser.add_argument('--lote', type=int, help='Linhas por lote (padrão: PRODUTOS_SINCRONIZACAO_LOTE)')
+        parser.add_argument(
+            '--restaurar-excluidos', action='store_true',
+            help='Restaura e atualiza SKUs soft-deleted presentes no arquivo (padrão: não são alterados)',
+        )
+
+    def handle(self, *args, **options):
+        formato = options['formato'] or formato_pela_extensao(options['arquivo'])
+        if formato is None:
+            raise CommandError('Informe --formato (csv ou ndjson): extensão do arquivo não reconhecida')
+
+        def ao_rejeitar(linha, erros):
+            for campo, mensagens in erros.items():
+                self.stderr.write(f'linha {linha}: {campo}: {" ".join(mensagens)}')
+
+        service = SincronizarCatalogoService(options['lote'], restaurar_excluidos=options['restaurar_excluidos'])
+        try:
+            with open(options['arquivo'], 'rb') as arquivo:
+                resultado = service.executar(ler_registros(arquivo, formato), ao_rejeitar=ao_rejeitar)
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except (FormatoImportacaoInvalidoError, TransacaoConcorrenteError) as exc:
+            raise CommandError(f'{exc} (interrompido após {exc.resultado["linhas"]} linha(s))')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado["linhas"]} linha(s) em {resultado["duracao_s"]}s '
+            f'({resultado["linhas_por_segundo"]} linhas/s): {resultado["criados"]} criado(s), '
+            f'{resultado["atualizados"]} atualizado(s), {resultado["inalterados"]} inalterado(s), '
+            f'{resultado["excluidos"]} excluído(s) ignorado(s), {resultado["rejeitados"]} rejeitado(s)'
+        ))
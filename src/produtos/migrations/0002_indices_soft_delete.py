@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("produtos", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="produto",
+            name="idx_produto_nome_ativo",
+        ),
+        migrations.RemoveIndex(
+            model_name="produto",
+            name="idx_produto_sku_ativo",
+        ),
+        migrations.RemoveIndex(
+            model_name="produto",
+            name="idx_produto_ativo_estoque",
+        ),
+        migrations.AddIndex(
+            model_name="produto",
+            index=models.Index(
+                fields=["deleted_at", "nome"], name="idx_produto_deleted_nome"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="produto",
+            index=models.Index(
+                fields=["deleted_at", "created_at"], name="idx_produto_deleted_created"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="produto",
+            index=models.Index(
+                fields=["deleted_at", "preco"], name="idx_produto_deleted_preco"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="produto",
+            index=models.Index(
+                fields=["ativo", "deleted_at", "created_at"],
+                name="idx_produto_ativo_created",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="produto",
+            index=models.Index(
+                fields=["ativo", "deleted_at", "quantidade_estoque"],
+                name="idx_produto_ativo_estoque",
+            ),
+        ),
+    ]
@@ -4,6 +4,12 @@ from decimal import Decimal
 from common.models import TimestampMixin, SoftDeleteMixin, SoftDeleteManager
 
 
+class ModoAjusteEstoque(models.TextChoices):
+    """Como o ajuste de estoque em lote aplica as quantidades recebidas."""
+    ABSOLUTO = 'absoluto', 'Absoluto'
+    DELTA = 'delta', 'Delta'
+
+
 class ProdutoManager(SoftDeleteManager):
     def ativos(self):
         return self.get_queryset().filter(ativo=True)
@@ -32,10 +38,16 @@ class Produto(TimestampMixin, SoftDeleteMixin):
         verbose_name = 'Produto'
         verbose_name_plural = 'Produtos'
         ordering = ['nome']
+        # Compostos alinhados ao filtro deleted_at IS NULL do ProdutoManager. Buscas por SKU
+        # usam o índice único de sku.
         indexes = [
-            models.Index(fields=['nome', 'ativo'], name='idx_produto_nome_ativo'),
-            models.Index(fields=['sku', 'ativo'], name='idx_produto_sku_ativo'),
-            models.Index(fields=['ativo', 'quantidade_estoque'], name='idx_produto_ativo_estoque'),
+            models.Index(fields=['deleted_at', 'nome'], name='idx_produto_deleted_nome'),
+            models.Index(fields=['deleted_at', 'created_at'], name='idx_produto_deleted_created'),
+            models.Index(fields=['deleted_at', 'preco'], name='idx_produto_deleted_preco'),
+            models.Index(fields=['ativo', 'deleted_at', 'created_at'], name='idx_produto_ativo_created'),
+            models.Index(
+                fields=['ativo', 'deleted_at', 'quantidade_estoque'], name='idx_produto_ativo_estoque'
+            ),
         ]
     
     def __str__(self):
@@ -0,0 +1,52 @@
+from django.db.models import Case, PositiveIntegerField, Value, When
+
+from common.contagens import registrar_escrita
+from common.locks import com_lock
+from .models import Produto
+
+CAMPOS_CATALOGO = ['nome', 'descricao', 'preco', 'ativo']
+
+
+class ProdutoRepository:
+    def por_skus(self, skus):
+        """
+        Produtos do lote por SKU (índice único), incluindo soft-deleted; só as colunas do
+        catálogo. A collation do MySQL compara SKUs sem diferenciar maiúsculas, então as
+        chaves voltam em minúsculas.
+        """
+        produtos = Produto.all_objects.filter(sku__in=skus).only('id', 'sku', 'deleted_at', *CAMPOS_CATALOGO)
+        return {produto.sku.lower(): produto for produto in produtos}
+
+    def criar_em_lote(self, produtos, tamanho_lote):
+        return Produto.objects.bulk_create(produtos, batch_size=tamanho_lote)
+
+    def atualizar_em_lote(self, produtos, campos, tamanho_lote):
+        # bulk_update não passa pelo auto_now: updated_at vem preenchido pelo chamador
+        return Produto.all_objects.bulk_update(produtos, [*campos, 'updated_at'], batch_size=tamanho_lote)
+
+    def ids_por_skus(self, skus):
+        """{sku em minúsculas: id}, como em por_skus."""
+        return {sku.lower(): produto_id for sku, produto_id in Produto.objects.filter(sku__in=skus).values_list('sku', 'id')}
+
+    def obter_estoques_com_lock(self, produto_ids, modo_lock):
+        """
+        Lock em ordem de id, a mesma de pedidos.repositories.ProdutoRepository.obter_por_ids_com_lock:
+        com todos adquirindo na mesma ordem, ajuste em lote e criação de pedido não formam ciclo.
+        """
+        return com_lock(
+            Produto.objects.filter(id__in=produto_ids).order_by('id').only('id', 'sku', 'quantidade_estoque'),
+            modo_lock,
+            'Estoque dos produtos do lote',
+        )
+
+    def definir_estoques(self, quantidades, atualizado_em):
+        """`quantidades`: {produto_id: nova quantidade}, gravadas em um único UPDATE ... CASE."""
+        # update() não dispara post_save
+        registrar_escrita(Produto)
+        return Produto.objects.filter(id__in=quantidades).update(
+            quantidade_estoque=Case(
+                *[When(id=produto_id, then=Value(quantidade)) for produto_id, quantidade in quantidades.items()],
+                output_field=PositiveIntegerField(),
+            ),
+            updated_at=atualizado_em,
+        )
@@ -1,5 +1,6 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Produto
+from .models import ModoAjusteEstoque, Produto
 
 
 class ProdutoSerializer(serializers.ModelSerializer):
@@ -15,3 +16,54 @@ class ProdutoSerializer(serializers.ModelSerializer):
 class EstoqueSerializer(serializers.Serializer):
     """Serializer para atualização de estoque."""
     quantidade = serializers.IntegerField(min_value=0)
+
+
+class EstoqueEmLoteSerializer(serializers.Serializer):
+    """
+    Estoques por SKU (`skus`) e/ou por ID (`ids`): quantidade final em modo
+    `absoluto`, variação (pode ser negativa) em modo `delta`.
+    """
+    modo = serializers.ChoiceField(choices=ModoAjusteEstoque.choices, default=ModoAjusteEstoque.ABSOLUTO)
+    skus = serializers.DictField(child=serializers.IntegerField(), required=False, default=dict)
+    ids = serializers.DictField(child=serializers.IntegerField(), required=False, default=dict)
+
+    def validate_ids(self, ids):
+        try:
+            convertidos = {int(chave): quantidade for chave, quantidade in ids.items()}
+        except ValueError:
+            raise serializers.ValidationError('As chaves de ids devem ser IDs numéricos')
+        if any(chave < 1 for chave in convertidos):
+            raise serializers.ValidationError('As chaves de ids devem ser IDs numéricos')
+        return convertidos
+
+    def validate(self, dados):
+        total = len(dados['skus']) + len(dados['ids'])
+        if not total:
+            raise serializers.ValidationError('Informe ao menos um produto em skus ou ids')
+        limite = settings.PRODUTOS_ESTOQUE_MAX_ITENS
+        if total > limite:
+            raise serializers.ValidationError(f'No máximo {limite} produtos por chamada (recebidos {total})')
+        if dados['modo'] == ModoAjusteEstoque.ABSOLUTO:
+            negativos = [
+                str(chave) for chave, quantidade in [*dados['skus'].items(), *dados['ids'].items()] if quantidade < 0
+            ]
+            if negativos:
+                raise serializers.ValidationError(
+                    f"Quantidade negativa em modo absoluto: {', '.join(negativos[:10])}"
+                )
+        return dados
+
+
+class ProdutoCatalogoSerializer(ProdutoSerializer):
+    """
+    Validação por linha da sincronização do catálogo. Todos os campos são opcionais
+    (atualização parcial); os obrigatórios na criação são checados no service, e a
+    unicidade de SKU vira a chave do upsert em vez de um validator por linha.
+    """
+
+    class Meta(ProdutoSerializer.Meta):
+        extra_kwargs = {'sku': {'validators': []}}
+
+
+class SincronizacaoCatalogoQuerySerializer(serializers.Serializer):
+    restaurar_excluidos = serializers.BooleanField(default=False)
@@ -0,0 +1,213 @@
+import time
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import Field
+
+from common.importacao import FormatoImportacaoInvalidoError, em_lotes, mensagens_de_erro, registrar_rejeicoes
+from common.locks import LockIndisponivelError, modo_da_operacao
+from common.contagens import invalidar_contagens, registrar_escrita
+from common.transactions import TransacaoConcorrenteError, transacao_com_retentativa
+from .models import ModoAjusteEstoque, Produto
+from .repositories import ProdutoRepository
+from .serializers import ProdutoCatalogoSerializer
+
+CAMPOS_OBRIGATORIOS_NA_CRIACAO = ('nome', 'preco')
+
+
+class SincronizarCatalogoService:
+    """
+    Upsert do catálogo por SKU, `PRODUTOS_SINCRONIZACAO_LOTE` linhas por vez: cada lote
+    busca os produtos existentes em uma consulta, compara campo a campo e grava só o
+    que mudou (um bulk_create para os novos, um bulk_update para os alterados).
+
+    Linhas atualizam só os campos que trazem. SKUs soft-deleted não são alterados
+    (contam em `excluidos`), a menos que `restaurar_excluidos` seja verdadeiro. SKUs são
+    comparados sem diferenciar maiúsculas, como no índice único do MySQL, e um produto
+    existente mantém a grafia do seu SKU. Um SKU repetido vale a última ocorrência.
+    Cada lote é uma transação.
+    """
+
+    def __init__(self, tamanho_lote=None, restaurar_excluidos=False):
+        self.repository = ProdutoRepository()
+        self.tamanho_lote = tamanho_lote or settings.PRODUTOS_SINCRONIZACAO_LOTE
+        self.max_erros = settings.PRODUTOS_SINCRONIZACAO_MAX_ERROS
+        self.restaurar_excluidos = restaurar_excluidos
+
+    def executar(self, registros, ao_rejeitar=None):
+        """`registros`: iterável de (linha, dados, erro), como em common.importacao."""
+        inicio = time.monotonic()
+        resultado = {
+            'linhas': 0, 'criados': 0, 'atualizados': 0, 'inalterados': 0, 'excluidos': 0,
+            'rejeitados': 0, 'erros': [], 'erros_omitidos': 0,
+        }
+        try:
+            for lote in em_lotes(registros, self.tamanho_lote):
+                resultado['linhas'] += len(lote)
+                por_sku, rejeicoes = self._validar(lote)
+                if por_sku:
+                    contagens, rejeicoes_lote = self._gravar_com_retentativa(por_sku)
+                    for chave, total in contagens.items():
+                        resultado[chave] += total
+                    rejeicoes = sorted(rejeicoes + rejeicoes_lote, key=lambda rejeicao: rejeicao[0])
+                registrar_rejeicoes(resultado, rejeicoes, self.max_erros, ao_rejeitar)
+        except (FormatoImportacaoInvalidoError, TransacaoConcorrenteError) as exc:
+            exc.resultado = resultado
+            raise
+        finally:
+            resultado['duracao_s'] = round(time.monotonic() - inicio, 3)
+            resultado['linhas_por_segundo'] = round(resultado['linhas'] / max(resultado['duracao_s'], 0.001))
+        return resultado
+
+    def _validar(self, lote):
+        por_sku, rejeicoes = {}, []
+        serializer = ProdutoCatalogoSerializer(partial=True)
+        for linha, dados, erro in lote:
+            if erro:
+                rejeicoes.append((linha, {'non_field_errors': [erro]}))
+                continue
+            try:
+                dados = serializer.run_validation(dados)
+            except ValidationError as exc:
+                rejeicoes.append((linha, mensagens_de_erro(exc.detail)))
+                continue
+            if 'sku' not in dados:
+                rejeicoes.append((linha, {'sku': [str(Field.default_error_messages['required'])]}))
+                continue
+            chave = dados['sku'].lower()
+            por_sku.pop(chave, None)
+            por_sku[chave] = (linha, dados)
+        return por_sku, rejeicoes
+
+    def _gravar_com_retentativa(self, por_sku):
+        try:
+            return self._gravar(por_sku)
+        except IntegrityError:
+            # Outro processo criou um dos SKUs entre a leitura e o INSERT: na
+            # segunda passada ele já aparece como existente e vira atualização
+            pass
+        try:
+            return self._gravar(por_sku)
+        except IntegrityError:
+            # Conflito de novo: o lote inteiro foi desfeito; as linhas voltam como rejeitadas
+            mensagem = 'Lote não gravado: conflito de SKU com outra gravação concorrente.'
+            return {}, [(linha, {'sku': [mensagem]}) for linha, _ in por_sku.values()]
+
+    @transacao_com_retentativa(nome='SincronizarCatalogoService')
+    def _gravar(self, por_sku):
+        existentes = self.repository.por_skus([dados['sku'] for _, dados in por_sku.values()])
+        contagens = {'criados': 0, 'atualizados': 0, 'inalterados': 0, 'excluidos': 0}
+        rejeicoes, novos, alterados, campos = [], [], [], set()
+        agora = timezone.now()
+
+        for sku, (linha, dados) in por_sku.items():
+            produto = existentes.get(sku)
+            if produto is None:
+                faltando = [campo for campo in CAMPOS_OBRIGATORIOS_NA_CRIACAO if campo not in dados]
+                if faltando:
+                    mensagem = str(Field.default_error_messages['required'])
+                    rejeicoes.append((linha, {campo: [mensagem] for campo in faltando}))
+                else:
+                    novos.append(Produto(**dados))
+                continue
+
+            if produto.deleted_at is not None and not self.restaurar_excluidos:
+                contagens['excluidos'] += 1
+                continue
+
+            mudancas = {campo for campo, valor in dados.items() if campo != 'sku' and getattr(produto, campo) != valor}
+            if produto.deleted_at is not None:
+                produto.deleted_at = None
+                mudancas.add('deleted_at')
+            if not mudancas:
+                contagens['inalterados'] += 1
+                continue
+            for campo in mudancas - {'deleted_at'}:
+                setattr(produto, campo, dados[campo])
+            produto.updated_at = agora
+            alterados.append(produto)
+            campos |= mudancas
+
+        if novos:
+            self.repository.criar_em_lote(novos, self.tamanho_lote)
+        if alterados:
+            self.repository.atualizar_em_lote(alterados, sorted(campos), self.tamanho_lote)
+        if novos or campos & {'ativo', 'deleted_at'}:
+            invalidar_contagens(Produto)
+        elif alterados:
+            # bulk_update não dispara post_save
+            registrar_escrita(Produto)
+
+        contagens['criados'] = len(novos)
+        contagens['atualizados'] = len(alterados)
+        return contagens, rejeicoes
+
+
+class AjustarEstoqueEmLoteService:
+    """
+    Aplica estoques absolutos ou deltas a muitos produtos, `PRODUTOS_ESTOQUE_LOTE` por
+    transação: resolve SKUs em IDs, trava as linhas em ordem de id (a mesma do
+    CriarPedidoService, então os dois não entram em deadlock) e grava tudo em um
+    UPDATE ... CASE. Devolve um resultado por item, na ordem recebida.
+    """
+
+    def __init__(self, tamanho_lote=None):
+        self.repository = ProdutoRepository()
+        self.tamanho_lote = tamanho_lote or settings.PRODUTOS_ESTOQUE_LOTE
+
+    def executar(self, modo, skus=None, ids=None):
+        itens = [('sku', sku, quantidade) for sku, quantidade in (skus or {}).items()]
+        itens += [('id', produto_id, quantidade) for produto_id, quantidade in (ids or {}).items()]
+        resultados, vistos = [], set()
+        try:
+            for lote in em_lotes(itens, self.tamanho_lote):
+                resultados_lote, vistos = self._aplicar_lote(lote, modo, vistos)
+                resultados += resultados_lote
+        except (LockIndisponivelError, TransacaoConcorrenteError) as exc:
+            # Lotes anteriores já foram confirmados
+            exc.resultados = resultados
+            raise
+        return resultados
+
+    @transacao_com_retentativa(nome='AjustarEstoqueEmLoteService')
+    def _aplicar_lote(self, lote, modo, vistos):
+        ids_por_sku = self.repository.ids_por_skus([chave for tipo, chave, _ in lote if tipo == 'sku'])
+        alvos = [
+            (tipo, chave, quantidade, ids_por_sku.get(chave.lower()) if tipo == 'sku' else chave)
+            for tipo, chave, quantidade in lote
+        ]
+        produtos = {
+            produto.id: produto for produto in self.repository.obter_estoques_com_lock(
+                {produto_id for *_, produto_id in alvos if produto_id is not None},
+                modo_da_operacao('produtos.estoque_em_lote'),
+            )
+        }
+
+        # Cópia: numa retentativa o lote recomeça do conjunto anterior
+        resultados, novas_quantidades, vistos = [], {}, set(vistos)
+        for tipo, chave, quantidade, produto_id in alvos:
+            produto = produtos.get(produto_id)
+            if produto is None:
+                resultados.append({tipo: chave, 'status': 'nao_encontrado'})
+                continue
+            resultado = {'id': produto.id, 'sku': produto.sku, 'anterior': produto.quantidade_estoque}
+            if produto.id in vistos:
+                # O mesmo produto por SKU e por ID: ambíguo, vale a primeira ocorrência
+                resultados.append({**resultado, 'status': 'duplicado'})
+                continue
+            vistos.add(produto.id)
+
+            nova = quantidade if modo == ModoAjusteEstoque.ABSOLUTO else produto.quantidade_estoque + quantidade
+            if nova < 0:
+                resultados.append({**resultado, 'status': 'estoque_insuficiente'})
+            elif nova == produto.quantidade_estoque:
+                resultados.append({**resultado, 'atual': nova, 'status': 'inalterado'})
+            else:
+                novas_quantidades[produto.id] = nova
+                resultados.append({**resultado, 'atual': nova, 'status': 'atualizado'})
+
+        if novas_quantidades:
+            self.repository.definir_estoques(novas_quantidades, timezone.now())
+        return resultados, vistos
@@ -4,13 +4,20 @@ Views do app Produtos.
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from common.importacao import FORMATOS, FormatoImportacaoInvalidoError, ler_registros
+from common.locks import LockIndisponivelError
+from common.transactions import TransacaoConcorrenteError
+from common.views import BuscaEmLoteMixin, ListagemCondicionalMixin, ListagemProjetadaMixin, resposta_conflito
 from .models import Produto
-from .serializers import ProdutoSerializer, EstoqueSerializer
+from .serializers import (
+    ProdutoSerializer, EstoqueSerializer, EstoqueEmLoteSerializer, SincronizacaoCatalogoQuerySerializer,
+)
+from .services import AjustarEstoqueEmLoteService, SincronizarCatalogoService
 
 
 class ProdutoViewSet(
-    mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
-    viewsets.GenericViewSet
+    BuscaEmLoteMixin, ListagemCondicionalMixin, ListagemProjetadaMixin,
+    mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
 ):
     queryset = Produto.objects.all()
     serializer_class = ProdutoSerializer
@@ -36,3 +43,46 @@ class ProdutoViewSet(
             serializer.data,
             status=status.HTTP_200_OK
         )
+
+    @action(detail=False, methods=['post'], url_path='stock', url_name='bulk-stock')
+    def estoque_em_lote(self, request):
+        serializer = EstoqueEmLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dados = serializer.validated_data
+
+        try:
+            resultados = AjustarEstoqueEmLoteService().executar(dados['modo'], dados['skus'], dados['ids'])
+        except (LockIndisponivelError, TransacaoConcorrenteError) as err:
+            # Os lotes anteriores ao conflito já foram aplicados
+            response = resposta_conflito(err)
+            response.data['resultados'] = err.resultados
+            return response
+
+        totais = {}
+        for resultado in resultados:
+            totais[resultado['status']] = totais.get(resultado['status'], 0) + 1
+        return Response({'modo': dados['modo'], 'totais': totais, 'resultados': resultados}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='bulk-upsert', url_name='bulk-upsert')
+    def bulk_upsert(self, request):
+        # Corpo lido como stream (ver ClienteViewSet.importar)
+        formato = FORMATOS.get(request.content_type.split(';')[0].strip())
+        if formato is None:
+            return Response(
+                {'error': f"Content-Type deve ser um de: {', '.join(FORMATOS)}"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+        parametros = SincronizacaoCatalogoQuerySerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+
+        service = SincronizarCatalogoService(restaurar_excluidos=parametros.validated_data['restaurar_excluidos'])
+        try:
+            resultado = service.executar(ler_registros(request.stream or [], formato))
+        except FormatoImportacaoInvalidoError as e:
+            return Response({'error': str(e), **e.resultado}, status=status.HTTP_400_BAD_REQUEST)
+        except TransacaoConcorrenteError as e:
+            response = resposta_conflito(e)
+            response.data.update(e.resultado)
+            return response
+
+        return Response(resultado, status=status.HTTP_200_OK)
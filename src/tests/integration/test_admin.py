@@ -0,0 +1,133 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from clientes.models import Cliente
+from common.pagination import PaginadorContagemLimitada
+from pedidos.models import Pedido, ItemPedido, HistoricoStatusPedido, StatusPedido
+from produtos.models import Produto
+
+
+@pytest.fixture
+def criar_pedidos(db):
+    def criar(quantidade, itens_por_pedido=2):
+        lote = Produto.objects.count()
+        produtos = Produto.objects.bulk_create([
+            Produto(sku=f'ADM-{lote}-{i}', nome=f'Produto {lote}-{i}', preco=Decimal('10.00'))
+            for i in range(itens_por_pedido)
+        ])
+        pedidos = []
+        for _ in range(quantidade):
+            indice = Cliente.objects.count()
+            cliente = Cliente.objects.create(
+                nome=f'Cliente {indice}', cpf_cnpj=f'{indice:011d}', email=f'admin{indice}@teste.com',
+            )
+            pedido = Pedido.objects.create(cliente=cliente, chave_idempotencia=f'admin-{indice}')
+            ItemPedido.objects.bulk_create([
+                ItemPedido(pedido=pedido, produto=produto, quantidade=1, preco_unitario=produto.preco,
+                           subtotal=produto.preco)
+                for produto in produtos
+            ])
+            HistoricoStatusPedido.objects.create(
+                pedido=pedido, status_anterior=StatusPedido.PENDENTE, status_novo=StatusPedido.CONFIRMADO,
+            )
+            pedidos.append(pedido)
+        return pedidos
+    return criar
+
+
+def _contar_queries(client, url, **params):
+    # Sem o cache de ContentType a primeira requisição faria uma consulta a mais
+    ContentType.objects.clear_cache()
+    with CaptureQueriesContext(connection) as contexto:
+        resposta = client.get(url, params)
+    assert resposta.status_code == 200
+    return len(contexto.captured_queries)
+
+
+@pytest.mark.django_db
+class TestConsultasDoAdmin:
+    @pytest.mark.parametrize('rota', [
+        'admin:pedidos_pedido_changelist',
+        'admin:pedidos_itempedido_changelist',
+        'admin:pedidos_historicostatuspedido_changelist',
+    ])
+    def test_changelist_nao_cresce_com_as_linhas(self, admin_client, criar_pedidos, rota):
+        url = reverse(rota)
+        criar_pedidos(2)
+        poucas = _contar_queries(admin_client, url)
+        criar_pedidos(10)
+
+        assert _contar_queries(admin_client, url) == poucas
+
+    def test_change_view_nao_cresce_com_os_itens(self, admin_client, criar_pedidos):
+        pequeno, = criar_pedidos(1, itens_por_pedido=1)
+        grande, = criar_pedidos(1, itens_por_pedido=15)
+
+        assert _contar_queries(admin_client, reverse('admin:pedidos_pedido_change', args=[grande.id])) == \
+            _contar_queries(admin_client, reverse('admin:pedidos_pedido_change', args=[pequeno.id]))
+
+    @pytest.mark.parametrize('rota', ['admin:pedidos_pedido_change', 'admin:pedidos_itempedido_change'])
+    def test_change_view_nao_carrega_tabelas_relacionadas_em_select(self, admin_client, criar_pedidos, rota):
+        pedido, = criar_pedidos(1)
+        criar_pedidos(5)
+        objeto = pedido if rota == 'admin:pedidos_pedido_change' else pedido.itens.first()
+
+        html = admin_client.get(reverse(rota, args=[objeto.id])).content.decode()
+
+        # Autocomplete/raw id renderizam só o valor atual, não uma <option> por linha
+        assert 'Cliente 5' not in html
+        assert 'Produto 2-' not in html
+
+    def test_filtro_sem_contagem_total(self, admin_client, criar_pedidos):
+        criar_pedidos(3)
+
+        with CaptureQueriesContext(connection) as contexto:
+            admin_client.get(reverse('admin:pedidos_pedido_changelist'), {'status__exact': 'pendente'})
+
+        contagens = [q['sql'] for q in contexto.captured_queries if 'COUNT(' in q['sql'].upper()]
+        # Só a contagem limitada do filtro; nenhuma contagem do total da tabela
+        assert len(contagens) == 1
+        assert 'LIMIT' in contagens[0].upper()
+
+
+@pytest.mark.django_db
+class TestBuscaDoAdmin:
+    def test_busca_por_prefixo_e_igualdade(self, admin_client, criar_pedidos):
+        pedido, outro = criar_pedidos(2)
+        url = reverse('admin:pedidos_pedido_changelist')
+
+        por_numero = admin_client.get(url, {'q': pedido.numero}).context['cl'].result_list
+        por_cpf = admin_client.get(url, {'q': outro.cliente.cpf_cnpj}).context['cl'].result_list
+        por_nome = admin_client.get(url, {'q': 'Clien'}).context['cl'].result_list
+        por_trecho = admin_client.get(url, {'q': pedido.numero[4:]}).context['cl'].result_list
+
+        assert list(por_numero) == [pedido]
+        assert list(por_cpf) == [outro]
+        assert set(por_nome) == {pedido, outro}
+        # Trechos do meio não entram (evita LIKE '%x%')
+        assert list(por_trecho) == []
+
+
+@pytest.mark.django_db
+class TestPaginadorContagemLimitada:
+    def test_contagem_exata_ate_o_limite(self, criar_pedidos):
+        criar_pedidos(3)
+        paginador = PaginadorContagemLimitada(Pedido.objects.all(), 2)
+        paginador.limite = 5
+
+        assert paginador.count == 3
+        assert paginador.contagem_exata
+
+    def test_acima_do_limite_conta_no_maximo_limite_mais_um(self, criar_pedidos):
+        criar_pedidos(4)
+        paginador = PaginadorContagemLimitada(Pedido.objects.all(), 2)
+        paginador.limite = 2
+
+        # Sem estatísticas do InnoDB (sqlite), fica no piso de limite + 1
+        assert paginador.count >= 3
+        assert not paginador.contagem_exata
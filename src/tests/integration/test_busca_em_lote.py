@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from produtos.models import Produto
+
+
+@pytest.fixture
+def produtos(db):
+    return [
+        Produto.objects.create(sku=f'LOTE-{i}', nome=f'Produto {i}', preco=Decimal('2.00'))
+        for i in range(3)
+    ]
+
+
+def _ids(*objetos):
+    return ','.join(str(objeto.id) for objeto in objetos)
+
+
+@pytest.mark.django_db
+class TestBuscaEmLote:
+    def test_get_preserva_a_ordem_pedida(self, api_client, produtos):
+        primeiro, segundo, terceiro = produtos
+
+        response = api_client.get('/api/v1/products/batch-get/', {'ids': _ids(terceiro, primeiro, segundo)})
+
+        assert response.status_code == 200
+        assert [p['sku'] for p in response.data['results']] == ['LOTE-2', 'LOTE-0', 'LOTE-1']
+        assert response.data['missing'] == []
+
+    def test_post_com_ids_ausentes(self, api_client, produtos):
+        ids = [produtos[1].id, 999999, produtos[0].id]
+
+        response = api_client.post('/api/v1/products/batch-get/', {'ids': ids}, format='json')
+
+        assert response.status_code == 200
+        assert [p['id'] for p in response.data['results']] == [produtos[1].id, produtos[0].id]
+        assert response.data['missing'] == [999999]
+
+    def test_ids_repetidos_aparecem_uma_vez(self, api_client, produtos):
+        response = api_client.get('/api/v1/products/batch-get/', {'ids': _ids(produtos[0], produtos[0])})
+
+        assert len(response.data['results']) == 1
+
+    def test_uma_consulta_para_qualquer_quantidade(self, api_client, produtos):
+        with CaptureQueriesContext(connection) as contexto:
+            api_client.get('/api/v1/products/batch-get/', {'ids': _ids(*produtos)})
+
+        sql, = [q['sql'] for q in contexto.captured_queries]
+        assert ' IN (' in sql
+
+    @pytest.mark.parametrize('ids', ['', 'a,b', '0'])
+    def test_ids_invalidos(self, api_client, ids):
+        response = api_client.get('/api/v1/products/batch-get/', {'ids': ids})
+
+        assert response.status_code == 400
+        assert 'ids' in response.data
+
+    @pytest.mark.parametrize('corpo', [[1, 2], 7, 'ids', None])
+    def test_corpo_que_nao_e_objeto(self, api_client, corpo):
+        response = api_client.post('/api/v1/products/batch-get/', corpo, format='json')
+
+        assert response.status_code == 400
+
+    def test_limite_de_ids(self, api_client, settings):
+        settings.BATCH_GET_MAX_IDS = 2
+
+        response = api_client.post('/api/v1/products/batch-get/', {'ids': [1, 2, 3]}, format='json')
+
+        assert response.status_code == 400
+        assert 'ids' in response.data
+
+    def test_pedidos_aceitam_fields_e_expand(self, api_client, pedido_pendente):
+        url = f'/api/v1/orders/batch-get/?ids={pedido_pendente.id}'
+
+        resumido = api_client.get(url + '&fields=id,status')
+        expandido = api_client.get(url + '&expand=itens')
+
+        assert resumido.data['results'] == [{'id': pedido_pendente.id, 'status': 'pendente'}]
+        assert 'itens' in expandido.data['results'][0]
+        assert 'historico' not in expandido.data['results'][0]
+
+    def test_clientes(self, api_client, cliente_ativo):
+        response = api_client.get('/api/v1/customers/batch-get/', {'ids': _ids(cliente_ativo)})
+
+        assert response.data['results'][0]['id'] == cliente_ativo.id
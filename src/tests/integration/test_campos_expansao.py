@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from pedidos.models import HistoricoStatusPedido, StatusPedido
+
+
+@pytest.fixture
+def url(pedido_pendente):
+    HistoricoStatusPedido.objects.create(
+        pedido=pedido_pendente, status_anterior=None, status_novo=StatusPedido.PENDENTE,
+    )
+    return f'/api/v1/orders/{pedido_pendente.id}/'
+
+
+def _get(api_client, url, **params):
+    with CaptureQueriesContext(connection) as contexto:
+        response = api_client.get(url, params)
+    return response, [q['sql'] for q in contexto.captured_queries]
+
+
+@pytest.mark.django_db
+class TestCamposEExpansao:
+    def test_sem_parametros_mantem_resposta_completa(self, api_client, url):
+        response, queries = _get(api_client, url)
+
+        assert response.status_code == 200
+        assert len(response.data['itens']) == 1
+        assert len(response.data['historico']) == 1
+        assert response.data['cliente_nome'] == 'Cliente Teste'
+        assert len(queries) == 3
+
+    def test_poll_de_status_e_uma_consulta_por_pk(self, api_client, url, pedido_pendente):
+        response, queries = _get(api_client, url, fields='status')
+
+        assert response.data == {'status': 'pendente'}
+        sql, = queries
+        assert 'JOIN' not in sql.upper()
+        assert 'observacoes' not in sql
+        assert f'= {pedido_pendente.id}' in sql
+
+    def test_campo_de_relacao_faz_so_o_join_necessario(self, api_client, url):
+        response, queries = _get(api_client, url, fields='numero,cliente_nome')
+
+        assert set(response.data) == {'numero', 'cliente_nome'}
+        assert response.data['cliente_nome'] == 'Cliente Teste'
+        assert len(queries) == 1
+        assert 'clientes' in queries[0]
+
+    def test_expand_inclui_so_as_listas_pedidas(self, api_client, url):
+        response, queries = _get(api_client, url, expand='itens')
+
+        assert 'itens' in response.data
+        assert 'historico' not in response.data
+        assert response.data['itens'][0]['produto_nome'] == 'Produto Teste'
+        assert 'status' in response.data
+        assert len(queries) == 2
+        assert not any('historico_status_pedido' in sql for sql in queries)
+
+    def test_expand_vazio_omite_as_listas(self, api_client, url):
+        response, queries = _get(api_client, url, expand='')
+
+        assert 'itens' not in response.data and 'historico' not in response.data
+        assert len(queries) == 1
+
+    def test_fields_com_lista_aninhada(self, api_client, url):
+        response, _ = _get(api_client, url, fields='id,historico')
+
+        assert set(response.data) == {'id', 'historico'}
+
+    @pytest.mark.parametrize('params, campo', [
+        ({'fields': 'status,inexistente'}, 'fields'),
+        ({'expand': 'cliente'}, 'expand'),
+    ])
+    def test_parametros_invalidos(self, api_client, url, params, campo):
+        response = api_client.get(url, params)
+
+        assert response.status_code == 400
+        assert campo in response.data
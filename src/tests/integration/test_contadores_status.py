@@ -0,0 +1,148 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models import Count
+
+from pedidos.models import ContadorStatusPedido, Pedido, StatusPedido
+from pedidos.repositories import ContadorStatusPedidoRepository
+from pedidos.services import (
+    AlterarStatusPedidoService, CancelarPedidoService, CriarPedidoService, ExpirarPedidosPendentesService,
+    ReivindicarPedidosService,
+)
+
+
+@pytest.fixture
+def criar_pedido(cliente_ativo, produto_com_estoque):
+    contador = iter(range(1000))
+
+    def criar():
+        pedido, _ = CriarPedidoService().executar(
+            cliente_ativo.id, [{'produto_id': produto_com_estoque.id, 'quantidade': 1}],
+            f'contadores-{next(contador)}',
+        )
+        return pedido
+    return criar
+
+
+def _totais(cliente_id=None):
+    return {status: total for status, total in
+            ContadorStatusPedidoRepository().totais_por_status(cliente_id).items() if total}
+
+
+@pytest.mark.django_db
+class TestAjusteNosServices:
+    def test_criacao_alteracao_e_cancelamento(self, criar_pedido):
+        primeiro, segundo, terceiro = criar_pedido(), criar_pedido(), criar_pedido()
+        assert _totais() == {'pendente': 3}
+
+        AlterarStatusPedidoService().executar(primeiro.id, StatusPedido.CONFIRMADO)
+        CancelarPedidoService().executar(segundo.id)
+
+        assert _totais() == {'pendente': 1, 'confirmado': 1, 'cancelado': 1}
+        assert _totais() == dict(
+            Pedido.objects.values('status').annotate(total=Count('id')).values_list('status', 'total')
+        )
+        assert Pedido.objects.get(id=terceiro.id).status == StatusPedido.PENDENTE
+
+    def test_reivindicacao_e_expiracao_em_lote(self, criar_pedido):
+        for pedido in (criar_pedido(), criar_pedido()):
+            AlterarStatusPedidoService().executar(pedido.id, StatusPedido.CONFIRMADO)
+        criar_pedido()
+
+        ReivindicarPedidosService().executar(limite=10)
+        ExpirarPedidosPendentesService().executar(ttl=timedelta(0), pausa=0)
+
+        assert _totais() == {'em_processamento': 2, 'cancelado': 1}
+
+    def test_transacao_desfeita_nao_altera_contadores(self, criar_pedido):
+        pedido = criar_pedido()
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                AlterarStatusPedidoService().executar(pedido.id, StatusPedido.CONFIRMADO)
+                raise RuntimeError('rollback')
+
+        assert _totais() == {'pendente': 1}
+
+    def test_total_geral_dividido_em_slots(self, criar_pedido, settings):
+        settings.PEDIDOS_CONTADORES_SLOTS = 4
+        # Estoque do produto de teste: 10 unidades
+        for _ in range(10):
+            criar_pedido()
+
+        slots = ContadorStatusPedido.objects.filter(cliente_id=0, status='pendente')
+        assert slots.count() > 1
+        assert _totais() == {'pendente': 10}
+
+    def test_contadores_por_cliente(self, criar_pedido, cliente_ativo, settings):
+        criar_pedido()
+        settings.PEDIDOS_CONTADORES_POR_CLIENTE = True
+        pedido = criar_pedido()
+        AlterarStatusPedidoService().executar(pedido.id, StatusPedido.CONFIRMADO)
+
+        assert _totais() == {'pendente': 1, 'confirmado': 1}
+        # O primeiro pedido foi criado antes de ligar os contadores por cliente
+        assert _totais(cliente_ativo.id) == {'confirmado': 1}
+
+
+@pytest.mark.django_db
+class TestEndpointStats:
+    def test_totais_por_status(self, api_client, criar_pedido):
+        pedido = criar_pedido()
+        criar_pedido()
+        CancelarPedidoService().executar(pedido.id)
+
+        response = api_client.get('/api/v1/orders/stats/')
+
+        assert response.status_code == 200
+        assert response.data['total'] == 2
+        assert response.data['por_status']['pendente'] == 1
+        assert response.data['por_status']['cancelado'] == 1
+        assert set(response.data['por_status']) == set(StatusPedido.values)
+
+    def test_resposta_em_cache(self, api_client, criar_pedido, settings, django_assert_num_queries):
+        settings.PEDIDOS_STATS_CACHE_TTL = 5
+        cache.clear()
+        criar_pedido()
+        api_client.get('/api/v1/orders/stats/')
+        criar_pedido()
+
+        with django_assert_num_queries(0):
+            response = api_client.get('/api/v1/orders/stats/')
+
+        assert response.data['total'] == 1
+        cache.clear()
+
+    def test_por_cliente(self, api_client, criar_pedido, cliente_ativo, settings):
+        response = api_client.get('/api/v1/orders/stats/', {'cliente': cliente_ativo.id})
+        assert response.status_code == 400
+
+        settings.PEDIDOS_CONTADORES_POR_CLIENTE = True
+        criar_pedido()
+        response = api_client.get('/api/v1/orders/stats/', {'cliente': cliente_ativo.id})
+
+        assert response.status_code == 200
+        assert response.data['cliente_id'] == cliente_ativo.id
+        assert response.data['total'] == 1
+
+
+@pytest.mark.django_db
+class TestReconstrucao:
+    def test_comando_corrige_desvio(self, criar_pedido, settings):
+        settings.PEDIDOS_CONTADORES_POR_CLIENTE = True
+        pedido = criar_pedido()
+        criar_pedido()
+        # Alteração fora dos services (p.ex. pelo admin) não ajusta os contadores
+        Pedido.objects.filter(id=pedido.id).update(status=StatusPedido.ENTREGUE)
+        saida = StringIO()
+
+        call_command('reconstruir_contadores_pedidos', stdout=saida)
+
+        assert _totais() == {'pendente': 1, 'entregue': 1}
+        assert _totais(pedido.cliente_id) == {'pendente': 1, 'entregue': 1}
+        assert 'entregue: 0 -> 1 (+1)' in saida.getvalue()
+        assert ContadorStatusPedido.objects.filter(cliente_id=0).count() == 2
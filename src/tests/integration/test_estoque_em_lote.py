@@ -0,0 +1,120 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from common.locks import LockIndisponivelError
+from produtos.models import Produto
+from produtos.repositories import ProdutoRepository
+
+URL = '/api/v1/products/stock/'
+
+
+@pytest.fixture
+def produtos(db):
+    return [
+        Produto.objects.create(sku=f'WMS-{i}', nome=f'Produto {i}', preco=Decimal('1.00'), quantidade_estoque=10)
+        for i in range(4)
+    ]
+
+
+def _estoques():
+    return dict(Produto.all_objects.values_list('sku', 'quantidade_estoque'))
+
+
+@pytest.mark.django_db
+class TestEstoqueEmLote:
+    def test_absoluto_por_sku_e_por_id(self, api_client, produtos):
+        response = api_client.post(URL, {
+            'skus': {'WMS-0': 3, 'WMS-1': 10},
+            'ids': {str(produtos[2].id): 0},
+        }, format='json')
+
+        assert response.status_code == 200
+        assert response.data['totais'] == {'atualizado': 2, 'inalterado': 1}
+        assert [r['status'] for r in response.data['resultados']] == ['atualizado', 'inalterado', 'atualizado']
+        assert response.data['resultados'][0] == {
+            'id': produtos[0].id, 'sku': 'WMS-0', 'anterior': 10, 'atual': 3, 'status': 'atualizado',
+        }
+        assert _estoques() == {'WMS-0': 3, 'WMS-1': 10, 'WMS-2': 0, 'WMS-3': 10}
+
+    def test_delta(self, api_client, produtos):
+        response = api_client.post(URL, {'modo': 'delta', 'skus': {'WMS-0': -4, 'WMS-1': 5, 'WMS-2': -11}}, format='json')
+
+        statuses = [r['status'] for r in response.data['resultados']]
+        assert statuses == ['atualizado', 'atualizado', 'estoque_insuficiente']
+        assert _estoques() == {'WMS-0': 6, 'WMS-1': 15, 'WMS-2': 10, 'WMS-3': 10}
+
+    def test_nao_encontrados_e_excluidos(self, api_client, produtos):
+        Produto.objects.filter(sku='WMS-3').update(deleted_at=timezone.now())
+
+        response = api_client.post(URL, {'skus': {'NAO-EXISTE': 1, 'WMS-3': 1}, 'ids': {'999999': 1}}, format='json')
+
+        assert response.data['resultados'] == [
+            {'sku': 'NAO-EXISTE', 'status': 'nao_encontrado'},
+            {'sku': 'WMS-3', 'status': 'nao_encontrado'},
+            {'id': 999999, 'status': 'nao_encontrado'},
+        ]
+        assert _estoques()['WMS-3'] == 10
+
+    def test_mesmo_produto_por_sku_e_id_entre_lotes(self, api_client, produtos, settings):
+        settings.PRODUTOS_ESTOQUE_LOTE = 1
+
+        response = api_client.post(URL, {'skus': {'WMS-0': 1}, 'ids': {str(produtos[0].id): 2}}, format='json')
+
+        assert [r['status'] for r in response.data['resultados']] == ['atualizado', 'duplicado']
+        assert _estoques()['WMS-0'] == 1
+
+    def test_uma_leitura_com_lock_ordenada_e_um_update_por_lote(self, api_client, produtos):
+        with CaptureQueriesContext(connection) as contexto:
+            api_client.post(URL, {
+                'skus': {'WMS-3': 1, 'WMS-1': 2},
+                'ids': {str(produtos[2].id): 3, str(produtos[0].id): 4},
+            }, format='json')
+
+        queries = [q['sql'] for q in contexto.captured_queries]
+        lock, = [sql for sql in queries if 'quantidade_estoque' in sql and sql.startswith('SELECT')]
+        assert lock.rstrip().endswith('ORDER BY "produtos"."id" ASC')
+        update, = [sql for sql in queries if sql.startswith('UPDATE')]
+        assert 'CASE' in update
+        assert _estoques() == {'WMS-0': 4, 'WMS-1': 2, 'WMS-2': 3, 'WMS-3': 1}
+
+    @pytest.mark.parametrize('payload', [
+        {},
+        {'skus': {}},
+        {'skus': {'WMS-0': -1}},
+        {'ids': {'abc': 1}},
+        {'modo': 'relativo', 'skus': {'WMS-0': 1}},
+    ])
+    def test_payload_invalido(self, api_client, produtos, payload):
+        response = api_client.post(URL, payload, format='json')
+
+        assert response.status_code == 400
+
+    def test_limite_de_itens(self, api_client, produtos, settings):
+        settings.PRODUTOS_ESTOQUE_MAX_ITENS = 1
+
+        response = api_client.post(URL, {'skus': {'WMS-0': 1, 'WMS-1': 1}}, format='json')
+
+        assert response.status_code == 400
+
+    def test_conflito_de_lock_devolve_os_lotes_ja_aplicados(self, api_client, produtos, settings, monkeypatch):
+        settings.PRODUTOS_ESTOQUE_LOTE = 1
+        original = ProdutoRepository.obter_estoques_com_lock
+        chamadas = []
+
+        def travar_no_segundo_lote(repository, produto_ids, modo_lock):
+            chamadas.append(produto_ids)
+            if len(chamadas) == 2:
+                raise LockIndisponivelError('Estoque dos produtos do lote')
+            return original(repository, produto_ids, modo_lock)
+        monkeypatch.setattr(ProdutoRepository, 'obter_estoques_com_lock', travar_no_segundo_lote)
+
+        response = api_client.post(URL, {'skus': {'WMS-0': 1, 'WMS-1': 2}}, format='json')
+
+        assert response.status_code == 409
+        assert response['Retry-After']
+        assert [r['sku'] for r in response.data['resultados']] == ['WMS-0']
+        assert _estoques()['WMS-0'] == 1
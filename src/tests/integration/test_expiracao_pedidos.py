@@ -0,0 +1,138 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from pedidos import services
+from pedidos.management.commands import expirar_pedidos_pendentes as comando_expiracao
+from pedidos.models import Pedido, ItemPedido, HistoricoStatusPedido, StatusPedido
+from pedidos.services import ExpirarPedidosPendentesService
+
+
+TTL = timedelta(hours=1)
+
+
+@pytest.fixture
+def criar_pedido(db, cliente_ativo, produto_com_estoque):
+    contador = iter(range(10_000))
+
+    def criar(idade, status=StatusPedido.PENDENTE, quantidade=2, produto=produto_com_estoque):
+        pedido = Pedido.objects.create(
+            cliente=cliente_ativo, status=status, valor_total=produto.preco * quantidade,
+            chave_idempotencia=f'expiracao-{next(contador)}',
+        )
+        ItemPedido.objects.create(
+            pedido=pedido, produto=produto, quantidade=quantidade,
+            preco_unitario=produto.preco, subtotal=produto.preco * quantidade,
+        )
+        Pedido.objects.filter(id=pedido.id).update(created_at=timezone.now() - idade)
+        return pedido
+    return criar
+
+
+@pytest.fixture
+def pausas(monkeypatch):
+    registradas = []
+    monkeypatch.setattr(services.time, 'sleep', registradas.append)
+    return registradas
+
+
+@pytest.mark.django_db
+class TestExpirarPedidosPendentes:
+    def test_expira_apenas_pendentes_antigos(self, criar_pedido, pausas):
+        antigo = criar_pedido(timedelta(hours=2))
+        recente = criar_pedido(timedelta(minutes=10))
+        confirmado = criar_pedido(timedelta(hours=2), status=StatusPedido.CONFIRMADO)
+
+        total = ExpirarPedidosPendentesService().executar(ttl=TTL)
+
+        assert total == 1
+        status = dict(Pedido.objects.values_list('id', 'status'))
+        assert status[antigo.id] == StatusPedido.CANCELADO
+        assert status[recente.id] == StatusPedido.PENDENTE
+        assert status[confirmado.id] == StatusPedido.CONFIRMADO
+
+    def test_devolve_estoque_agregado_e_registra_historico(self, criar_pedido, produto_com_estoque, pausas):
+        outro = produto_com_estoque.__class__.objects.create(
+            sku='EXP-002', nome='Outro', preco=Decimal('5.00'), quantidade_estoque=1,
+        )
+        for _ in range(3):
+            criar_pedido(timedelta(hours=2), quantidade=2)
+        criar_pedido(timedelta(hours=2), quantidade=4, produto=outro)
+
+        ExpirarPedidosPendentesService().executar(ttl=TTL)
+
+        produto_com_estoque.refresh_from_db()
+        outro.refresh_from_db()
+        assert produto_com_estoque.quantidade_estoque == 10 + 6
+        assert outro.quantidade_estoque == 1 + 4
+        historico = HistoricoStatusPedido.objects.all()
+        assert historico.count() == 4
+        assert set(historico.values_list('status_anterior', 'status_novo', 'alterado_por')) == {
+            (StatusPedido.PENDENTE, StatusPedido.CANCELADO, 'system')
+        }
+
+    def test_processa_em_lotes_com_pausa(self, criar_pedido, pausas):
+        for _ in range(5):
+            criar_pedido(timedelta(hours=2))
+
+        total = ExpirarPedidosPendentesService().executar(ttl=TTL, lote=2, pausa=0.25)
+
+        assert total == 5
+        # Pausa entre lotes cheios; o último (parcial) encerra sem pausa
+        assert pausas == [0.25, 0.25]
+
+    def test_retoma_de_onde_parou(self, criar_pedido, pausas):
+        for _ in range(5):
+            criar_pedido(timedelta(hours=2))
+        service = ExpirarPedidosPendentesService()
+
+        assert service.executar(ttl=TTL, lote=2, max_lotes=1) == 2
+        assert Pedido.objects.pendentes().count() == 3
+        assert service.executar(ttl=TTL, lote=2) == 3
+        assert Pedido.objects.pendentes().count() == 0
+
+    def test_queries_por_lote_nao_dependem_do_tamanho(self, criar_pedido, django_assert_max_num_queries):
+        for _ in range(30):
+            criar_pedido(timedelta(hours=2))
+        corte = timezone.now() - TTL
+
+        # lock dos pedidos, soma dos itens, lock dos produtos, estoque, status, histórico,
+        # savepoint/release e, no MySQL, SET/restaura do innodb_lock_wait_timeout
+        with django_assert_max_num_queries(10):
+            expirados = ExpirarPedidosPendentesService().executar_lote(corte, 30)
+
+        assert len(expirados) == 30
+
+    def test_comando(self, criar_pedido):
+        criar_pedido(timedelta(hours=2))
+        saida = StringIO()
+
+        call_command('expirar_pedidos_pendentes', '--ttl-minutos', '60', '--pausa', '0', stdout=saida)
+
+        assert '1 pedido(s) pendente(s) expirado(s)' in saida.getvalue()
+
+    def test_repetir_fecha_a_conexao_antes_de_esperar(self, criar_pedido, monkeypatch):
+        eventos = []
+
+        class ConexaoFake:
+            in_atomic_block = False
+
+            def close(self):
+                eventos.append('close')
+
+        def dormir(segundos):
+            eventos.append('sleep')
+            if eventos.count('sleep') == 2:
+                raise KeyboardInterrupt
+
+        monkeypatch.setattr(comando_expiracao, 'connection', ConexaoFake())
+        monkeypatch.setattr(comando_expiracao.time, 'sleep', dormir)
+
+        with pytest.raises(KeyboardInterrupt):
+            call_command('expirar_pedidos_pendentes', '--repetir', '5', '--pausa', '0', stdout=StringIO())
+
+        assert eventos == ['close', 'sleep', 'close', 'sleep']
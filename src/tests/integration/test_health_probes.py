@@ -0,0 +1,108 @@
+import time
+import pytest
+
+from health import probes
+from health.probes import MonitorProntidao
+
+
+class ProbeFake:
+    def __init__(self, erro=None):
+        self.erro = erro
+        self.chamadas = 0
+
+    def __call__(self):
+        self.chamadas += 1
+        if self.erro:
+            raise self.erro
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    banco, cache = ProbeFake(), ProbeFake()
+    instancia = MonitorProntidao({'database': banco, 'cache': cache}, intervalo=60, em_segundo_plano=False)
+    monkeypatch.setattr(probes, '_monitor', instancia)
+    return instancia, banco, cache
+
+
+@pytest.mark.django_db
+class TestHealthEndpoints:
+    def test_liveness_nao_toca_dependencias(self, api_client, monitor, django_assert_num_queries):
+        _, banco, _ = monitor
+
+        with django_assert_num_queries(0):
+            response = api_client.get('/health/live')
+
+        assert response.status_code == 200
+        assert response.json() == {'status': 'alive'}
+        assert banco.chamadas == 0
+
+    def test_readiness_servida_do_resultado_em_cache(self, api_client, monitor):
+        _, banco, cache = monitor
+
+        primeira = api_client.get('/health/ready')
+        segunda = api_client.get('/health/ready')
+
+        assert primeira.status_code == segunda.status_code == 200
+        assert banco.chamadas == cache.chamadas == 1
+        corpo = segunda.json()
+        assert corpo['status'] == 'healthy'
+        assert corpo['database'] == corpo['cache'] == 'healthy'
+        assert corpo['checks']['database']['latency_ms'] >= 0
+        assert 'checked_at' in corpo['checks']['cache']
+
+    def test_readiness_503_quando_dependencia_falha(self, api_client, monitor):
+        instancia, _, cache = monitor
+        cache.erro = ConnectionError('redis fora do ar')
+
+        response = api_client.get('/health/ready')
+
+        assert response.status_code == 503
+        assert response.json()['cache'] == 'unhealthy'
+        assert response.json()['checks']['cache']['error'] == 'redis fora do ar'
+
+    def test_readiness_503_quando_resultado_obsoleto(self, api_client, monitor, monkeypatch):
+        instancia, _, _ = monitor
+        # Simula a thread de probes travada: o último resultado deixa de ser renovado
+        instancia.em_segundo_plano = True
+        monkeypatch.setattr(instancia, 'iniciar', lambda: None)
+        instancia.executar_probes()
+        resultados, _ = instancia._ultimo
+        instancia._ultimo = (resultados, time.monotonic() - instancia.idade_maxima - 1)
+
+        response = api_client.get('/health/ready')
+
+        assert response.status_code == 503
+        assert 'obsoleto' in response.json()['checks']['database']['error']
+
+    def test_health_legado_responde_como_readiness(self, api_client, monitor):
+        response = api_client.get('/health/')
+
+        assert response.status_code == 200
+        assert set(response.json()) >= {'status', 'database', 'cache'}
+        assert 'database_error' not in response.json()
+
+    def test_health_legado_mantem_chaves_de_erro_no_topo(self, api_client, monitor):
+        _, banco, _ = monitor
+        banco.erro = ConnectionError('mysql fora do ar')
+
+        legado = api_client.get('/health/')
+        readiness = api_client.get('/health/ready')
+
+        assert legado.status_code == 503
+        assert legado.json()['database_error'] == 'mysql fora do ar'
+        assert 'cache_error' not in legado.json()
+        assert 'database_error' not in readiness.json()
+
+
+class TestMonitorEmSegundoPlano:
+    def test_thread_atualiza_resultados(self):
+        banco = ProbeFake()
+        instancia = MonitorProntidao({'database': banco}, intervalo=0.01, em_segundo_plano=True)
+
+        instancia.obter_estado()
+        limite = time.monotonic() + 2
+        while banco.chamadas < 3 and time.monotonic() < limite:
+            time.sleep(0.01)
+
+        assert banco.chamadas >= 3
+        assert instancia._thread.daemon
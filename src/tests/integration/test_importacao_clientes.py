@@ -0,0 +1,160 @@
+import gc
+import json
+import tracemalloc
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from clientes.models import Cliente
+from clientes.services import ImportarClientesService
+from common.importacao import ler_ndjson
+
+CABECALHO = 'nome,cpf_cnpj,email,telefone\n'
+
+
+def _ndjson(*registros):
+    return '\n'.join(json.dumps(registro) for registro in registros)
+
+
+def _cliente(i):
+    return {'nome': f'Importado {i}', 'cpf_cnpj': f'{i:011d}', 'email': f'importado{i}@teste.com'}
+
+
+def _importar(api_client, corpo, content_type='application/x-ndjson'):
+    return api_client.post('/api/v1/customers/import/', corpo, content_type=content_type)
+
+
+@pytest.mark.django_db
+class TestImportacaoEndpoint:
+    def test_ndjson(self, api_client):
+        response = _importar(api_client, _ndjson(_cliente(1), _cliente(2)))
+
+        assert response.status_code == 200
+        assert response.data['importados'] == 2
+        assert response.data['erros'] == []
+        assert Cliente.objects.filter(cpf_cnpj='00000000001', ativo=True).exists()
+
+    def test_csv_com_colunas_opcionais_vazias(self, api_client):
+        corpo = CABECALHO + 'Ana,00000000011,ana@teste.com,\n"Silva, Bruno",00000000012,bruno@teste.com,1199\n'
+
+        response = _importar(api_client, corpo, 'text/csv; charset=utf-8')
+
+        assert response.data['importados'] == 2
+        assert Cliente.objects.get(cpf_cnpj='00000000012').nome == 'Silva, Bruno'
+
+    def test_relatorio_de_erros_por_linha(self, api_client, cliente_ativo):
+        corpo = '\n'.join([
+            json.dumps(_cliente(1)),
+            json.dumps({**_cliente(2), 'email': 'invalido'}),
+            '{quebrado',
+            json.dumps({**_cliente(3), 'cpf_cnpj': cliente_ativo.cpf_cnpj}),
+            json.dumps({**_cliente(4), 'email': 'IMPORTADO1@teste.com'}),
+            json.dumps(_cliente(5)),
+        ])
+
+        response = _importar(api_client, corpo)
+
+        assert response.data['importados'] == 2
+        assert response.data['rejeitados'] == 4
+        erros = {erro['linha']: erro['erros'] for erro in response.data['erros']}
+        assert list(erros) == [2, 3, 4, 5]
+        assert 'email' in erros[2]
+        assert 'non_field_errors' in erros[3]
+        assert 'cpf_cnpj' in erros[4]
+        assert 'email' in erros[5]
+
+    def test_duplicado_entre_lotes(self, api_client, settings):
+        settings.CLIENTES_IMPORTACAO_LOTE = 2
+
+        response = _importar(api_client, _ndjson(_cliente(1), _cliente(2), _cliente(1)))
+
+        assert response.data['importados'] == 2
+        assert response.data['erros'][0]['linha'] == 3
+
+    def test_erros_alem_do_maximo_sao_so_contados(self, api_client, settings):
+        settings.CLIENTES_IMPORTACAO_MAX_ERROS = 1
+
+        response = _importar(api_client, _ndjson({'nome': 'a'}, {'nome': 'b'}, {'nome': 'c'}))
+
+        assert response.data['rejeitados'] == 3
+        assert len(response.data['erros']) == 1
+        assert response.data['erros_omitidos'] == 2
+
+    def test_content_type_nao_suportado(self, api_client):
+        response = api_client.post('/api/v1/customers/import/', {'clientes': []}, format='json')
+
+        assert response.status_code == 415
+
+    def test_csv_invalido_informa_o_que_ja_foi_gravado(self, api_client, settings):
+        settings.CLIENTES_IMPORTACAO_LOTE = 1
+        corpo = CABECALHO.encode() + b'Ana,00000000011,ana@teste.com,\n\xff\xfe,1,2,3\n'
+
+        response = _importar(api_client, corpo, 'text/csv')
+
+        assert response.status_code == 400
+        assert response.data['importados'] == 1
+
+    def test_consultas_por_lote_e_nao_por_linha(self, api_client, settings):
+        settings.CLIENTES_IMPORTACAO_LOTE = 50
+        corpo = _ndjson(*[_cliente(i) for i in range(100)])
+
+        with CaptureQueriesContext(connection) as contexto:
+            response = _importar(api_client, corpo)
+
+        assert response.data['importados'] == 100
+        selects = [q for q in contexto.captured_queries if q['sql'].startswith('SELECT')]
+        inserts = [q for q in contexto.captured_queries if q['sql'].startswith('INSERT')]
+        assert (len(selects), len(inserts)) == (4, 2)
+
+
+@pytest.mark.django_db
+class TestImportacaoStreaming:
+    def test_memoria_nao_cresce_com_o_arquivo(self):
+        def medir(quantidade, inicio):
+            def linhas():
+                for i in range(quantidade):
+                    if i % 50 == 0:
+                        # Ciclos de objetos do Django/DRF esperam a coleta geracional;
+                        # só interessa o que o import mantém vivo
+                        gc.collect()
+                    yield json.dumps(_cliente(inicio + i)).encode() + b'\n'
+
+            tracemalloc.start()
+            ImportarClientesService(tamanho_lote=50).executar(ler_ndjson(linhas()))
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return pico
+
+        medir(100, 0)  # aquecimento: caches do Django/DRF criados na primeira execução
+        pequeno = medir(300, 1000)
+        grande = medir(1500, 10000)
+
+        assert grande < pequeno * 1.5
+
+
+@pytest.mark.django_db
+class TestComandoImportarClientes:
+    def test_importa_arquivo_e_lista_rejeitados(self, tmp_path, cliente_ativo):
+        arquivo = tmp_path / 'clientes.csv'
+        arquivo.write_text(
+            CABECALHO + f'Ana,00000000011,ana@teste.com,\nDup,{cliente_ativo.cpf_cnpj},dup@teste.com,\n'
+        )
+        saida, erros = StringIO(), StringIO()
+
+        call_command('importar_clientes', str(arquivo), stdout=saida, stderr=erros)
+
+        assert '1 cliente(s) importado(s), 1 linha(s) rejeitada(s)' in saida.getvalue()
+        assert 'linha 3: cpf_cnpj:' in erros.getvalue()
+
+    def test_extensao_desconhecida(self, tmp_path):
+        arquivo = tmp_path / 'clientes.txt'
+        arquivo.write_text('')
+
+        with pytest.raises(CommandError):
+            call_command('importar_clientes', str(arquivo))
+
+        call_command('importar_clientes', str(arquivo), '--formato', 'ndjson', stdout=StringIO())
@@ -0,0 +1,115 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.utils import timezone
+
+from clientes.models import Cliente
+from common.explain import explicar_queryset
+from pedidos.models import Pedido, StatusPedido
+from produtos.models import Produto
+
+
+MODELOS_SOFT_DELETE = [Pedido, Produto, Cliente]
+
+
+@pytest.fixture
+def somente_mysql():
+    if connection.vendor != 'mysql':
+        pytest.skip('EXPLAIN com nomes de índice só é validado no MySQL')
+
+
+@pytest.fixture
+def base_populada(db, somente_mysql):
+    agora = timezone.now()
+    clientes = Cliente.all_objects.bulk_create([
+        Cliente(
+            nome=f'Cliente {i:03d}', cpf_cnpj=f'{i:011d}', email=f'cliente{i}@teste.com',
+            ativo=i % 4 != 0, deleted_at=agora if i % 2 else None,
+        )
+        for i in range(200)
+    ])
+    Produto.all_objects.bulk_create([
+        Produto(
+            sku=f'IDX-{i:04d}', nome=f'Produto {i:04d}', preco=Decimal('10.00') + i,
+            quantidade_estoque=i % 7, ativo=i % 4 != 0, deleted_at=agora if i % 2 else None,
+        )
+        for i in range(400)
+    ])
+    status = [valor for valor, _ in StatusPedido.choices]
+    Pedido.all_objects.bulk_create([
+        Pedido(
+            numero=f'PED-IDX-{i:06d}', cliente=clientes[i % 10], status=status[i % len(status)],
+            valor_total=Decimal('10.00'), chave_idempotencia=f'idx-{i}',
+            deleted_at=agora if i % 2 else None,
+        )
+        for i in range(600)
+    ])
+    with connection.cursor() as cursor:
+        for tabela in ('clientes', 'produtos', 'pedidos'):
+            cursor.execute(f'ANALYZE TABLE {tabela}')
+            cursor.fetchall()
+    return clientes
+
+
+def _plano_da_tabela(queryset, tabela):
+    return next(linha for linha in explicar_queryset(queryset) if linha['table'] == tabela)
+
+
+class TestDefinicaoIndices:
+    @pytest.mark.parametrize('modelo', MODELOS_SOFT_DELETE)
+    def test_indices_compostos_incluem_deleted_at(self, modelo):
+        compostos = [indice for indice in modelo._meta.indexes if len(indice.fields) > 1]
+
+        assert compostos
+        for indice in compostos:
+            assert 'deleted_at' in indice.fields, f'{indice.name} não cobre deleted_at'
+
+    @pytest.mark.parametrize('modelo', MODELOS_SOFT_DELETE)
+    def test_nomes_de_indice_cabem_no_limite(self, modelo):
+        for indice in modelo._meta.indexes:
+            assert len(indice.name) <= 30
+
+
+class TestPlanoConsultasSoftDelete:
+    def test_listagem_pedidos(self, base_populada):
+        plano = _plano_da_tabela(Pedido.objects.select_related('cliente').order_by('-created_at')[:10], 'pedidos')
+
+        assert plano['key'] == 'idx_pedido_deleted_created'
+        assert 'filesort' not in (plano['Extra'] or '')
+
+    def test_pedidos_por_status(self, base_populada):
+        queryset = Pedido.objects.filter(status=StatusPedido.PENDENTE).order_by('-created_at')[:10]
+        plano = _plano_da_tabela(queryset, 'pedidos')
+
+        assert plano['key'] == 'idx_pedido_status_created'
+        assert 'filesort' not in (plano['Extra'] or '')
+
+    def test_pedidos_por_cliente(self, base_populada):
+        queryset = Pedido.objects.filter(cliente=base_populada[0]).order_by('-created_at')[:10]
+        plano = _plano_da_tabela(queryset, 'pedidos')
+
+        assert plano['key'] in ('idx_pedido_cliente_created', 'idx_pedido_cliente_status')
+
+    def test_pedidos_por_cliente_e_status(self, base_populada):
+        queryset = Pedido.objects.filter(
+            cliente=base_populada[0], status=StatusPedido.PENDENTE
+        ).order_by('-created_at')[:10]
+        plano = _plano_da_tabela(queryset, 'pedidos')
+
+        assert plano['key'] == 'idx_pedido_cliente_status'
+        assert 'filesort' not in (plano['Extra'] or '')
+
+    def test_listagem_produtos(self, base_populada):
+        plano = _plano_da_tabela(Produto.objects.order_by('-created_at')[:10], 'produtos')
+
+        assert plano['key'] == 'idx_produto_deleted_created'
+
+    def test_produtos_ativos(self, base_populada):
+        plano = _plano_da_tabela(Produto.objects.ativos().order_by('-created_at')[:10], 'produtos')
+
+        assert plano['key'] == 'idx_produto_ativo_created'
+
+    def test_listagem_clientes(self, base_populada):
+        plano = _plano_da_tabela(Cliente.objects.order_by('-created_at')[:10], 'clientes')
+
+        assert plano['key'] == 'idx_cliente_deleted_created'
@@ -0,0 +1,166 @@
+import time
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.utils.http import http_date
+
+from clientes.models import Cliente
+from common import contagens
+from pedidos.models import Pedido, StatusPedido
+from pedidos.repositories import PedidoRepository
+from produtos.models import Produto
+from tests.integration.test_paginacao_contagem import CacheForaDoAr
+
+
+class Relogio:
+    """time.time() de common.contagens, avançado à mão."""
+
+    def __init__(self):
+        self.agora = time.time()
+
+    def time(self):
+        return self.agora
+
+    def avancar(self, segundos=2):
+        self.agora += segundos
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    cache.clear()
+    relogio = Relogio()
+    monkeypatch.setattr(contagens, 'time', relogio)
+    yield relogio
+    cache.clear()
+
+
+@pytest.fixture
+def produtos(db, relogio, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        produtos = [
+            Produto.objects.create(sku=f'COND-{i}', nome=f'Produto {i}', preco=Decimal('5.00'))
+            for i in range(3)
+        ]
+    relogio.avancar()
+    return produtos
+
+
+@pytest.mark.django_db
+class TestListagemCondicional:
+    def test_resposta_traz_validadores(self, api_client, produtos):
+        response = api_client.get('/api/v1/products/')
+
+        assert response.status_code == 200
+        assert response['ETag'].startswith('W/"')
+        assert response['Last-Modified']
+
+    def test_if_none_match_sem_mudancas_responde_304(self, api_client, produtos, django_assert_num_queries):
+        etag = api_client.get('/api/v1/products/')['ETag']
+
+        # Validadores só do cache; sem contagem, página nem serialização
+        with django_assert_num_queries(0):
+            response = api_client.get('/api/v1/products/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response.content == b''
+        assert response['ETag'] == etag
+
+    @pytest.mark.parametrize('mudanca', ['alteracao', 'insercao', 'remocao', 'estoque'])
+    def test_mudancas_invalidam_o_etag(self, api_client, produtos, mudanca, django_capture_on_commit_callbacks):
+        etag = api_client.get('/api/v1/products/')['ETag']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            if mudanca == 'alteracao':
+                produtos[0].nome = 'Renomeado'
+                produtos[0].save()
+            elif mudanca == 'insercao':
+                Produto.objects.create(sku='COND-NOVO', nome='Novo', preco=Decimal('1.00'))
+            elif mudanca == 'remocao':
+                produtos[0].delete()
+            else:
+                produtos[0].quantidade_estoque = 7
+                produtos[0].save(update_fields=['quantidade_estoque'])
+        response = api_client.get('/api/v1/products/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_etag_depende_do_filtro_e_da_pagina(self, api_client, produtos):
+        etags = {
+            api_client.get('/api/v1/products/', params)['ETag']
+            for params in ({}, {'ativo': 'true'}, {'page': 1}, {'ordering': 'preco'})
+        }
+
+        assert len(etags) == 4
+
+    def test_if_modified_since(self, api_client, produtos):
+        last_modified = api_client.get('/api/v1/products/')['Last-Modified']
+
+        assert api_client.get('/api/v1/products/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+        assert api_client.get('/api/v1/products/', HTTP_IF_MODIFIED_SINCE=http_date(0)).status_code == 200
+
+    def test_if_modified_since_depois_de_remocao(self, api_client, produtos, relogio,
+                                                django_capture_on_commit_callbacks):
+        last_modified = api_client.get('/api/v1/products/')['Last-Modified']
+
+        relogio.avancar()
+        with django_capture_on_commit_callbacks(execute=True):
+            produtos[0].delete()
+        response = api_client.get('/api/v1/products/', HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == 200
+        assert response.json()['count'] == 2
+
+    def test_sem_last_modified_com_escrita_no_segundo_corrente(self, api_client, produtos,
+                                                               django_capture_on_commit_callbacks):
+        # Outra escrita neste mesmo segundo não mudaria o Last-Modified
+        with django_capture_on_commit_callbacks(execute=True):
+            produtos[0].delete()
+        response = api_client.get('/api/v1/products/')
+
+        assert response['ETag']
+        assert 'Last-Modified' not in response
+
+    def test_pedidos_consideram_o_cliente(self, api_client, pedido_pendente, relogio,
+                                          django_capture_on_commit_callbacks):
+        url = '/api/v1/orders/?status=pendente'
+        etag = api_client.get(url)['ETag']
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        cliente = Cliente.objects.get(id=pedido_pendente.cliente_id)
+        cliente.nome = 'Cliente Renomeado'
+        with django_capture_on_commit_callbacks(execute=True):
+            cliente.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.json()['results'][0]['cliente_nome'] == 'Cliente Renomeado'
+
+    def test_pedido_que_sai_do_filtro_invalida(self, api_client, pedido_pendente, relogio,
+                                               django_capture_on_commit_callbacks):
+        url = '/api/v1/orders/?status=pendente'
+        etag = api_client.get(url)['ETag']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            PedidoRepository().atualizar_status_em_lote(
+                list(Pedido.objects.filter(id=pedido_pendente.id)), StatusPedido.CONFIRMADO
+            )
+
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_cache_fora_do_ar_lista_sem_validadores(self, api_client, produtos, monkeypatch):
+        monkeypatch.setattr(contagens, 'cache', CacheForaDoAr())
+
+        response = api_client.get('/api/v1/products/')
+
+        assert response.status_code == 200
+        assert 'ETag' not in response
+
+    def test_desligado(self, api_client, produtos, settings):
+        settings.LISTAGEM_CONDICIONAL = False
+
+        response = api_client.get('/api/v1/products/')
+
+        assert response.status_code == 200
+        assert 'ETag' not in response
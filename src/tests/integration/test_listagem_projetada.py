@@ -0,0 +1,65 @@
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+
+from common.serializers import ProjecaoSerializer, ProjecaoNaoSuportadaError
+from pedidos.serializers import PedidoDetailSerializer
+
+
+URLS_LISTAGEM = [
+    '/api/v1/orders/',
+    '/api/v1/orders/?status=pendente&ordering=valor_total',
+    '/api/v1/orders/?ordering=-status&page=2',
+    '/api/v1/products/',
+    '/api/v1/products/?ativo=true&ordering=preco',
+    '/api/v1/customers/',
+    '/api/v1/customers/?ordering=nome',
+]
+
+
+@pytest.fixture
+def base_listagem(db, cliente_ativo, cliente_inativo, varios_produtos_com_estoque, produto_inativo):
+    from pedidos.models import Pedido, StatusPedido
+
+    for i in range(15):
+        Pedido.objects.create(
+            cliente=cliente_ativo if i % 2 else cliente_inativo,
+            status=StatusPedido.CONFIRMADO if i % 3 else StatusPedido.PENDENTE,
+            valor_total=Decimal('10.50') * i,
+            observacoes=None if i % 2 else 'Observação com acentuação',
+            chave_idempotencia=f'listagem-{i}',
+        )
+    cliente_inativo.endereco = None
+    cliente_inativo.save()
+
+
+@pytest.mark.django_db
+class TestListagemProjetada:
+    @pytest.mark.parametrize('url', URLS_LISTAGEM)
+    def test_saida_identica_ao_serializer(self, url, api_client, base_listagem, settings):
+        settings.LISTAGEM_PROJETADA = False
+        esperado = api_client.get(url)
+
+        settings.LISTAGEM_PROJETADA = True
+        projetado = api_client.get(url)
+
+        assert projetado.status_code == esperado.status_code == 200
+        assert projetado.content == esperado.content
+
+    def test_nao_instancia_models(self, api_client, base_listagem, settings, django_assert_num_queries):
+        from pedidos.models import Pedido
+        # Só COUNT + página; o GET condicional é coberto em test_listagem_condicional
+        # Só COUNT + página; o MAX(updated_at) do GET condicional é coberto em test_listagem_condicional
+        settings.LISTAGEM_CONDICIONAL = False
+
+        with patch.object(Pedido, 'from_db', side_effect=AssertionError('model instanciado')):
+            with django_assert_num_queries(2):
+                response = api_client.get('/api/v1/orders/')
+
+        assert response.json()['results'][0]['cliente_nome']
+
+
+class TestProjecaoSerializer:
+    def test_serializer_aninhado_nao_suportado(self):
+        with pytest.raises(ProjecaoNaoSuportadaError):
+            ProjecaoSerializer(PedidoDetailSerializer)
@@ -0,0 +1,291 @@
+"""
+Orçamento de queries por endpoint.
+
+Cada rota de config/urls.py é exercitada com uma base pequena (n=1) e uma grande
+(n=100 itens/pedidos/registros por página). O número de queries deve ser o mesmo
+nos dois casos e não pode ultrapassar o orçamento definido em ORCAMENTOS.
+"""
+import json
+import pytest
+from decimal import Decimal
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.pagination import PageNumberPagination
+
+from clientes.models import Cliente
+from pedidos.models import Pedido, ItemPedido, HistoricoStatusPedido, StatusPedido
+from pedidos.services import CriarPedidoService
+from produtos.models import Produto
+
+
+TAMANHOS = (1, 100)
+
+# Chave: "<MÉTODO> <nome da rota>". Ao mudar um orçamento, justifique no PR.
+# Locks em modo 'timeout' somam 2 queries no MySQL (SET/restaura innodb_lock_wait_timeout).
+# Mudanças de status somam 1 query (upsert em contadores_status_pedido) e 1 das assinaturas de
+# webhook (mais o INSERT da entrega quando há assinante; ver pedidos.events.emitir_eventos).
+# ETag/Last-Modified das listagens vêm do cache (common.contagens.validadores_de_escrita): 0 query.
+ORCAMENTOS = {
+    'GET health:health-check': 1,
+    'GET health:liveness': 0,
+    'GET health:readiness': 1,
+    'GET schema': 0,
+    'GET swagger-ui': 0,
+    'GET customers-list': 2,
+    'POST customers-list': 3,
+    'GET customers-detail': 1,
+    'GET products-list': 2,
+    'POST products-list': 2,
+    'GET products-detail': 1,
+    'PATCH products-stock': 2,
+    'GET orders-list': 2,
+    'POST orders-list': 13,
+    'GET orders-detail': 3,
+    'PATCH orders-status-action': 10,
+    'DELETE orders-detail': 14,
+    'POST orders-claim': 7,
+    'GET orders-stats': 1,
+    'POST customers-import': 5,
+    'GET customers-batch-get': 1,
+    'POST customers-batch-get': 1,
+    'POST products-bulk-upsert': 5,
+    'POST products-bulk-stock': 5,
+    'GET products-batch-get': 1,
+    'POST products-batch-get': 1,
+    'GET orders-batch-get': 3,
+    'POST orders-batch-get': 3,
+}
+
+ROTAS_IGNORADAS = {'api-root'}
+
+
+def _rotas_nomeadas(padroes=None, namespace=None):
+    if padroes is None:
+        padroes = get_resolver().url_patterns
+    for padrao in padroes:
+        if isinstance(padrao, URLResolver):
+            if padrao.namespace == 'admin':
+                continue
+            yield from _rotas_nomeadas(padrao.url_patterns, padrao.namespace or namespace)
+        elif isinstance(padrao, URLPattern) and padrao.name:
+            yield f'{namespace}:{padrao.name}' if namespace else padrao.name
+
+
+def _criar_cliente(indice=0):
+    return Cliente.objects.create(
+        nome=f'Cliente Orçamento {indice}', cpf_cnpj=f'{indice:011d}', email=f'orcamento{indice}@teste.com',
+    )
+
+
+def _criar_produtos(quantidade, inicio=0):
+    return Produto.objects.bulk_create([
+        Produto(
+            sku=f'ORC-{i:05d}', nome=f'Produto Orçamento {i}', preco=Decimal('10.00'), quantidade_estoque=1000,
+        )
+        for i in range(inicio, inicio + quantidade)
+    ])
+
+
+def _criar_pedido(cliente, produtos, status=StatusPedido.PENDENTE, historico=0):
+    pedido = Pedido.objects.create(
+        cliente=cliente, status=status, valor_total=Decimal('10.00') * len(produtos),
+        chave_idempotencia=f'orcamento-{Pedido.all_objects.count()}',
+    )
+    ItemPedido.objects.bulk_create([
+        ItemPedido(
+            pedido=pedido, produto=produto, quantidade=1, preco_unitario=produto.preco, subtotal=produto.preco,
+        )
+        for produto in produtos
+    ])
+    HistoricoStatusPedido.objects.bulk_create([
+        HistoricoStatusPedido(pedido=pedido, status_anterior=None, status_novo=status)
+        for _ in range(historico)
+    ])
+    return pedido
+
+
+class Cenarios:
+    """Cada cenário recebe o tamanho n e retorna a função que executa a requisição."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_health_health_check(self, n):
+        return lambda: self.client.get('/health/')
+
+    def get_health_liveness(self, n):
+        return lambda: self.client.get('/health/live')
+
+    def get_health_readiness(self, n):
+        return lambda: self.client.get('/health/ready')
+
+    def get_schema(self, n):
+        return lambda: self.client.get('/api/schema/')
+
+    def get_swagger_ui(self, n):
+        return lambda: self.client.get('/api/docs/')
+
+    def get_customers_list(self, n):
+        for i in range(Cliente.objects.count(), n):
+            _criar_cliente(i)
+        return lambda: self.client.get('/api/v1/customers/')
+
+    def post_customers_list(self, n):
+        payload = {'nome': f'Novo {n}', 'cpf_cnpj': f'9{n:010d}', 'email': f'novo{n}@teste.com'}
+        return lambda: self.client.post('/api/v1/customers/', payload, format='json')
+
+    def post_customers_import(self, n):
+        corpo = '\n'.join(
+            json.dumps({'nome': f'Importado {i}', 'cpf_cnpj': f'7{n:04d}{i:06d}', 'email': f'imp{n}-{i}@teste.com'})
+            for i in range(n)
+        )
+        return lambda: self.client.post('/api/v1/customers/import/', corpo, content_type='application/x-ndjson')
+
+    def get_customers_detail(self, n):
+        cliente = _criar_cliente(n)
+        return lambda: self.client.get(f'/api/v1/customers/{cliente.id}/')
+
+    def get_products_list(self, n):
+        existentes = Produto.objects.count()
+        _criar_produtos(n - existentes, inicio=existentes)
+        return lambda: self.client.get('/api/v1/products/')
+
+    def post_products_list(self, n):
+        payload = {'sku': f'NOVO-{n}', 'nome': 'Produto Novo', 'preco': '10.00'}
+        return lambda: self.client.post('/api/v1/products/', payload, format='json')
+
+    def get_products_detail(self, n):
+        produto = _criar_produtos(1, inicio=n)[0]
+        return lambda: self.client.get(f'/api/v1/products/{produto.id}/')
+
+    def patch_products_stock(self, n):
+        produto = _criar_produtos(1, inicio=n)[0]
+        return lambda: self.client.patch(f'/api/v1/products/{produto.id}/stock/', {'quantidade': n}, format='json')
+
+    def get_orders_list(self, n):
+        cliente = _criar_cliente(n)
+        produtos = _criar_produtos(1, inicio=n)
+        for _ in range(Pedido.objects.count(), n):
+            _criar_pedido(cliente, produtos)
+        return lambda: self.client.get('/api/v1/orders/')
+
+    def post_orders_list(self, n):
+        cliente = _criar_cliente(n)
+        produtos = _criar_produtos(n, inicio=1000 * n)
+        payload = {
+            'cliente_id': cliente.id,
+            'itens': [{'produto_id': produto.id, 'quantidade': 1} for produto in produtos],
+            'idempotency_key': f'orcamento-criacao-{n}',
+        }
+        return lambda: self.client.post('/api/v1/orders/', payload, format='json')
+
+    def get_orders_detail(self, n):
+        pedido = _criar_pedido(_criar_cliente(n), _criar_produtos(n, inicio=1000 * n), historico=n)
+        return lambda: self.client.get(f'/api/v1/orders/{pedido.id}/')
+
+    def patch_orders_status_action(self, n):
+        pedido = _criar_pedido(_criar_cliente(n), _criar_produtos(n, inicio=1000 * n), historico=n)
+        return lambda: self.client.patch(
+            f'/api/v1/orders/{pedido.id}/status/', {'status': 'confirmado'}, format='json'
+        )
+
+    def post_orders_claim(self, n):
+        cliente = _criar_cliente(n)
+        produtos = _criar_produtos(1, inicio=1000 * n)
+        for _ in range(n):
+            _criar_pedido(cliente, produtos, status=StatusPedido.CONFIRMADO)
+        return lambda: self.client.post('/api/v1/orders/claim/', {'limite': n}, format='json')
+
+    def get_orders_stats(self, n):
+        cliente = _criar_cliente(n)
+        produtos = _criar_produtos(1, inicio=1000 * n)
+        for i in range(n):
+            CriarPedidoService().executar(cliente.id, [{'produto_id': produtos[0].id, 'quantidade': 1}],
+                                          f'stats-{n}-{i}')
+        return lambda: self.client.get('/api/v1/orders/stats/')
+
+    def get_customers_batch_get(self, n):
+        ids = [_criar_cliente(1000 * n + i).id for i in range(n)]
+        return lambda: self.client.get('/api/v1/customers/batch-get/', {'ids': ','.join(map(str, ids))})
+
+    def post_customers_batch_get(self, n):
+        ids = [_criar_cliente(500000 + 1000 * n + i).id for i in range(n)]
+        return lambda: self.client.post('/api/v1/customers/batch-get/', {'ids': ids}, format='json')
+
+    def post_products_bulk_upsert(self, n):
+        # Metade dos SKUs já existe (atualização), metade é nova
+        existentes = _criar_produtos(n, inicio=6000 + 1000 * n)
+        corpo = '\n'.join(
+            [json.dumps({'sku': produto.sku, 'preco': '99.90'}) for produto in existentes[::2]]
+            + [json.dumps({'sku': f'UPS-{n}-{i}', 'nome': 'Novo', 'preco': '1.00'}) for i in range(n)]
+        )
+        return lambda: self.client.post('/api/v1/products/bulk-upsert/', corpo, content_type='application/x-ndjson')
+
+    def post_products_bulk_stock(self, n):
+        produtos = _criar_produtos(n, inicio=8000 + 1000 * n)
+        payload = {
+            'skus': {produto.sku: 7 for produto in produtos[::2]},
+            'ids': {str(produto.id): 3 for produto in produtos[1::2]},
+        }
+        return lambda: self.client.post('/api/v1/products/stock/', payload, format='json')
+
+    def get_products_batch_get(self, n):
+        ids = [produto.id for produto in _criar_produtos(n, inicio=3000 + n)]
+        return lambda: self.client.get('/api/v1/products/batch-get/', {'ids': ','.join(map(str, ids))})
+
+    def post_products_batch_get(self, n):
+        ids = [produto.id for produto in _criar_produtos(n, inicio=4000 + n)]
+        return lambda: self.client.post('/api/v1/products/batch-get/', {'ids': ids}, format='json')
+
+    def _pedidos_para_lote(self, n):
+        cliente = _criar_cliente(n)
+        produtos = _criar_produtos(2, inicio=5000 + 10 * n)
+        return [_criar_pedido(cliente, produtos, historico=2).id for _ in range(n)]
+
+    def get_orders_batch_get(self, n):
+        ids = self._pedidos_para_lote(n)
+        return lambda: self.client.get('/api/v1/orders/batch-get/', {'ids': ','.join(map(str, ids))})
+
+    def post_orders_batch_get(self, n):
+        ids = self._pedidos_para_lote(n)
+        return lambda: self.client.post('/api/v1/orders/batch-get/', {'ids': ids}, format='json')
+
+    def delete_orders_detail(self, n):
+        pedido = _criar_pedido(_criar_cliente(n), _criar_produtos(n, inicio=1000 * n), historico=n)
+        return lambda: self.client.delete(f'/api/v1/orders/{pedido.id}/')
+
+
+def _nome_cenario(chave):
+    metodo, rota = chave.split(' ')
+    return f"{metodo.lower()}_{rota.replace(':', '_').replace('-', '_')}"
+
+
+@pytest.fixture
+def pagina_grande(monkeypatch):
+    monkeypatch.setattr(PageNumberPagination, 'page_size', max(TAMANHOS))
+
+
+@pytest.mark.django_db
+class TestOrcamentoConsultas:
+    def test_todas_as_rotas_tem_orcamento(self):
+        rotas_com_orcamento = {chave.split(' ')[1] for chave in ORCAMENTOS}
+
+        sem_orcamento = set(_rotas_nomeadas()) - rotas_com_orcamento - ROTAS_IGNORADAS
+
+        assert not sem_orcamento, f'Rotas sem orçamento de queries: {sorted(sem_orcamento)}'
+
+    @pytest.mark.parametrize('chave', sorted(ORCAMENTOS))
+    def test_queries_constantes_e_dentro_do_orcamento(self, chave, api_client, orcamento_consultas, pagina_grande):
+        cenarios = Cenarios(api_client)
+        montar = getattr(cenarios, _nome_cenario(chave))
+
+        contagens = {}
+        for tamanho in TAMANHOS:
+            requisicao = montar(tamanho)
+            contagens[tamanho], resposta = orcamento_consultas(
+                chave, tamanho, requisicao, orcamento=ORCAMENTOS[chave]
+            )
+            assert resposta.status_code < 400, resposta.content
+
+        assert len(set(contagens.values())) == 1, f'{chave}: queries variam com o volume {contagens}'
+        assert max(contagens.values()) <= ORCAMENTOS[chave], \
+            f'{chave}: {max(contagens.values())} queries, orçamento {ORCAMENTOS[chave]}'
@@ -0,0 +1,172 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from clientes.models import Cliente
+from common import contagens as modulo_contagens, pagination
+from common.pagination import estimar_linhas
+from pedidos.models import Pedido, StatusPedido
+from pedidos.repositories import PedidoRepository
+from produtos.models import Produto
+
+
+@pytest.fixture
+def cache_de_contagens(settings):
+    settings.PAGINACAO_CONTAGEM_TTL = 30
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _criar_produtos(quantidade, ativo=True):
+    inicio = Produto.objects.count()
+    for i in range(inicio, inicio + quantidade):
+        Produto.objects.create(sku=f'PAG-{i}', nome=f'Produto {i}', preco=Decimal('1.00'), ativo=ativo)
+
+
+def _listar(api_client, url, **params):
+    with CaptureQueriesContext(connection) as contexto:
+        resposta = api_client.get(url, params)
+    assert resposta.status_code == 200
+    contagens = [q['sql'] for q in contexto.captured_queries if 'COUNT(' in q['sql'].upper()]
+    return resposta.data, contagens
+
+
+@pytest.mark.django_db
+class TestContagemExata:
+    @pytest.mark.parametrize('url', ['/api/v1/products/', '/api/v1/customers/', '/api/v1/orders/'])
+    def test_resposta_sinaliza_contagem_exata(self, api_client, pedido_pendente, url):
+        dados, contagens = _listar(api_client, url)
+
+        assert dados['count'] == 1
+        assert dados['count_is_exact'] is True
+        # O COUNT nunca percorre mais que limite + 1 linhas
+        assert len(contagens) == 1 and 'LIMIT' in contagens[0].upper()
+
+    def test_acima_do_limite_contagem_estimada(self, api_client, settings):
+        settings.PAGINACAO_CONTAGEM_LIMITE = 3
+        _criar_produtos(5)
+
+        dados, _ = _listar(api_client, '/api/v1/products/')
+
+        assert dados['count_is_exact'] is False
+        # Sem estatísticas do InnoDB (sqlite), fica no piso de limite + 1
+        assert dados['count'] >= 4
+        assert len(dados['results']) == 4
+
+
+@pytest.mark.django_db
+class TestCacheDeContagem:
+    def test_segunda_pagina_usa_o_cache(self, api_client, cache_de_contagens):
+        _criar_produtos(3)
+
+        primeira, contagens = _listar(api_client, '/api/v1/products/')
+        segunda, contagens_cache = _listar(api_client, '/api/v1/products/')
+
+        assert len(contagens) == 1
+        assert contagens_cache == []
+        assert segunda['count'] == primeira['count'] == 3
+        assert segunda['count_is_exact'] is True
+
+    def test_cache_por_combinacao_de_filtros(self, api_client, cache_de_contagens):
+        _criar_produtos(3)
+        _criar_produtos(2, ativo=False)
+
+        todos, _ = _listar(api_client, '/api/v1/products/')
+        ativos, contagens = _listar(api_client, '/api/v1/products/', ativo='true')
+
+        assert (todos['count'], ativos['count']) == (5, 3)
+        assert len(contagens) == 1
+
+    def test_insercao_invalida_o_cache(self, api_client, cache_de_contagens, django_capture_on_commit_callbacks):
+        _listar(api_client, '/api/v1/customers/')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Cliente.objects.create(nome='Novo', cpf_cnpj='98765432100', email='novo@teste.com')
+        dados, contagens = _listar(api_client, '/api/v1/customers/')
+
+        assert dados['count'] == 1
+        assert len(contagens) == 1
+
+    def test_alteracao_de_estoque_nao_invalida(self, api_client, cache_de_contagens,
+                                                 django_capture_on_commit_callbacks):
+        _criar_produtos(1)
+        _listar(api_client, '/api/v1/products/')
+        produto = Produto.objects.get()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            produto.quantidade_estoque = 99
+            produto.save(update_fields=['quantidade_estoque', 'updated_at'])
+        _, contagens = _listar(api_client, '/api/v1/products/')
+
+        assert contagens == []
+
+    def test_status_em_lote_invalida_o_cache(self, api_client, pedido_pendente, cache_de_contagens,
+                                              django_capture_on_commit_callbacks):
+        antes, _ = _listar(api_client, '/api/v1/orders/', status='pendente')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            PedidoRepository().atualizar_status_em_lote([pedido_pendente], StatusPedido.CONFIRMADO)
+        depois, _ = _listar(api_client, '/api/v1/orders/', status='pendente')
+
+        assert (antes['count'], depois['count']) == (1, 0)
+
+
+class CacheForaDoAr:
+    """Como o RedisCache com o Redis parado: toda operação levanta."""
+
+    def __getattr__(self, nome):
+        def falhar(*args, **kwargs):
+            raise ConnectionError('Error 111 connecting to redis:6379. Connection refused.')
+        return falhar
+
+
+@pytest.mark.django_db
+class TestCacheIndisponivel:
+    @pytest.fixture
+    def cache_fora_do_ar(self, monkeypatch, cache_de_contagens):
+        monkeypatch.setattr(pagination, 'cache', CacheForaDoAr())
+        monkeypatch.setattr(modulo_contagens, 'cache', CacheForaDoAr())
+
+    @pytest.mark.parametrize('url', ['/api/v1/products/', '/api/v1/customers/', '/api/v1/orders/'])
+    def test_listagem_conta_sem_cache(self, api_client, pedido_pendente, cache_fora_do_ar, url):
+        dados, contagens = _listar(api_client, url)
+
+        assert (dados['count'], dados['count_is_exact']) == (1, True)
+        assert len(contagens) == 1
+
+    def test_escrita_confirmada_nao_falha_na_invalidacao(self, api_client, cliente_ativo, produto_com_estoque,
+                                                          cache_fora_do_ar, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            resposta = api_client.post('/api/v1/orders/', {
+                'cliente_id': cliente_ativo.id,
+                'itens': [{'produto_id': produto_com_estoque.id, 'quantidade': 1}],
+                'idempotency_key': 'cache-fora-do-ar',
+            }, format='json')
+
+        assert resposta.status_code == 201
+        assert Pedido.objects.count() == 1
+
+
+class TestEstimativa:
+    def test_usa_a_linha_do_plano_da_tabela_contada(self, monkeypatch):
+        monkeypatch.setattr(pagination, 'connections', {'default': SimpleNamespace(vendor='mysql')})
+        explicados = []
+
+        def explicar(queryset):
+            explicados.append(str(queryset.query))
+            return [
+                {'table': 'clientes', 'rows': 1, 'filtered': 100.0},
+                {'table': 'pedidos', 'rows': 50000, 'filtered': 10.0},
+            ]
+        monkeypatch.setattr(pagination, 'explicar_queryset', explicar)
+
+        estimativa = estimar_linhas(Pedido.objects.select_related('cliente').filter(cliente__ativo=True))
+
+        assert estimativa == 5000
+        # O select_related não entra no EXPLAIN; o JOIN do filtro continua
+        assert explicados[0].count('JOIN') == 1
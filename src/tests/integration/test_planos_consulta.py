@@ -0,0 +1,15 @@
+import pytest
+
+from common.query_plan_scenarios import popular_base, cenarios_padrao
+
+
+@pytest.mark.django_db
+class TestPlanosConsulta:
+    def test_cenarios_executam_sem_erro(self):
+        contexto = popular_base(quantidade_clientes=10, quantidade_produtos=10, quantidade_pedidos=20)
+
+        for _, cenario in cenarios_padrao(contexto):
+            cenario()
+
+    def test_fluxos_principais_sem_regressao_de_plano(self, guarda_planos):
+        guarda_planos(cenarios_padrao(popular_base()))
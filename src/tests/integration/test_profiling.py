@@ -0,0 +1,168 @@
+import os
+import time
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from clientes.models import Cliente
+from common import profiling
+from common.profiling import AmostradorPilhas, BufferCircularPerfis, regras_de_amostragem
+from produtos.models import Produto
+
+
+@pytest.fixture
+def perfis(settings, tmp_path):
+    settings.PROFILING_DIR = str(tmp_path)
+    settings.PROFILING_TOKEN = 'segredo'
+    settings.PROFILING_AMOSTRAGEM = ''
+    settings.PROFILING_MODO = 'deterministico'
+    return BufferCircularPerfis()
+
+
+@pytest.fixture
+def pedido_payload(db):
+    cliente = Cliente.objects.create(nome='Perfilado', cpf_cnpj='98765432100', email='perfil@teste.com')
+    produto = Produto.objects.create(sku='PRF-1', nome='Produto', preco=Decimal('5.00'), quantidade_estoque=10)
+    return {'cliente_id': cliente.id, 'itens': [{'produto_id': produto.id, 'quantidade': 1}], 'idempotency_key': 'prf-1'}
+
+
+class TestRegrasDeAmostragem:
+    def test_formato(self):
+        assert regras_de_amostragem('POST /api/v1/orders/=0.01, * /api/v1/products/=1') == [
+            ('POST', '/api/v1/orders/', 0.01), ('*', '/api/v1/products/', 1.0),
+        ]
+        assert regras_de_amostragem('') == []
+
+    def test_regra_invalida(self):
+        with pytest.raises(ValueError):
+            regras_de_amostragem('POST=0.5')
+
+
+@pytest.mark.django_db
+class TestPerfilRequisicaoMiddleware:
+    def test_cabecalho_autorizado_grava_perfil_com_sql(self, api_client, perfis, pedido_payload):
+        response = api_client.post('/api/v1/orders/', pedido_payload, format='json', HTTP_X_PROFILE='segredo')
+
+        assert response.status_code == 201
+        perfil = perfis.obter(response['X-Profile-Id'])
+        assert (perfil['metodo'], perfil['caminho'], perfil['status']) == ('POST', '/api/v1/orders/', 201)
+        assert perfil['motivo'] == 'cabecalho'
+        assert perfil['consultas'] == len(perfil['sql']) > 0
+        assert any('INSERT INTO "pedidos"' in consulta['sql'] for consulta in perfil['sql'])
+        assert any(
+            funcao['funcao'].startswith('executar (') and 'pedidos/services.py' in funcao['funcao']
+            for funcao in perfil['funcoes']
+        )
+
+    @pytest.mark.parametrize('cabecalho', [None, 'errado'])
+    def test_sem_token_valido_nao_perfila(self, api_client, perfis, cabecalho):
+        extra = {'HTTP_X_PROFILE': cabecalho} if cabecalho else {}
+
+        response = api_client.get('/api/v1/products/', **extra)
+
+        assert 'X-Profile-Id' not in response
+        assert perfis.listar() == []
+
+    def test_regra_de_amostragem_por_metodo_e_prefixo(self, api_client, perfis, settings):
+        settings.PROFILING_TOKEN = ''
+        settings.PROFILING_AMOSTRAGEM = 'GET /api/v1/products/=1'
+        settings.PROFILING_MODO = 'amostragem'
+        settings.PROFILING_INTERVALO_AMOSTRAGEM = 0.0005
+
+        amostrada = api_client.get('/api/v1/products/')
+        fora_da_regra = api_client.get('/api/v1/customers/')
+
+        assert 'X-Profile-Id' not in fora_da_regra
+        perfil = perfis.obter(amostrada['X-Profile-Id'])
+        assert (perfil['motivo'], perfil['modo']) == ('amostragem', 'amostragem')
+        assert perfil['amostras'] == sum(perfil['pilhas'].values())
+        # Pilhas começam abaixo do middleware, não no servidor de teste
+        assert not any('django.test.client' in pilha for pilha in perfil['pilhas'])
+
+    def test_falha_ao_gravar_nao_afeta_a_resposta(self, api_client, perfis, monkeypatch, caplog):
+        def disco_cheio(self, perfil, profiler=None):
+            raise OSError(28, 'No space left on device')
+        monkeypatch.setattr(BufferCircularPerfis, 'salvar', disco_cheio)
+
+        response = api_client.get('/api/v1/products/', HTTP_X_PROFILE='segredo')
+
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response
+        assert 'Falha ao gravar o perfil' in caplog.text
+
+    def test_prof_acima_do_limite_nao_e_gravado(self, api_client, perfis, monkeypatch):
+        monkeypatch.setattr(profiling, 'MAX_BYTES_PROF', 10)
+
+        perfil_id = api_client.get('/api/v1/products/', HTTP_X_PROFILE='segredo')['X-Profile-Id']
+
+        assert perfis.obter(perfil_id)['funcoes']
+        assert not os.path.exists(perfis.caminho(perfil_id, 'prof'))
+
+    def test_sem_configuracao_o_middleware_sai_da_cadeia(self, api_client, perfis, settings):
+        settings.PROFILING_TOKEN = ''
+
+        response = api_client.get('/api/v1/products/', HTTP_X_PROFILE='segredo')
+
+        assert 'X-Profile-Id' not in response
+
+
+class TestAmostradorPilhas:
+    def test_pilhas_distintas_limitadas(self):
+        def recursiva(n):
+            return recursiva(n - 1) if n else time.sleep(0.05)
+
+        with AmostradorPilhas(0.0005, max_pilhas=1) as amostrador:
+            for profundidade in range(5):
+                recursiva(profundidade)
+
+        assert len(amostrador.pilhas) == 1
+        assert amostrador.descartadas > 0
+
+
+class TestBufferCircularPerfis:
+    def test_falha_na_escrita_nao_deixa_arquivos(self, tmp_path):
+        buffer = BufferCircularPerfis(str(tmp_path))
+
+        with pytest.raises(TypeError):
+            buffer.salvar({'id': 'p1', 'sql': [object()]})
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_descarta_os_mais_antigos(self, tmp_path):
+        buffer = BufferCircularPerfis(str(tmp_path), maximo=2)
+        ids = [f'20260101T00000{i}000000-abc' for i in range(3)]
+        for perfil_id in ids:
+            buffer.salvar({'id': perfil_id, 'sql': []})
+
+        assert [perfil['id'] for perfil in buffer.listar()] == ids[:0:-1]
+        assert sorted(p.name for p in tmp_path.iterdir()) == [f'{perfil_id}.json' for perfil_id in ids[1:]]
+
+
+@pytest.mark.django_db
+class TestComandoPerfisRequisicao:
+    def test_lista_e_mostra(self, api_client, perfis):
+        perfil_id = api_client.get('/api/v1/products/', HTTP_X_PROFILE='segredo')['X-Profile-Id']
+        lista, detalhe = StringIO(), StringIO()
+
+        call_command('perfis_requisicao', stdout=lista)
+        call_command('perfis_requisicao', perfil_id, top=5, stdout=detalhe)
+
+        assert perfil_id in lista.getvalue() and '/api/v1/products/' in lista.getvalue()
+        assert 'Funções por tempo acumulado' in detalhe.getvalue()
+        assert 'consulta(s)' in detalhe.getvalue()
+        assert 'pstats completo' in detalhe.getvalue()
+
+    def test_folded_e_limpar(self, perfis):
+        perfis.salvar({'id': 'p1', 'sql': [], 'pilhas': {'a;b': 3, 'a;c': 1}})
+        folded, limpar = StringIO(), StringIO()
+
+        call_command('perfis_requisicao', 'p1', folded=True, stdout=folded)
+        call_command('perfis_requisicao', limpar=True, stdout=limpar)
+
+        assert folded.getvalue().splitlines() == ['a;b 3', 'a;c 1']
+        assert '1 perfil(is) apagado(s)' in limpar.getvalue()
+        with pytest.raises(CommandError):
+            call_command('perfis_requisicao', 'p1')
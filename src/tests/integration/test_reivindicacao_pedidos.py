@@ -0,0 +1,155 @@
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+
+from common.explain import indices_usados
+from pedidos.models import Pedido, HistoricoStatusPedido, StatusPedido
+from pedidos.repositories import PedidoRepository
+from pedidos.services import ReivindicarPedidosService
+from pedidos.workers import WorkerProcessamento
+
+
+@pytest.fixture
+def pedidos_confirmados(db, cliente_ativo):
+    def criar(quantidade, status=StatusPedido.CONFIRMADO):
+        agora = timezone.now()
+        pedidos = []
+        for i in range(quantidade):
+            pedido = Pedido.objects.create(
+                cliente=cliente_ativo, status=status, valor_total=Decimal('10.00'),
+                chave_idempotencia=f'reivindicacao-{status}-{i}',
+            )
+            # created_at crescente para a ordem de reivindicação ser determinística
+            Pedido.objects.filter(id=pedido.id).update(created_at=agora - timedelta(minutes=quantidade - i))
+            pedidos.append(pedido)
+        return pedidos
+    return criar
+
+
+@pytest.mark.django_db
+class TestReivindicarPedidosService:
+    def test_reivindica_os_mais_antigos_ate_o_limite(self, pedidos_confirmados):
+        confirmados = pedidos_confirmados(5)
+        pedidos_confirmados(2, status=StatusPedido.PENDENTE)
+
+        reivindicados = ReivindicarPedidosService().executar(3, reivindicado_por='worker-1')
+
+        assert [p.id for p in reivindicados] == [p.id for p in confirmados[:3]]
+        assert all(p.status == StatusPedido.EM_PROCESSAMENTO for p in reivindicados)
+        assert Pedido.objects.filter(status=StatusPedido.EM_PROCESSAMENTO).count() == 3
+        assert Pedido.objects.filter(status=StatusPedido.PENDENTE).count() == 2
+        historico = HistoricoStatusPedido.objects.filter(alterado_por='worker-1')
+        assert historico.count() == 3
+        assert set(historico.values_list('status_anterior', 'status_novo')) == {
+            (StatusPedido.CONFIRMADO, StatusPedido.EM_PROCESSAMENTO)
+        }
+
+    def test_lotes_sucessivos_sao_disjuntos(self, pedidos_confirmados):
+        pedidos_confirmados(5)
+        service = ReivindicarPedidosService()
+
+        primeiro = service.executar(3)
+        segundo = service.executar(3)
+        terceiro = service.executar(3)
+
+        assert len(primeiro) == 3 and len(segundo) == 2 and terceiro == []
+        assert not {p.id for p in primeiro} & {p.id for p in segundo}
+
+    def test_ignora_pedidos_removidos(self, pedidos_confirmados):
+        removido, = pedidos_confirmados(1)
+        removido.delete()
+
+        assert ReivindicarPedidosService().executar(10) == []
+
+    def test_endpoint_claim(self, api_client, pedidos_confirmados):
+        pedidos_confirmados(3)
+
+        response = api_client.post('/api/v1/orders/claim/', {'limite': 2}, format='json')
+
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+        assert {p['status'] for p in response.json()} == {StatusPedido.EM_PROCESSAMENTO}
+
+    def test_endpoint_claim_valida_limite(self, api_client):
+        response = api_client.post('/api/v1/orders/claim/', {'limite': 0}, format='json')
+
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestWorkerProcessamento:
+    def test_ciclo_entrega_cada_pedido_ao_handler(self, pedidos_confirmados):
+        pedidos_confirmados(3)
+        processados = []
+
+        worker = WorkerProcessamento(processar=processados.append, lote=2, intervalo_ocioso=0, identificador='w')
+
+        assert worker.executar(max_ciclos=3) == 3
+        assert len(processados) == 3
+
+    def test_falha_no_handler_nao_interrompe_o_lote(self, pedidos_confirmados):
+        pedidos_confirmados(2)
+        processados = []
+
+        def processar(pedido):
+            processados.append(pedido)
+            if len(processados) == 1:
+                raise RuntimeError('impressora sem papel')
+
+        worker = WorkerProcessamento(processar=processar, lote=2, intervalo_ocioso=0, identificador='w')
+
+        assert worker.executar_ciclo() == 2
+        assert len(processados) == 2
+
+    def test_comando(self, pedidos_confirmados):
+        pedidos_confirmados(2)
+        saida = StringIO()
+
+        call_command('processar_pedidos', '--max-ciclos', '1', '--intervalo', '0', '--worker', 'cmd', stdout=saida)
+
+        assert '2 pedido(s) reivindicado(s)' in saida.getvalue()
+        assert HistoricoStatusPedido.objects.filter(alterado_por='cmd').count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSkipLockedMySQL:
+    @pytest.fixture(autouse=True)
+    def requer_mysql(self):
+        if connection.vendor != 'mysql':
+            pytest.skip('SKIP LOCKED e EXPLAIN requerem MySQL')
+
+    def test_usa_indice_de_status(self, pedidos_confirmados):
+        pedidos_confirmados(3)
+        queryset = Pedido.objects.filter(status=StatusPedido.CONFIRMADO).order_by('created_at', 'id')[:2]
+
+        assert indices_usados(queryset)['pedidos'] == 'idx_pedido_status_created'
+
+    def test_transacoes_concorrentes_recebem_lotes_disjuntos(self, pedidos_confirmados):
+        pedidos_confirmados(4)
+        travados, liberar = threading.Event(), threading.Event()
+        lote_outro_worker = []
+
+        def outro_worker():
+            with transaction.atomic():
+                lote_outro_worker.extend(PedidoRepository().reivindicar_por_status(StatusPedido.CONFIRMADO, 2))
+                travados.set()
+                liberar.wait(10)
+            connection.close()
+
+        thread = threading.Thread(target=outro_worker)
+        thread.start()
+        travados.wait(10)
+        try:
+            meu_lote = ReivindicarPedidosService().executar(10)
+        finally:
+            liberar.set()
+            thread.join()
+
+        assert len(meu_lote) == 2
+        assert not {p.id for p in meu_lote} & {p.id for p in lote_outro_worker}
@@ -0,0 +1,175 @@
+import json
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from produtos.models import Produto
+from produtos.repositories import ProdutoRepository
+
+
+@pytest.fixture
+def catalogo(db):
+    return [
+        Produto.objects.create(sku=f'CAT-{i}', nome=f'Produto {i}', preco=Decimal('10.00'), quantidade_estoque=5)
+        for i in range(3)
+    ]
+
+
+def _sincronizar(api_client, *registros, **params):
+    corpo = '\n'.join(json.dumps(registro) for registro in registros)
+    url = '/api/v1/products/bulk-upsert/'
+    if params:
+        url += '?' + '&'.join(f'{chave}={valor}' for chave, valor in params.items())
+    return api_client.post(url, corpo, content_type='application/x-ndjson')
+
+
+@pytest.mark.django_db
+class TestSincronizacaoCatalogo:
+    def test_cria_atualiza_e_ignora_inalterados(self, api_client, catalogo):
+        response = _sincronizar(
+            api_client,
+            {'sku': 'CAT-0', 'nome': 'Produto 0', 'preco': '10.00'},
+            {'sku': 'CAT-1', 'preco': '12.50'},
+            {'sku': 'CAT-NOVO', 'nome': 'Novo', 'preco': '3.00'},
+        )
+
+        assert response.status_code == 200
+        assert {chave: response.data[chave] for chave in ('criados', 'atualizados', 'inalterados')} == {
+            'criados': 1, 'atualizados': 1, 'inalterados': 1,
+        }
+        assert response.data['linhas'] == 3
+        assert response.data['linhas_por_segundo'] > 0
+        assert Produto.objects.get(sku='CAT-1').preco == Decimal('12.50')
+        assert Produto.objects.get(sku='CAT-NOVO').nome == 'Novo'
+
+    def test_atualizacao_parcial_preserva_o_resto(self, api_client, catalogo):
+        antes = Produto.objects.get(sku='CAT-2')
+
+        _sincronizar(api_client, {'sku': 'CAT-2', 'ativo': False})
+
+        depois = Produto.objects.get(sku='CAT-2')
+        assert depois.ativo is False
+        assert (depois.nome, depois.preco, depois.quantidade_estoque) == ('Produto 2', Decimal('10.00'), 5)
+        assert depois.updated_at > antes.updated_at
+
+    def test_inalterado_nao_escreve(self, api_client, catalogo):
+        with CaptureQueriesContext(connection) as contexto:
+            response = _sincronizar(api_client, *[{'sku': p.sku, 'preco': '10.0'} for p in catalogo])
+
+        assert response.data['inalterados'] == 3
+        assert not any(q['sql'].startswith(('UPDATE', 'INSERT')) for q in contexto.captured_queries)
+
+    def test_escritas_em_lote(self, api_client, catalogo, settings):
+        settings.PRODUTOS_SINCRONIZACAO_LOTE = 100
+        registros = [{'sku': p.sku, 'nome': f'Renomeado {p.sku}'} for p in catalogo]
+        registros += [{'sku': f'LOTE-{i}', 'nome': 'Novo', 'preco': '1.00'} for i in range(20)]
+
+        with CaptureQueriesContext(connection) as contexto:
+            response = _sincronizar(api_client, *registros)
+
+        assert (response.data['criados'], response.data['atualizados']) == (20, 3)
+        escritas = [q['sql'].split()[0] for q in contexto.captured_queries if q['sql'].startswith(('UPDATE', 'INSERT'))]
+        assert sorted(escritas) == ['INSERT', 'UPDATE']
+
+    def test_excluidos_nao_sao_alterados_nem_recriados(self, api_client, catalogo):
+        Produto.objects.filter(sku='CAT-0').update(deleted_at=timezone.now())
+
+        response = _sincronizar(api_client, {'sku': 'CAT-0', 'nome': 'Outro', 'preco': '1.00'})
+
+        assert response.data['excluidos'] == 1
+        produto = Produto.all_objects.get(sku='CAT-0')
+        assert produto.nome == 'Produto 0' and produto.deleted_at is not None
+
+    def test_restaurar_excluidos(self, api_client, catalogo):
+        Produto.objects.filter(sku='CAT-0').update(deleted_at=timezone.now())
+
+        response = _sincronizar(api_client, {'sku': 'CAT-0'}, restaurar_excluidos='true')
+
+        assert response.data['atualizados'] == 1
+        assert Produto.objects.filter(sku='CAT-0').exists()
+
+    def test_rejeicoes_por_linha(self, api_client, catalogo):
+        response = _sincronizar(
+            api_client,
+            {'sku': 'SEM-PRECO', 'nome': 'Incompleto'},
+            {'nome': 'Sem SKU', 'preco': '1.00'},
+            {'sku': 'CAT-0', 'preco': '0.00'},
+            {'sku': 'CAT-1', 'nome': 'Válido'},
+        )
+
+        assert response.data['atualizados'] == 1
+        assert response.data['rejeitados'] == 3
+        erros = {erro['linha']: erro['erros'] for erro in response.data['erros']}
+        assert list(erros) == [1, 2, 3]
+        assert list(erros[1]) == ['preco']
+        assert list(erros[2]) == ['sku']
+        assert list(erros[3]) == ['preco']
+
+    def test_sku_repetido_vale_a_ultima_linha(self, api_client, catalogo):
+        response = _sincronizar(api_client, {'sku': 'CAT-0', 'nome': 'Primeiro'}, {'sku': 'CAT-0', 'nome': 'Último'})
+
+        assert response.data['atualizados'] == 1
+        assert Produto.objects.get(sku='CAT-0').nome == 'Último'
+
+    def test_sku_sem_diferenciar_maiusculas(self, api_client, catalogo):
+        response = _sincronizar(
+            api_client,
+            {'sku': 'Caixa-1', 'nome': 'Primeiro', 'preco': '1.00'},
+            {'sku': 'CAIXA-1', 'nome': 'Último', 'preco': '1.00'},
+        )
+
+        assert response.data['criados'] == 1
+        assert Produto.objects.get(sku='CAIXA-1').nome == 'Último'
+
+    def test_sku_existente_com_outra_grafia(self, api_client, catalogo):
+        if connection.vendor != 'mysql':
+            pytest.skip('Depende da collation sem diferenciar maiúsculas do MySQL')
+
+        response = _sincronizar(api_client, {'sku': 'cat-0', 'nome': 'Renomeado'})
+
+        assert (response.data['criados'], response.data['atualizados']) == (0, 1)
+        produto = Produto.objects.get(pk=catalogo[0].pk)
+        assert (produto.sku, produto.nome) == ('CAT-0', 'Renomeado')
+
+    def test_conflito_persistente_rejeita_o_lote(self, api_client, catalogo, monkeypatch):
+        def conflito(self, produtos, tamanho_lote):
+            raise IntegrityError("Duplicate entry 'NOVO-1' for key 'sku'")
+        monkeypatch.setattr(ProdutoRepository, 'criar_em_lote', conflito)
+
+        response = _sincronizar(
+            api_client, {'sku': 'CAT-0', 'nome': 'Renomeado'}, {'sku': 'NOVO-1', 'nome': 'Novo', 'preco': '1.00'},
+        )
+
+        assert response.status_code == 200
+        assert (response.data['criados'], response.data['atualizados'], response.data['rejeitados']) == (0, 0, 2)
+        assert [erro['linha'] for erro in response.data['erros']] == [1, 2]
+        assert Produto.objects.get(sku='CAT-0').nome == 'Produto 0'
+
+    def test_csv(self, api_client, catalogo):
+        corpo = 'sku,nome,preco\nCAT-0,Produto 0,11.00\nCSV-1,Do CSV,2.00\n'
+
+        response = api_client.post('/api/v1/products/bulk-upsert/', corpo, content_type='text/csv')
+
+        assert (response.data['criados'], response.data['atualizados']) == (1, 1)
+
+
+@pytest.mark.django_db
+class TestComandoSincronizarProdutos:
+    def test_relatorio(self, tmp_path, catalogo):
+        arquivo = tmp_path / 'catalogo.jsonl'
+        arquivo.write_text('\n'.join([
+            json.dumps({'sku': 'CAT-0', 'preco': '15.00'}),
+            json.dumps({'sku': 'CMD-1', 'nome': 'Novo'}),
+        ]))
+        saida, erros = StringIO(), StringIO()
+
+        call_command('sincronizar_produtos', str(arquivo), stdout=saida, stderr=erros)
+
+        assert '0 criado(s), 1 atualizado(s), 0 inalterado(s)' in saida.getvalue()
+        assert 'linhas/s' in saida.getvalue()
+        assert 'linha 2: preco:' in erros.getvalue()
@@ -0,0 +1,314 @@
+import json
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+from common import events
+from common.events import EmissorEventos, sink_log
+from pedidos.services import AlterarStatusPedidoService, CancelarPedidoService, CriarPedidoService
+from webhooks.entrega import EntregadorWebhooks, assinar, calcular_lease_minimo, calcular_proxima_tentativa
+from webhooks.models import AssinaturaWebhook, EntregaWebhook, EntregaWebhookMorta
+from webhooks.services import RegistrarEntregasService
+
+
+class ServidorWebhook:
+    """Servidor HTTP local que registra as requisições e responde com os status configurados."""
+
+    def __init__(self):
+        self.requisicoes = []
+        self.conexoes = set()
+        self.respostas = []
+        self.ativas = 0
+        self.pico_concorrencia = 0
+        self.atraso = 0
+        self._lock = threading.Lock()
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                with servidor._lock:
+                    servidor.ativas += 1
+                    servidor.pico_concorrencia = max(servidor.pico_concorrencia, servidor.ativas)
+                    servidor.conexoes.add(self.client_address)
+                corpo = self.rfile.read(int(self.headers['Content-Length']))
+                time.sleep(servidor.atraso)
+                with servidor._lock:
+                    servidor.requisicoes.append({'headers': dict(self.headers), 'corpo': corpo})
+                    status = servidor.respostas.pop(0) if servidor.respostas else 200
+                    servidor.ativas -= 1
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}/hook'
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def servidor():
+    with ServidorWebhook() as instancia:
+        yield instancia
+
+
+@pytest.fixture
+def entregador():
+    instancia = EntregadorWebhooks(concorrencia=4, lote=50, max_tentativas=3, backoff_base=10, backoff_max=100)
+    yield instancia
+    instancia.encerrar()
+
+
+def _evento(tipo, pedido_id=1):
+    return {'evento': tipo, 'payload': {'pedido_id': pedido_id}, 'emitido_em': timezone.now().isoformat()}
+
+
+def registrar_entregas(lote):
+    return RegistrarEntregasService().executar(lote)
+
+
+def _vencer_entregas():
+    EntregaWebhook.objects.update(proxima_tentativa_em=timezone.now() - timedelta(seconds=1))
+
+
+@pytest.mark.django_db
+class TestRegistroDeEntregas:
+    def test_agrupa_eventos_assinados_por_endpoint(self):
+        cancelados = AssinaturaWebhook.objects.create(url='http://a/hook', segredo='s', eventos=['pedido.cancelado'])
+        todos = AssinaturaWebhook.objects.create(
+            url='http://b/hook', segredo='s', eventos=['pedido.criado', 'pedido.cancelado'],
+        )
+        AssinaturaWebhook.objects.create(url='http://c/hook', segredo='s', eventos=['pedido.cancelado'], ativo=False)
+
+        registrar_entregas([_evento('pedido.criado'), _evento('pedido.cancelado'), _evento('pedido.enviado')])
+
+        entregas = {entrega.assinatura_id: entrega for entrega in EntregaWebhook.objects.all()}
+        assert set(entregas) == {cancelados.id, todos.id}
+        assert [e['evento'] for e in entregas[cancelados.id].eventos] == ['pedido.cancelado']
+        assert [e['evento'] for e in entregas[todos.id].eventos] == ['pedido.criado', 'pedido.cancelado']
+
+    def test_divide_lotes_grandes(self, settings):
+        settings.WEBHOOK_EVENTOS_POR_ENTREGA = 2
+        AssinaturaWebhook.objects.create(url='http://a/hook', segredo='s', eventos=['pedido.criado'])
+
+        registrar_entregas([_evento('pedido.criado', i) for i in range(5)])
+
+        assert sorted(len(e.eventos) for e in EntregaWebhook.objects.all()) == [1, 2, 2]
+
+
+@pytest.mark.django_db
+class TestEntregador:
+    def test_entrega_assinada_e_removida(self, servidor, entregador):
+        AssinaturaWebhook.objects.create(url=servidor.url, segredo='segredo', eventos=['pedido.cancelado'])
+        registrar_entregas([_evento('pedido.cancelado', 7)])
+
+        assert entregador.executar_ciclo() == (1, 0)
+
+        requisicao, = servidor.requisicoes
+        headers = requisicao['headers']
+        esperado = assinar('segredo', headers['X-Webhook-Timestamp'], requisicao['corpo'])
+        assert headers['X-Webhook-Signature'] == f'sha256={esperado}'
+        assert json.loads(requisicao['corpo'])['eventos'][0]['payload'] == {'pedido_id': 7}
+        assert not EntregaWebhook.objects.exists()
+
+    def test_falha_reagenda_com_backoff(self, servidor, entregador):
+        servidor.respostas = [500]
+        AssinaturaWebhook.objects.create(url=servidor.url, segredo='s', eventos=['pedido.criado'])
+        registrar_entregas([_evento('pedido.criado')])
+
+        assert entregador.executar_ciclo() == (0, 1)
+
+        entrega = EntregaWebhook.objects.get()
+        assert entrega.tentativas == 1
+        assert entrega.ultimo_erro == 'HTTP 500'
+        assert entrega.proxima_tentativa_em > timezone.now() + timedelta(seconds=4)
+        # Ainda não venceu: o próximo ciclo não reenvia
+        assert entregador.executar_ciclo() == (0, 0)
+
+        _vencer_entregas()
+        assert entregador.executar_ciclo() == (1, 0)
+        assert len(servidor.requisicoes) == 2
+
+    def test_esgotadas_vao_para_dead_letter(self, servidor, entregador):
+        servidor.respostas = [503, 503, 503]
+        AssinaturaWebhook.objects.create(url=servidor.url, segredo='s', eventos=['pedido.criado'])
+        registrar_entregas([_evento('pedido.criado')])
+
+        for _ in range(3):
+            _vencer_entregas()
+            entregador.executar_ciclo()
+
+        assert not EntregaWebhook.objects.exists()
+        morta = EntregaWebhookMorta.objects.get()
+        assert morta.tentativas == 3
+        assert morta.ultimo_erro == 'HTTP 503'
+
+    def test_endpoint_inacessivel_conta_como_falha(self, entregador):
+        AssinaturaWebhook.objects.create(url='http://127.0.0.1:9/hook', segredo='s', eventos=['pedido.criado'])
+        registrar_entregas([_evento('pedido.criado')])
+
+        assert entregador.executar_ciclo() == (0, 1)
+        assert EntregaWebhook.objects.get().ultimo_erro
+
+    def test_concorrencia_limitada_e_conexoes_reutilizadas(self, servidor, entregador):
+        servidor.atraso = 0.05
+        for i in range(12):
+            assinatura = AssinaturaWebhook.objects.create(url=servidor.url, segredo='s', eventos=['pedido.criado'])
+            EntregaWebhook.objects.create(assinatura=assinatura, eventos=[_evento('pedido.criado', i)])
+
+        assert entregador.executar_ciclo() == (12, 0)
+
+        assert 1 < servidor.pico_concorrencia <= 4
+        # Keep-alive: 12 requisições em no máximo 4 conexões (uma por thread)
+        assert len(servidor.conexoes) <= 4
+
+    def test_eventos_da_mesma_assinatura_vao_em_um_post(self, servidor, entregador, pedido_pendente):
+        assinatura = AssinaturaWebhook.objects.create(
+            url=servidor.url, segredo='s', eventos=['pedido.confirmado', 'pedido.cancelado'],
+        )
+        AlterarStatusPedidoService().executar(pedido_pendente.id, 'confirmado')
+        CancelarPedidoService().executar(pedido_pendente.id, motivo='desistiu')
+        outra = AssinaturaWebhook.objects.create(url=servidor.url, segredo='s', eventos=['pedido.criado'])
+        registrar_entregas([_evento('pedido.criado')])
+        assert EntregaWebhook.objects.filter(assinatura=assinatura).count() == 2
+
+        assert entregador.executar_ciclo() == (2, 0)
+
+        corpos = [json.loads(requisicao['corpo']) for requisicao in servidor.requisicoes]
+        assert sorted([evento['evento'] for evento in corpo['eventos']] for corpo in corpos) == [
+            ['pedido.confirmado', 'pedido.cancelado'], ['pedido.criado'],
+        ]
+        assert outra.entregas.count() == assinatura.entregas.count() == 0
+
+    def test_agrupamento_respeita_eventos_por_entrega(self, servidor, settings):
+        settings.WEBHOOK_EVENTOS_POR_ENTREGA = 2
+        assinatura = AssinaturaWebhook.objects.create(url=servidor.url, segredo='s', eventos=['pedido.criado'])
+        for i in range(3):
+            EntregaWebhook.objects.create(assinatura=assinatura, eventos=[_evento('pedido.criado', i)])
+        entregador = EntregadorWebhooks(concorrencia=2, lote=50)
+
+        try:
+            assert entregador.executar_ciclo() == (2, 0)
+        finally:
+            entregador.encerrar()
+
+        assert sorted(len(json.loads(r['corpo'])['eventos']) for r in servidor.requisicoes) == [1, 2]
+
+    def test_falha_do_grupo_reagenda_uma_entrega_com_todos_os_eventos(self, servidor, entregador):
+        servidor.respostas = [500]
+        assinatura = AssinaturaWebhook.objects.create(url=servidor.url, segredo='s', eventos=['pedido.criado'])
+        EntregaWebhook.objects.create(assinatura=assinatura, eventos=[_evento('pedido.criado', 1)], tentativas=2)
+        EntregaWebhook.objects.create(assinatura=assinatura, eventos=[_evento('pedido.criado', 2)])
+
+        assert entregador.executar_ciclo() == (0, 1)
+
+        entrega = EntregaWebhook.objects.get()
+        assert [evento['payload']['pedido_id'] for evento in entrega.eventos] == [1, 2]
+        assert entrega.tentativas == 1
+
+    def test_comando(self, servidor):
+        AssinaturaWebhook.objects.create(url=servidor.url, segredo='s', eventos=['pedido.criado'])
+        registrar_entregas([_evento('pedido.criado')])
+        saida = StringIO()
+
+        call_command('entregar_webhooks', '--max-ciclos', '1', '--intervalo', '0', stdout=saida)
+
+        assert '1 entrega(s) concluída(s), 0 falha(s)' in saida.getvalue()
+
+
+class TestBackoff:
+    def test_proxima_tentativa_cresce_ate_o_teto(self):
+        agora = timezone.now()
+        for tentativas, teto in ((1, 10), (2, 20), (3, 40), (10, 100)):
+            espera = (calcular_proxima_tentativa(tentativas, 10, 100) - agora).total_seconds()
+            assert teto / 2 - 1 <= espera <= teto + 1
+
+
+class TestLease:
+    def test_lease_derivado_do_pior_caso(self, settings):
+        settings.WEBHOOK_LEASE = 0
+        settings.WEBHOOK_TIMEOUT = 5
+
+        entregador = EntregadorWebhooks(concorrencia=8, lote=50)
+
+        assert calcular_lease_minimo(50, 8, 5) == 7 * 2 * 5 + 10
+        assert entregador.lease == 80
+
+    def test_lease_menor_que_o_pior_caso_e_recusado(self, settings):
+        settings.WEBHOOK_LEASE = 60
+        settings.WEBHOOK_TIMEOUT = 5
+
+        with pytest.raises(ValueError, match='menor que o pior caso'):
+            EntregadorWebhooks(concorrencia=8, lote=50)
+        assert EntregadorWebhooks(concorrencia=8, lote=50, lease=120).lease == 120
+
+
+@pytest.mark.django_db
+class TestEventosDePedido:
+    """Entregas gravadas na transação da operação (outbox), sem passar pelo emissor em memória."""
+
+    def test_alteracao_de_status_gera_entrega(self, pedido_pendente):
+        AssinaturaWebhook.objects.create(url='http://a/hook', segredo='s', eventos=['pedido.confirmado'])
+
+        AlterarStatusPedidoService().executar(pedido_pendente.id, 'confirmado')
+
+        evento, = EntregaWebhook.objects.get().eventos
+        assert evento['evento'] == 'pedido.confirmado'
+        assert evento['payload']['pedido_id'] == pedido_pendente.id
+
+    def test_criacao_e_cancelamento_geram_entregas(self, cliente_ativo, produto_com_estoque):
+        AssinaturaWebhook.objects.create(
+            url='http://a/hook', segredo='s', eventos=['pedido.criado', 'pedido.cancelado'],
+        )
+
+        pedido, _ = CriarPedidoService().executar(
+            cliente_ativo.id, [{'produto_id': produto_com_estoque.id, 'quantidade': 1}], 'webhook-outbox',
+        )
+        CancelarPedidoService().executar(pedido.id, motivo='desistiu')
+
+        eventos = [entrega.eventos[0] for entrega in EntregaWebhook.objects.order_by('id')]
+        assert [evento['evento'] for evento in eventos] == ['pedido.criado', 'pedido.cancelado']
+        assert eventos[1]['payload']['motivo'] == 'desistiu'
+
+    def test_entrega_desfeita_com_a_transacao(self, pedido_pendente):
+        AssinaturaWebhook.objects.create(url='http://a/hook', segredo='s', eventos=['pedido.confirmado'])
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                AlterarStatusPedidoService().executar(pedido_pendente.id, 'confirmado')
+                raise RuntimeError('falha depois da mudança de status')
+
+        assert not EntregaWebhook.objects.exists()
+
+    def test_emissor_cheio_nao_perde_entregas(
+        self, pedido_pendente, settings, monkeypatch, django_capture_on_commit_callbacks,
+    ):
+        settings.EVENTOS_ASSINCRONOS = True
+        monkeypatch.setattr(events, '_emissor', EmissorEventos(sink_log, capacidade=1, em_segundo_plano=False))
+        events.obter_emissor().enfileirar('ocupando', {})
+        AssinaturaWebhook.objects.create(url='http://a/hook', segredo='s', eventos=['pedido.confirmado'])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            AlterarStatusPedidoService().executar(pedido_pendente.id, 'confirmado')
+
+        assert events.obter_emissor().metricas()['descartados'] == 1
+        assert EntregaWebhook.objects.count() == 1
@@ -0,0 +1,56 @@
+import pytest
+
+from benchmarks.bench_micro import (
+    Caso, calibrar, casos_padrao, comparar_com_baseline, estatisticas, executar_casos,
+)
+
+
+class TestHarnessMicrobenchmarks:
+    def test_preparar_fora_da_medicao_e_uma_chamada_por_execucao(self):
+        chamadas, preparos = [], []
+
+        def preparar(numero):
+            preparos.append(numero)
+            return lambda: chamadas.append(1)
+
+        resultados = executar_casos([Caso('caso', preparar)], rodadas=3, tempo_minimo=0)
+
+        assert resultados['caso']['rodadas'] == 3
+        assert resultados['caso']['numero'] == 1
+        # calibração + aquecimento + 3 rodadas
+        assert preparos == [1] * 5
+        assert len(chamadas) == 5
+
+    def test_calibracao_cresce_ate_o_tempo_minimo(self):
+        assert calibrar(Caso('rapido', lambda numero: lambda: None), tempo_minimo=0.01) > 1000
+
+    def test_estatisticas(self):
+        resultado = estatisticas([1.0, 2.0, 3.0, 4.0, 100.0])
+
+        assert resultado['min_us'] == 1.0
+        assert resultado['mediana_us'] == 3.0
+        assert resultado['media_us'] == 22.0
+        assert resultado['iqr_us'] == pytest.approx(50.5)
+
+    def test_comparacao_pela_mediana(self):
+        baseline = {'a': {'mediana_us': 10.0}, 'b': {'mediana_us': 10.0}, 'removido': {'mediana_us': 1.0}}
+        atual = {'a': {'mediana_us': 10.5}, 'b': {'mediana_us': 12.0}, 'novo': {'mediana_us': 1.0}}
+
+        comparacao = comparar_com_baseline(atual, baseline, tolerancia=0.10)
+
+        assert [(nome, regrediu) for nome, *_, regrediu in comparacao] == [('a', False), ('b', True)]
+        assert comparacao[1][3] == pytest.approx(0.2)
+
+
+@pytest.mark.django_db
+class TestCasosPadrao:
+    def test_cada_caso_executa(self):
+        casos = casos_padrao()
+
+        for caso in casos:
+            caso.preparar(2)()
+
+        assert {caso.nome.split('[')[0] for caso in casos} >= {
+            'criar_pedido', 'cancelar_pedido', 'state_machine.validar', 'TransicaoInvalidaError',
+            'PedidoDetailSerializer', 'PedidoListSerializer', 'Pedido._gerar_numero',
+        }
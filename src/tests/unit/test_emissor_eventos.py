@@ -0,0 +1,167 @@
+import threading
+import time
+
+import pytest
+from django.db import transaction
+
+from common import events
+from common.events import BLOQUEAR, DESCARTAR_ANTIGO, DESCARTAR_NOVO, EmissorEventos
+from pedidos.events import EventoPedido, emitir_evento
+
+
+class SinkMemoria:
+    def __init__(self, atraso=0, falhar=False):
+        self.lotes = []
+        self.atraso = atraso
+        self.falhar = falhar
+        self.entregou = threading.Event()
+
+    def __call__(self, lote):
+        time.sleep(self.atraso)
+        if self.falhar:
+            raise ConnectionError('broker indisponível')
+        self.lotes.append(lote)
+        self.entregou.set()
+
+    @property
+    def eventos(self):
+        return [item['evento'] for lote in self.lotes for item in lote]
+
+
+def _emissor(sink, **kwargs):
+    kwargs.setdefault('em_segundo_plano', False)
+    return EmissorEventos(sink, **kwargs)
+
+
+class TestBuffer:
+    def test_flush_entrega_em_lotes(self):
+        sink = SinkMemoria()
+        emissor = _emissor(sink, tamanho_lote=2)
+
+        for i in range(5):
+            emissor.enfileirar(f'evento.{i}', {})
+        emissor.flush()
+
+        assert [len(lote) for lote in sink.lotes] == [2, 2, 1]
+        assert sink.eventos == [f'evento.{i}' for i in range(5)]
+        assert emissor.metricas()['entregues'] == 5
+
+    @pytest.mark.parametrize('politica, esperados', [
+        (DESCARTAR_NOVO, ['evento.0', 'evento.1']),
+        (DESCARTAR_ANTIGO, ['evento.2', 'evento.3']),
+        (BLOQUEAR, ['evento.0', 'evento.1']),
+    ])
+    def test_backpressure(self, politica, esperados):
+        sink = SinkMemoria()
+        emissor = _emissor(sink, capacidade=2, politica=politica, timeout_bloqueio=0.01)
+
+        for i in range(4):
+            emissor.enfileirar(f'evento.{i}', {})
+        emissor.flush()
+
+        assert sink.eventos == esperados
+        assert emissor.metricas()['descartados'] == 2
+
+    def test_politica_invalida(self):
+        with pytest.raises(ValueError):
+            EmissorEventos(SinkMemoria(), politica='ignorar')
+
+    def test_falha_no_sink_e_contada(self):
+        emissor = _emissor(SinkMemoria(falhar=True))
+
+        emissor.enfileirar('evento', {})
+        emissor.flush()
+
+        metricas = emissor.metricas()
+        assert metricas['falhas_sink'] == 1
+        assert metricas['descartados'] == 1
+        assert metricas['entregues'] == 0
+
+
+class TestThreadDeEntrega:
+    def test_enfileirar_nao_espera_o_sink(self):
+        sink = SinkMemoria(atraso=0.3)
+        emissor = EmissorEventos(sink, intervalo_flush=0.01)
+
+        inicio = time.perf_counter()
+        for i in range(20):
+            emissor.enfileirar(f'evento.{i}', {})
+        duracao = time.perf_counter() - inicio
+        emissor.encerrar()
+
+        assert duracao < 0.1
+        assert len(sink.eventos) == 20
+
+    def test_thread_entrega_e_mede_latencia(self):
+        sink = SinkMemoria()
+        emissor = EmissorEventos(sink, intervalo_flush=0.01)
+
+        emissor.enfileirar('evento', {'pedido_id': 1})
+
+        assert sink.entregou.wait(2)
+        emissor.encerrar()
+        metricas = emissor.metricas()
+        assert metricas['entregues'] == 1
+        assert metricas['latencia_ms_max'] >= 0
+        assert sink.lotes[0][0]['payload'] == {'pedido_id': 1}
+        assert 'emitido_em' in sink.lotes[0][0]
+
+    def test_conexoes_fechadas_so_na_thread_do_emissor(self, monkeypatch):
+        threads = []
+        monkeypatch.setattr(events, 'close_old_connections', lambda: threads.append(threading.current_thread().name))
+        sink = SinkMemoria()
+
+        sincrono = _emissor(sink)
+        sincrono.enfileirar('evento', {})
+        sincrono.flush()
+        assert threads == []
+
+        emissor = EmissorEventos(sink, intervalo_flush=0.01)
+        emissor.enfileirar('evento', {})
+        assert sink.entregou.wait(2)
+        emissor.encerrar()
+        assert threads == ['emissor-eventos']
+
+
+@pytest.mark.django_db
+class TestPublicacaoAposCommit:
+    @pytest.fixture
+    def emissor(self, settings, monkeypatch):
+        settings.EVENTOS_ASSINCRONOS = True
+        sink = SinkMemoria()
+        instancia = _emissor(sink)
+        monkeypatch.setattr(events, '_emissor', instancia)
+        return instancia, sink
+
+    def test_evento_so_entra_no_buffer_apos_commit(self, emissor, django_capture_on_commit_callbacks):
+        instancia, sink = emissor
+
+        with django_capture_on_commit_callbacks(execute=True):
+            emitir_evento(EventoPedido.PEDIDO_CANCELADO, {'pedido_id': 1})
+            assert instancia.metricas()['enfileirados'] == 0
+
+        instancia.flush()
+        assert sink.eventos == ['pedido.cancelado']
+
+    def test_evento_de_transacao_desfeita_nao_e_publicado(self, emissor, django_capture_on_commit_callbacks):
+        instancia, _ = emissor
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    emitir_evento(EventoPedido.PEDIDO_CANCELADO, {'pedido_id': 1})
+                    raise RuntimeError('rollback')
+
+        assert callbacks == []
+        assert instancia.metricas()['enfileirados'] == 0
+
+    def test_cancelamento_publica_evento(self, emissor, pedido_pendente, django_capture_on_commit_callbacks):
+        from pedidos.services import CancelarPedidoService
+        instancia, sink = emissor
+
+        with django_capture_on_commit_callbacks(execute=True):
+            CancelarPedidoService().executar(pedido_pendente.id, motivo='desistiu')
+        instancia.flush()
+
+        assert sink.eventos == ['pedido.cancelado']
+        assert sink.lotes[0][0]['payload']['motivo'] == 'desistiu'
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from rest_framework.schemas.inspectors import ViewInspector
+
+from common.comandos import ComandoEnxutoMixin
+from common.inicializacao import agrupar_por_pacote, analisar_importtime, medir_inicializacao
+from common.schemas import AutoSchemaAdiado
+from config.urls import include_adiado
+
+SAIDA_IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     rest_framework.settings
+import time:       900 |       1020 |   rest_framework.views
+import time:      1500 |       2520 | pedidos.views
+Traceback de outro processo não entra
+"""
+
+
+class TestAnaliseImporttime:
+    def test_linhas_com_tempos_e_profundidade(self):
+        assert analisar_importtime(SAIDA_IMPORTTIME) == [
+            ('rest_framework.settings', 120, 120, 2),
+            ('rest_framework.views', 900, 1020, 1),
+            ('pedidos.views', 1500, 2520, 0),
+        ]
+
+    def test_agrupa_tempo_proprio_por_pacote(self):
+        totais = agrupar_por_pacote(analisar_importtime(SAIDA_IMPORTTIME))
+
+        assert totais == {'rest_framework': 1020, 'pedidos': 1500}
+
+
+class TestPerfilEnxuto:
+    def test_comandos_sem_checagens_de_sistema_no_perfil_enxuto(self, settings):
+        comando = type('Comando', (ComandoEnxutoMixin,), {})()
+
+        settings.PERFIL_ENXUTO = True
+        assert comando.requires_system_checks == []
+        settings.PERFIL_ENXUTO = False
+        assert comando.requires_system_checks == '__all__'
+
+    def test_mixin_de_comando_nao_carrega_dependencias(self):
+        # Além do settings do Django, o módulo não importa nada
+        codigo = (
+            'import sys, django.conf; antes = set(sys.modules); import common.comandos; '
+            "print(sorted(set(sys.modules) - antes - {'common', 'common.comandos'}))"
+        )
+        processo = subprocess.run(
+            [sys.executable, '-c', codigo], cwd=settings.BASE_DIR, capture_output=True, text=True,
+            env={**os.environ, 'PYTHONPATH': os.pathsep.join(caminho for caminho in sys.path if caminho)},
+        )
+
+        assert processo.returncode == 0, processo.stderr
+        assert processo.stdout.strip() == '[]'
+
+    def test_include_adiado_so_importa_na_resolucao(self):
+        resolver = include_adiado('docs/', 'modulo_que_nao_existe.urls')
+
+        with pytest.raises(ModuleNotFoundError):
+            resolver.resolve('docs/schema/')
+
+    def test_schema_adiado_vira_autoschema_depois_do_gerador(self, monkeypatch):
+        from drf_spectacular.openapi import AutoSchema
+
+        monkeypatch.delitem(sys.modules, 'drf_spectacular.generators', raising=False)
+        leve = AutoSchemaAdiado()
+        assert isinstance(leve, ViewInspector) and not isinstance(leve, AutoSchema)
+
+        monkeypatch.setitem(sys.modules, 'drf_spectacular.generators', object())
+        estendido = type('ExtendedSchema', (AutoSchemaAdiado,), {'is_excluded': lambda self: True})()
+        assert isinstance(AutoSchemaAdiado(), AutoSchema)
+        assert isinstance(estendido, AutoSchema) and estendido.is_excluded()
+
+
+class TestMedicaoInicializacao:
+    def test_perfil_enxuto_nao_carrega_o_drf_spectacular_na_primeira_requisicao(self):
+        _, padrao = medir_inicializacao('requisicao', enxuto=False)
+        _, enxuto = medir_inicializacao('requisicao', enxuto=True)
+
+        # O -X importtime não registra imports via importlib (autodiscover do admin,
+        # import_string): os módulos abaixo vêm de import direto
+        pesados = {'drf_spectacular.extensions', 'drf_spectacular.views'}
+        assert pesados <= {modulo for modulo, *_ in padrao}
+        assert not pesados & {modulo for modulo, *_ in enxuto}
+
+    def test_relatorio(self, capsys):
+        call_command('relatorio_inicializacao', alvo='setup', perfil='ambos', top=3)
+
+        saida = capsys.readouterr().out
+        assert 'Perfil padrao — alvo setup' in saida
+        assert 'Perfil enxuto — alvo setup' in saida
+        assert 'Módulos não importados no perfil enxuto' in saida
@@ -0,0 +1,155 @@
+import threading
+from contextlib import nullcontext
+
+import pytest
+from django.db import OperationalError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from common import locks
+from common.locks import (
+    ERRO_LOCK_NOWAIT, ERRO_LOCK_WAIT_TIMEOUT, MODO_BLOQUEANTE, MODO_NOWAIT, MODO_TIMEOUT, LockIndisponivelError,
+    com_lock, modo_da_operacao,
+)
+from pedidos.models import Pedido
+from pedidos.repositories import PedidoRepository, ProdutoRepository
+from pedidos.services import CancelarPedidoService
+
+
+class QuerysetContestado:
+    """Simula o erro do MySQL ao avaliar um SELECT ... FOR UPDATE contestado."""
+
+    db = 'default'
+
+    def __init__(self, codigo):
+        self.codigo = codigo
+        self.argumentos = None
+
+    def select_for_update(self, **kwargs):
+        self.argumentos = kwargs
+        return self
+
+    def __iter__(self):
+        raise OperationalError(self.codigo, 'lock indisponível')
+
+
+class TestModoDaOperacao:
+    def test_usa_modo_configurado_ou_padrao(self, settings):
+        settings.LOCK_MODES = {'pedidos.cancelar': MODO_NOWAIT}
+        settings.LOCK_MODE_DEFAULT = MODO_BLOQUEANTE
+
+        assert modo_da_operacao('pedidos.cancelar') == MODO_NOWAIT
+        assert modo_da_operacao('pedidos.criar') == MODO_BLOQUEANTE
+
+    def test_modo_invalido(self, settings):
+        settings.LOCK_MODES = {'pedidos.criar': 'skip'}
+
+        with pytest.raises(ValueError):
+            modo_da_operacao('pedidos.criar')
+
+
+class TestComLock:
+    @pytest.mark.parametrize('modo, codigo', [
+        (MODO_NOWAIT, ERRO_LOCK_NOWAIT), (MODO_TIMEOUT, ERRO_LOCK_WAIT_TIMEOUT),
+    ])
+    def test_contencao_vira_lock_indisponivel(self, modo, codigo, settings, monkeypatch):
+        settings.LOCK_RETRY_AFTER = 2
+        monkeypatch.setattr(locks, '_timeout_de_sessao', lambda using: nullcontext())
+
+        with pytest.raises(LockIndisponivelError) as exc:
+            com_lock(QuerysetContestado(codigo), modo, 'Pedido 1')
+
+        assert exc.value.retry_after == 2
+        assert 'Pedido 1' in str(exc.value)
+
+    def test_nowait_usa_for_update_nowait(self):
+        queryset = QuerysetContestado(ERRO_LOCK_NOWAIT)
+
+        with pytest.raises(LockIndisponivelError):
+            com_lock(queryset, MODO_NOWAIT, 'Pedido 1')
+
+        assert queryset.argumentos == {'nowait': True}
+
+    def test_outros_erros_propagam(self):
+        with pytest.raises(OperationalError):
+            com_lock(QuerysetContestado(2006), MODO_BLOQUEANTE, 'Pedido 1')
+
+    @pytest.mark.django_db
+    def test_timeout_ajusta_e_restaura_sessao_no_mysql(self, pedido_pendente):
+        if connection.vendor != 'mysql':
+            pytest.skip('innodb_lock_wait_timeout requer MySQL')
+
+        with CaptureQueriesContext(connection) as contexto:
+            com_lock(Pedido.objects.filter(id=pedido_pendente.id), MODO_TIMEOUT, 'Pedido')
+
+        sqls = [consulta['sql'] for consulta in contexto.captured_queries]
+        assert 'innodb_lock_wait_timeout' in sqls[0]
+        assert 'FOR UPDATE' in sqls[1]
+        assert 'DEFAULT' in sqls[2]
+
+
+@pytest.mark.django_db
+class TestServicosEViews:
+    def test_servico_usa_modo_da_operacao(self, pedido_pendente, settings, monkeypatch):
+        settings.LOCK_MODES = {'pedidos.cancelar': MODO_NOWAIT, 'pedidos.cancelar.estoque': MODO_TIMEOUT}
+        modos = []
+        obter_pedido, obter_produtos = PedidoRepository.obter_com_lock, ProdutoRepository.obter_por_ids_com_lock
+
+        def espiar_pedido(repositorio, pedido_id, modo_lock):
+            modos.append(('pedido', modo_lock))
+            return obter_pedido(repositorio, pedido_id, modo_lock)
+
+        def espiar_produtos(repositorio, produto_ids, modo_lock):
+            modos.append(('produtos', modo_lock))
+            return obter_produtos(repositorio, produto_ids, modo_lock)
+
+        monkeypatch.setattr(PedidoRepository, 'obter_com_lock', espiar_pedido)
+        monkeypatch.setattr(ProdutoRepository, 'obter_por_ids_com_lock', espiar_produtos)
+
+        CancelarPedidoService().executar(pedido_pendente.id)
+
+        assert modos == [('pedido', MODO_NOWAIT), ('produtos', MODO_TIMEOUT)]
+
+    @pytest.mark.parametrize('metodo, sufixo, dados', [
+        ('patch', 'status/', {'status': 'confirmado'}),
+        ('delete', '', {}),
+    ])
+    def test_contencao_responde_409_com_retry_after(self, api_client, pedido_pendente, monkeypatch, metodo, sufixo, dados):
+        def contestado(repositorio, pedido_id, modo_lock):
+            raise LockIndisponivelError(f'Pedido {pedido_id}', retry_after=3)
+
+        monkeypatch.setattr(PedidoRepository, 'obter_com_lock', contestado)
+
+        response = getattr(api_client, metodo)(
+            f'/api/v1/orders/{pedido_pendente.id}/{sufixo}', dados, format='json'
+        )
+
+        assert response.status_code == 409
+        assert response['Retry-After'] == '3'
+        assert response.json()['retry_after'] == 3
+
+
+@pytest.mark.django_db(transaction=True)
+class TestContencaoReal:
+    def test_nowait_nao_espera_lock_de_outra_transacao(self, pedido_pendente):
+        if connection.vendor != 'mysql':
+            pytest.skip('Requer locks de linha (MySQL)')
+
+        lock_obtido, liberar = threading.Event(), threading.Event()
+
+        def segurar_lock():
+            with transaction.atomic():
+                list(Pedido.objects.select_for_update().filter(id=pedido_pendente.id))
+                lock_obtido.set()
+                liberar.wait(10)
+            connection.close()
+
+        thread = threading.Thread(target=segurar_lock)
+        thread.start()
+        lock_obtido.wait(10)
+        try:
+            with pytest.raises(LockIndisponivelError):
+                with transaction.atomic():
+                    PedidoRepository().obter_com_lock(pedido_pendente.id, MODO_NOWAIT)
+        finally:
+            liberar.set()
+            thread.join()
@@ -0,0 +1,65 @@
+from common.query_plans import (
+    normalizar_sql, classificar_plano, comparar_com_baseline, PROBLEMA_FULL_SCAN, PROBLEMA_FILESORT,
+    PROBLEMA_TEMPORARIA,
+)
+from common.query_plan_scenarios import combinacoes_listagem
+
+
+class TestNormalizarSql:
+    def test_remove_literais(self):
+        sql = "SELECT * FROM pedidos WHERE id = 10 AND status = 'pendente' AND valor_total > 1.50"
+
+        assert normalizar_sql(sql) == 'SELECT * FROM pedidos WHERE id = ? AND status = ? AND valor_total > ?'
+
+    def test_colapsa_listas_in(self):
+        assert normalizar_sql('SELECT 1 FROM produtos WHERE id IN (1, 2, 3)') == \
+            normalizar_sql('SELECT 1 FROM produtos WHERE id IN (4)')
+
+    def test_preserva_identificadores_com_digitos(self):
+        assert 'U0' in normalizar_sql('SELECT U0.id FROM pedidos U0 WHERE U0.id = 3')
+
+
+class TestClassificarPlano:
+    def test_detecta_problemas(self):
+        plano = classificar_plano([
+            {'table': 'pedidos', 'type': 'ALL', 'key': None, 'Extra': 'Using where; Using temporary; Using filesort'},
+            {'table': 'clientes', 'type': 'eq_ref', 'key': 'PRIMARY', 'Extra': None},
+            {'table': None, 'type': None, 'key': None, 'Extra': 'No tables used'},
+        ])
+
+        assert plano['pedidos']['problemas'] == sorted([PROBLEMA_FULL_SCAN, PROBLEMA_FILESORT, PROBLEMA_TEMPORARIA])
+        assert plano['clientes'] == {'tipo': 'eq_ref', 'indice': 'PRIMARY', 'problemas': []}
+        assert len(plano) == 2
+
+
+class TestCompararComBaseline:
+    def _resultado(self, problemas):
+        return {'pedidos.listar': {'SELECT ?': {'pedidos': {'tipo': 'ref', 'indice': 'idx', 'problemas': problemas}}}}
+
+    def test_sem_regressao_quando_problema_ja_aceito(self):
+        baseline = self._resultado([PROBLEMA_FILESORT])
+
+        assert comparar_com_baseline(self._resultado([PROBLEMA_FILESORT]), baseline) == []
+
+    def test_regressao_para_novo_problema(self):
+        baseline = self._resultado([])
+
+        regressoes = comparar_com_baseline(self._resultado([PROBLEMA_FULL_SCAN]), baseline)
+
+        assert len(regressoes) == 1
+        assert regressoes[0]['problemas'] == [PROBLEMA_FULL_SCAN]
+
+    def test_consulta_nova_com_problema_e_regressao(self):
+        assert comparar_com_baseline(self._resultado([PROBLEMA_FULL_SCAN]), {})
+
+
+class TestCombinacoesListagem:
+    def test_gera_todas_as_combinacoes(self):
+        class ViewSetFake:
+            filterset_fields = ['status', 'cliente']
+            ordering_fields = ['created_at']
+
+        combinacoes = list(combinacoes_listagem(ViewSetFake, {'status': 'pendente', 'cliente': 1}))
+
+        assert len(combinacoes) == 4 * 3
+        assert {'status': 'pendente', 'cliente': 1, 'ordering': '-created_at'} in combinacoes
@@ -0,0 +1,77 @@
+import io
+import pytest
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from benchmarks.payloads import pedido_em_memoria
+from common.parsers import ORJSONParser
+from common.renderers import ORJSONRenderer
+from pedidos.serializers import PedidoDetailSerializer, PedidoListSerializer
+
+
+class TestORJSONRenderer:
+    @pytest.mark.parametrize('quantidade_itens', [0, 1, 50])
+    def test_saida_identica_ao_renderer_padrao_no_detalhe(self, quantidade_itens):
+        dados = PedidoDetailSerializer(pedido_em_memoria(quantidade_itens)).data
+
+        assert ORJSONRenderer().render(dados) == JSONRenderer().render(dados)
+
+    def test_saida_identica_ao_renderer_padrao_na_listagem(self):
+        dados = PedidoListSerializer([pedido_em_memoria(pedido_id=i) for i in range(1, 11)], many=True).data
+
+        assert ORJSONRenderer().render(dados) == JSONRenderer().render(dados)
+
+    def test_datetimes_com_fuso(self):
+        dados = {
+            'sp': datetime(2026, 1, 2, 3, 4, 5, 6, tzinfo=ZoneInfo('America/Sao_Paulo')),
+            'utc': datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc),
+        }
+
+        assert ORJSONRenderer().render(dados) == JSONRenderer().render(dados)
+        assert ORJSONRenderer().render(dados) == b'{"sp":"2026-01-02T03:04:05.000006-03:00","utc":"2026-01-02T03:04:05Z"}'
+
+    def test_decimal_preserva_precisao(self):
+        assert ORJSONRenderer().render({'valor': Decimal('1234567890.12')}) == b'{"valor":"1234567890.12"}'
+
+    def test_texto_traduzivel_lazy(self):
+        assert ORJSONRenderer().render({'msg': gettext_lazy('Pedido')}) == '{"msg":"Pedido"}'.encode()
+
+    def test_escapa_separadores_de_linha_unicode(self):
+        dados = {'texto': 'a\u2028b\u2029c'}
+
+        assert ORJSONRenderer().render(dados) == JSONRenderer().render(dados)
+        assert ORJSONRenderer().render(dados) == b'{"texto":"a\\u2028b\\u2029c"}'
+
+    def test_indentacao_usa_renderer_padrao(self):
+        dados = {'a': [1, 2]}
+
+        assert ORJSONRenderer().render(dados, 'application/json; indent=4') == \
+            JSONRenderer().render(dados, 'application/json; indent=4')
+
+    def test_none_retorna_corpo_vazio(self):
+        assert ORJSONRenderer().render(None) == b''
+
+
+class TestORJSONParser:
+    def test_parse_igual_ao_parser_padrao(self):
+        conteudo = JSONRenderer().render(PedidoDetailSerializer(pedido_em_memoria(5)).data)
+
+        assert ORJSONParser().parse(io.BytesIO(conteudo)) == JSONParser().parse(io.BytesIO(conteudo))
+
+    def test_json_invalido_gera_parse_error(self):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"itens": ['))
+
+    def test_rejeita_nan(self):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"valor": NaN}'))
+
+    def test_respeita_encoding_da_requisicao(self):
+        conteudo = '{"nome": "Ação"}'.encode('latin-1')
+
+        assert ORJSONParser().parse(io.BytesIO(conteudo), parser_context={'encoding': 'latin-1'}) == {'nome': 'Ação'}
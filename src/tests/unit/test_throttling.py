@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+import redis
+
+from common import throttling
+from common.throttling import RedisAnonRateThrottle, RedisEndpointRateThrottle, consumir
+from pedidos.views import PedidoViewSet
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+class ScriptContado:
+    """Envolve o script para contar as idas ao Redis."""
+
+    def __init__(self, script):
+        self.script = script
+        self.chamadas = 0
+
+    def __call__(self, *args, **kwargs):
+        self.chamadas += 1
+        return self.script(*args, **kwargs)
+
+
+@pytest.fixture
+def redis_local(monkeypatch):
+    cliente = fakeredis.FakeRedis()
+    script = ScriptContado(cliente.register_script(throttling.SCRIPT_JANELA_DESLIZANTE))
+    monkeypatch.setattr(throttling, '_script', script)
+    return cliente, script
+
+
+def _envelhecer(cliente, chave, segundos):
+    """Desloca os registros da janela para o passado."""
+    for membro, score in cliente.zrange(chave, 0, -1, withscores=True):
+        cliente.zadd(chave, {membro: score - segundos})
+
+
+class TestJanelaDeslizante:
+    def test_libera_ate_o_limite_e_bloqueia_com_espera(self, redis_local):
+        resultados = [consumir('throttle_teste', 3, 60) for _ in range(4)]
+
+        assert [permitido for permitido, _ in resultados] == [True, True, True, False]
+        assert 59 < resultados[-1][1] <= 60
+
+    def test_uma_ida_ao_redis_por_requisicao(self, redis_local):
+        _, script = redis_local
+
+        for _ in range(5):
+            consumir('throttle_teste', 3, 60)
+
+        assert script.chamadas == 5
+
+    def test_janela_desliza(self, redis_local):
+        cliente, _ = redis_local
+        consumir('throttle_teste', 1, 60)
+        assert consumir('throttle_teste', 1, 60)[0] is False
+
+        _envelhecer(cliente, 'throttle_teste', 61)
+
+        assert consumir('throttle_teste', 1, 60)[0] is True
+        assert cliente.zcard('throttle_teste') == 1
+
+    def test_requisicoes_concorrentes_respeitam_o_limite(self, redis_local):
+        permitidos = []
+
+        def requisitar():
+            permitidos.append(consumir('throttle_concorrente', 10, 60)[0])
+
+        threads = [threading.Thread(target=requisitar) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert permitidos.count(True) == 10
+
+    def test_chave_expira_com_a_janela(self, redis_local):
+        cliente, _ = redis_local
+
+        consumir('throttle_teste', 3, 60)
+
+        assert 0 < cliente.ttl('throttle_teste') <= 60
+
+
+class TestThrottlesDRF:
+    def test_redis_indisponivel_libera_requisicao(self, rf, monkeypatch):
+        def falhar(*args, **kwargs):
+            raise redis.ConnectionError('sem redis')
+
+        monkeypatch.setattr(throttling, 'consumir', falhar)
+        monkeypatch.setattr(RedisAnonRateThrottle, 'THROTTLE_RATES', {'anon': '1/minute'})
+        request = rf.get('/')
+        request.user = None
+
+        assert RedisAnonRateThrottle().allow_request(request, None) is True
+
+    @pytest.mark.django_db
+    def test_escopo_por_endpoint_limita_apenas_criacao_de_pedidos(self, api_client, redis_local, monkeypatch):
+        monkeypatch.setattr(PedidoViewSet, 'throttle_classes', [RedisEndpointRateThrottle])
+        monkeypatch.setattr(RedisEndpointRateThrottle, 'THROTTLE_RATES', {'orders-create': '2/minute'})
+
+        criacoes = [api_client.post('/api/v1/orders/', {}, format='json') for _ in range(3)]
+        listagens = [api_client.get('/api/v1/orders/') for _ in range(3)]
+
+        assert [r.status_code for r in criacoes] == [400, 400, 429]
+        assert int(criacoes[-1]['Retry-After']) > 0
+        assert all(r.status_code == 200 for r in listagens)
@@ -0,0 +1,106 @@
+import pytest
+from django.db import OperationalError, transaction
+
+from clientes.models import Cliente
+from common import transactions
+from common.transactions import (
+    ERRO_DEADLOCK, ERRO_LOCK_WAIT_TIMEOUT, TransacaoConcorrenteError, calcular_espera, metricas,
+    transacao_com_retentativa,
+)
+from pedidos.repositories import HistoricoStatusPedidoRepository
+from pedidos.services import CancelarPedidoService
+from pedidos.state_machine import StatusPedido
+
+
+class Falhas:
+    """Levanta o erro informado nas primeiras `vezes` chamadas."""
+
+    def __init__(self, vezes, codigo=ERRO_DEADLOCK):
+        self.vezes = vezes
+        self.codigo = codigo
+        self.chamadas = 0
+
+    def __call__(self):
+        self.chamadas += 1
+        if self.chamadas <= self.vezes:
+            raise OperationalError(self.codigo, 'Deadlock found when trying to get lock')
+
+
+@pytest.fixture(autouse=True)
+def sem_espera(monkeypatch):
+    esperas = []
+    monkeypatch.setattr(transactions.time, 'sleep', esperas.append)
+    metricas.limpar()
+    return esperas
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTransacaoComRetentativa:
+    def test_reexecuta_e_descarta_escritas_da_tentativa_com_falha(self, sem_espera):
+        falhas = Falhas(vezes=2)
+
+        @transacao_com_retentativa(nome='teste')
+        def operacao():
+            Cliente.objects.create(nome='Retentativa', cpf_cnpj=f'{falhas.chamadas:011d}', email='r@teste.com')
+            falhas()
+            return 'ok'
+
+        assert operacao() == 'ok'
+        assert falhas.chamadas == 3
+        assert Cliente.objects.count() == 1
+        assert len(sem_espera) == 2
+        assert metricas.obter()['teste'] == {
+            'execucoes': 1, 'retentativas': 2, 'sucessos_apos_retentativa': 1, 'esgotadas': 0,
+        }
+
+    def test_esgota_tentativas(self, settings):
+        settings.TRANSACTION_RETRY_ATTEMPTS = 3
+        falhas = Falhas(vezes=10, codigo=ERRO_LOCK_WAIT_TIMEOUT)
+
+        with pytest.raises(TransacaoConcorrenteError) as exc:
+            transacao_com_retentativa(falhas, nome='teste')()
+
+        assert falhas.chamadas == 3
+        assert exc.value.codigo == ERRO_LOCK_WAIT_TIMEOUT
+        assert metricas.obter()['teste']['esgotadas'] == 1
+
+    def test_erro_nao_retentavel_propaga(self):
+        falhas = Falhas(vezes=1, codigo=2006)
+
+        with pytest.raises(OperationalError):
+            transacao_com_retentativa(falhas, nome='teste')()
+
+        assert falhas.chamadas == 1
+
+    def test_sem_retentativa_dentro_de_transacao_externa(self):
+        falhas = Falhas(vezes=1)
+
+        with pytest.raises(OperationalError):
+            with transaction.atomic():
+                transacao_com_retentativa(falhas, nome='teste')()
+
+        assert falhas.chamadas == 1
+
+    def test_servico_retenta_em_deadlock(self, pedido_pendente, monkeypatch):
+        criar = HistoricoStatusPedidoRepository.criar
+        falhas = Falhas(vezes=1)
+
+        def criar_com_deadlock(repositorio, **kwargs):
+            falhas()
+            return criar(repositorio, **kwargs)
+
+        monkeypatch.setattr(HistoricoStatusPedidoRepository, 'criar', criar_com_deadlock)
+
+        pedido = CancelarPedidoService().executar(pedido_pendente.id)
+
+        assert pedido.status == StatusPedido.CANCELADO
+        assert pedido.historico_status.count() == 1
+        assert metricas.obter()['CancelarPedidoService']['sucessos_apos_retentativa'] == 1
+
+
+class TestBackoff:
+    def test_espera_limitada_pelo_teto_exponencial(self):
+        for tentativa, teto in ((1, 0.05), (2, 0.1), (3, 0.2), (10, 1.0)):
+            esperas = [calcular_espera(tentativa, 0.05, 1.0) for _ in range(200)]
+            assert all(0 <= espera <= teto for espera in esperas)
+            assert len(set(esperas)) > 1
@@ -0,0 +1,33 @@
+from django.contrib import admin
+from .models import AssinaturaWebhook, EntregaWebhook, EntregaWebhookMorta
+
+
+@admin.register(AssinaturaWebhook)
+class AssinaturaWebhookAdmin(admin.ModelAdmin):
+    list_display = ['id', 'url', 'eventos', 'ativo', 'created_at']
+    list_filter = ['ativo']
+    search_fields = ['url']
+
+
+@admin.register(EntregaWebhook)
+class EntregaWebhookAdmin(admin.ModelAdmin):
+    list_display = ['id', 'assinatura', 'tentativas', 'proxima_tentativa_em', 'ultimo_erro']
+    list_select_related = ['assinatura']
+    readonly_fields = ['assinatura', 'eventos', 'tentativas', 'ultimo_erro', 'created_at', 'updated_at']
+
+
+@admin.register(EntregaWebhookMorta)
+class EntregaWebhookMortaAdmin(admin.ModelAdmin):
+    list_display = ['id', 'assinatura', 'tentativas', 'ultimo_erro', 'created_at']
+    list_select_related = ['assinatura']
+    readonly_fields = ['assinatura', 'eventos', 'tentativas', 'ultimo_erro', 'created_at']
+    actions = ['reenfileirar']
+    
+    @admin.action(description='Reenfileirar entregas selecionadas')
+    def reenfileirar(self, request, queryset):
+        mortas = list(queryset)
+        EntregaWebhook.objects.bulk_create([
+            EntregaWebhook(assinatura_id=morta.assinatura_id, eventos=morta.eventos) for morta in mortas
+        ])
+        queryset.delete()
+        self.message_user(request, f'{len(mortas)} entrega(s) reenfileirada(s)')
@@ -0,0 +1,166 @@
+"""
+Motor de entrega de webhooks.
+
+Cada ciclo reserva um lote de entregas vencidas (SKIP LOCKED + lease), junta as
+de uma mesma assinatura em um único POST, envia as requisições em paralelo (no máximo WEBHOOK_CONCORRENCIA por processo) por um
+pool de conexões keep-alive e registra o resultado: sucesso remove a entrega,
+falha reagenda com backoff exponencial e, esgotadas as tentativas, a entrega
+vai para a dead letter (webhook_dead_letter).
+"""
+import hashlib
+import hmac
+import json
+import logging
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import urllib3
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .repositories import EntregaWebhookRepository
+
+logger = logging.getLogger(__name__)
+
+# Folga do lease sobre o pior caso do envio, para gravar os resultados do lote
+MARGEM_LEASE = 10
+
+
+def assinar(segredo, timestamp, corpo):
+    """HMAC-SHA256 de '<timestamp>.<corpo>' com o segredo da assinatura."""
+    mensagem = f'{timestamp}.'.encode() + corpo
+    return hmac.new(segredo.encode(), mensagem, hashlib.sha256).hexdigest()
+
+
+def calcular_proxima_tentativa(tentativas, base, maximo):
+    """Backoff exponencial com jitter: entre metade e o total de min(maximo, base * 2^(n-1))."""
+    teto = min(maximo, base * 2 ** (tentativas - 1))
+    return timezone.now() + timedelta(seconds=teto / 2 + random.uniform(0, teto / 2))
+
+
+def calcular_lease_minimo(lote, concorrencia, timeout):
+    """
+    Pior caso de um ciclo: ceil(lote / concorrencia) rodadas de envios, cada um
+    esperando até `timeout` para conectar e `timeout` para ler, mais MARGEM_LEASE.
+    Com um lease menor a entrega volta a ficar visível (e é reenviada por outro
+    entregador) antes de o ciclo que a reservou terminar.
+    """
+    return math.ceil(lote / concorrencia) * 2 * timeout + MARGEM_LEASE
+
+
+class ClienteHTTPWebhooks:
+    """Pool de conexões keep-alive compartilhado pelas threads de envio."""
+
+    def __init__(self, tamanho_pool, timeout):
+        self.pool = urllib3.PoolManager(
+            maxsize=tamanho_pool,
+            block=True,
+            retries=False,
+            timeout=urllib3.Timeout(connect=timeout, read=timeout),
+        )
+
+    def enviar(self, entrega):
+        corpo = json.dumps(
+            {'entrega_id': entrega.id, 'eventos': entrega.eventos}, separators=(',', ':'), default=str,
+        ).encode()
+        timestamp = str(int(time.time()))
+        resposta = self.pool.request(
+            'POST',
+            entrega.assinatura.url,
+            body=corpo,
+            headers={
+                'Content-Type': 'application/json',
+                'X-Webhook-Id': str(entrega.id),
+                'X-Webhook-Timestamp': timestamp,
+                'X-Webhook-Signature': f'sha256={assinar(entrega.assinatura.segredo, timestamp, corpo)}',
+            },
+        )
+        return resposta.status
+
+
+class EntregadorWebhooks:
+    def __init__(self, cliente=None, concorrencia=None, lote=None, lease=None, max_tentativas=None,
+                 backoff_base=None, backoff_max=None):
+        self.concorrencia = concorrencia or settings.WEBHOOK_CONCORRENCIA
+        self.cliente = cliente or ClienteHTTPWebhooks(self.concorrencia, settings.WEBHOOK_TIMEOUT)
+        self.lote = lote or settings.WEBHOOK_LOTE
+        self.eventos_por_entrega = settings.WEBHOOK_EVENTOS_POR_ENTREGA
+        # Linhas reservadas no último ciclo (antes de juntar por assinatura)
+        self.reservadas = 0
+        lease_minimo = calcular_lease_minimo(self.lote, self.concorrencia, settings.WEBHOOK_TIMEOUT)
+        self.lease = lease or settings.WEBHOOK_LEASE or lease_minimo
+        if self.lease < lease_minimo:
+            raise ValueError(
+                f'Lease de {self.lease}s é menor que o pior caso de um ciclo ({lease_minimo:g}s para '
+                f'lote={self.lote}, concorrência={self.concorrencia}, timeout={settings.WEBHOOK_TIMEOUT:g}s)'
+            )
+        self.max_tentativas = max_tentativas or settings.WEBHOOK_MAX_TENTATIVAS
+        self.backoff_base = backoff_base if backoff_base is not None else settings.WEBHOOK_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else settings.WEBHOOK_BACKOFF_MAX
+        self.repository = EntregaWebhookRepository()
+        self.executor = ThreadPoolExecutor(max_workers=self.concorrencia, thread_name_prefix='webhook')
+        self.parar = threading.Event()
+
+    def _enviar(self, entrega):
+        """Roda nas threads do executor; só faz HTTP (nada de banco). Retorna o erro ou None."""
+        try:
+            status = self.cliente.enviar(entrega)
+        except Exception as err:
+            return f'{type(err).__name__}: {err}'
+        if 200 <= status < 300:
+            return None
+        return f'HTTP {status}'
+
+    def executar_ciclo(self):
+        """Entrega um lote, um POST por assinatura. Retorna (entregues, falhas)."""
+        entregas, self.reservadas = self.repository.reivindicar_vencidas(
+            self.lote, self.lease, self.eventos_por_entrega,
+        )
+        if not entregas:
+            return 0, 0
+
+        erros = list(self.executor.map(self._enviar, entregas))
+
+        sucessos = [entrega for entrega, erro in zip(entregas, erros) if erro is None]
+        if sucessos:
+            self.repository.registrar_sucessos(sucessos)
+
+        falhas = 0
+        for entrega, erro in zip(entregas, erros):
+            if erro is None:
+                continue
+            falhas += 1
+            if entrega.tentativas + 1 >= self.max_tentativas:
+                logger.warning('Webhook %s descartado após %d tentativas: %s',
+                               entrega.assinatura.url, entrega.tentativas + 1, erro)
+                self.repository.mover_para_dead_letter(entrega, erro)
+            else:
+                self.repository.registrar_falha(
+                    entrega, erro,
+                    calcular_proxima_tentativa(entrega.tentativas + 1, self.backoff_base, self.backoff_max),
+                )
+        return len(sucessos), falhas
+
+    def executar(self, max_ciclos=None, intervalo_ocioso=None):
+        intervalo_ocioso = intervalo_ocioso if intervalo_ocioso is not None else settings.WEBHOOK_INTERVALO
+        ciclos = 0
+        totais = [0, 0]
+        while not self.parar.is_set() and (max_ciclos is None or ciclos < max_ciclos):
+            entregues, falhas = self.executar_ciclo()
+            totais[0] += entregues
+            totais[1] += falhas
+            ciclos += 1
+            if self.reservadas < self.lote:
+                if not connection.in_atomic_block:
+                    connection.close()
+                self.parar.wait(intervalo_ocioso)
+        return tuple(totais)
+
+    def encerrar(self):
+        self.parar.set()
+        self.executor.shutdown(wait=True)
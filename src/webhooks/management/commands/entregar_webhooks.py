@@ -0,0 +1,44 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from common.comandos import ComandoEnxutoMixin
+from webhooks.entrega import EntregadorWebhooks
+
+
+class Command(ComandoEnxutoMixin, BaseCommand):
+    help = (
+        'Worker de entrega de webhooks: envia as entregas vencidas com concorrência limitada, '
+        'reagenda falhas com backoff exponencial e move as esgotadas para a dead letter.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concorrencia', type=int, default=settings.WEBHOOK_CONCORRENCIA,
+                            help='Requisições simultâneas por processo.')
+        parser.add_argument('--lote', type=int, default=settings.WEBHOOK_LOTE,
+                            help='Entregas reservadas por ciclo.')
+        parser.add_argument('--intervalo', type=float, default=settings.WEBHOOK_INTERVALO,
+                            help='Espera (s) quando não há entregas vencidas.')
+        parser.add_argument('--max-ciclos', type=int, default=None, help='Encerra após N ciclos.')
+
+    def handle(self, *args, **options):
+        try:
+            entregador = EntregadorWebhooks(concorrencia=options['concorrencia'], lote=options['lote'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        def encerrar(signum, frame):
+            self.stdout.write('Encerrando após o ciclo atual...')
+            entregador.parar.set()
+
+        signal.signal(signal.SIGTERM, encerrar)
+        signal.signal(signal.SIGINT, encerrar)
+
+        try:
+            entregues, falhas = entregador.executar(
+                max_ciclos=options['max_ciclos'], intervalo_ocioso=options['intervalo'],
+            )
+        finally:
+            entregador.encerrar()
+        self.stdout.write(self.style.SUCCESS(f'{entregues} entrega(s) concluída(s), {falhas} falha(s)'))
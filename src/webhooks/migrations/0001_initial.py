@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssinaturaWebhook',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('url', models.URLField(max_length=500, verbose_name='URL')),
+                ('segredo', models.CharField(help_text='Chave do HMAC-SHA256 enviado em X-Webhook-Signature', max_length=255, verbose_name='Segredo')),
+                ('eventos', models.JSONField(default=list, help_text='Tipos de EventoPedido assinados, p.ex. ["pedido.cancelado"]', verbose_name='Eventos')),
+                ('ativo', models.BooleanField(db_index=True, default=True, verbose_name='Ativo')),
+            ],
+            options={
+                'verbose_name': 'Assinatura de Webhook',
+                'verbose_name_plural': 'Assinaturas de Webhook',
+                'db_table': 'webhook_assinaturas',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EntregaWebhookMorta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('eventos', models.JSONField(verbose_name='Eventos')),
+                ('tentativas', models.PositiveIntegerField(verbose_name='Tentativas')),
+                ('ultimo_erro', models.TextField(blank=True, null=True, verbose_name='Último erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Descartada em')),
+                ('assinatura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entregas_mortas', to='webhooks.assinaturawebhook', verbose_name='Assinatura')),
+            ],
+            options={
+                'verbose_name': 'Entrega de Webhook Descartada',
+                'verbose_name_plural': 'Entregas de Webhook Descartadas',
+                'db_table': 'webhook_dead_letter',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EntregaWebhook',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('eventos', models.JSONField(verbose_name='Eventos')),
+                ('tentativas', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('proxima_tentativa_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próxima tentativa em')),
+                ('ultimo_erro', models.TextField(blank=True, null=True, verbose_name='Último erro')),
+                ('assinatura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entregas', to='webhooks.assinaturawebhook', verbose_name='Assinatura')),
+            ],
+            options={
+                'verbose_name': 'Entrega de Webhook',
+                'verbose_name_plural': 'Entregas de Webhook',
+                'db_table': 'webhook_entregas',
+                'ordering': ['proxima_tentativa_em'],
+                'indexes': [models.Index(fields=['proxima_tentativa_em', 'id'], name='idx_webhook_entrega_proxima')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+from django.db import models
+from django.utils import timezone
+from common.models import TimestampMixin
+
+
+class AssinaturaWebhook(TimestampMixin):
+    url = models.URLField('URL', max_length=500)
+    segredo = models.CharField('Segredo', max_length=255, help_text='Chave do HMAC-SHA256 enviado em X-Webhook-Signature')
+    eventos = models.JSONField('Eventos', default=list, help_text='Tipos de EventoPedido assinados, p.ex. ["pedido.cancelado"]')
+    ativo = models.BooleanField('Ativo', default=True, db_index=True)
+    
+    class Meta:
+        db_table = 'webhook_assinaturas'
+        verbose_name = 'Assinatura de Webhook'
+        verbose_name_plural = 'Assinaturas de Webhook'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f'{self.url} ({", ".join(self.eventos)})'
+    
+    def assina(self, evento):
+        return evento in self.eventos
+
+
+class EntregaWebhook(TimestampMixin):
+    """Lote de eventos pendente de entrega para uma assinatura."""
+    assinatura = models.ForeignKey(AssinaturaWebhook, on_delete=models.CASCADE, related_name='entregas',
+                                   verbose_name='Assinatura'
+    )
+    eventos = models.JSONField('Eventos')
+    tentativas = models.PositiveIntegerField('Tentativas', default=0)
+    proxima_tentativa_em = models.DateTimeField('Próxima tentativa em', default=timezone.now)
+    ultimo_erro = models.TextField('Último erro', blank=True, null=True)
+    
+    class Meta:
+        db_table = 'webhook_entregas'
+        verbose_name = 'Entrega de Webhook'
+        verbose_name_plural = 'Entregas de Webhook'
+        ordering = ['proxima_tentativa_em']
+        indexes = [
+            models.Index(fields=['proxima_tentativa_em', 'id'], name='idx_webhook_entrega_proxima'),
+        ]
+    
+    def __str__(self):
+        return f'Entrega {self.id} -> {self.assinatura.url}'
+
+
+class EntregaWebhookMorta(models.Model):
+    """Dead letter: entregas que esgotaram as tentativas."""
+    assinatura = models.ForeignKey(AssinaturaWebhook, on_delete=models.CASCADE, related_name='entregas_mortas',
+                                   verbose_name='Assinatura'
+    )
+    eventos = models.JSONField('Eventos')
+    tentativas = models.PositiveIntegerField('Tentativas')
+    ultimo_erro = models.TextField('Último erro', blank=True, null=True)
+    created_at = models.DateTimeField('Descartada em', auto_now_add=True, db_index=True)
+    
+    class Meta:
+        db_table = 'webhook_dead_letter'
+        verbose_name = 'Entrega de Webhook Descartada'
+        verbose_name_plural = 'Entregas de Webhook Descartadas'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f'Descartada {self.id} -> {self.assinatura.url}'
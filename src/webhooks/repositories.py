@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AssinaturaWebhook, EntregaWebhook, EntregaWebhookMorta
+
+
+class AssinaturaWebhookRepository:
+    def listar_ativas(self):
+        return list(AssinaturaWebhook.objects.filter(ativo=True))
+
+
+class EntregaWebhookRepository:
+    def criar_em_lote(self, entregas):
+        """Cria [(assinatura, eventos)] em um único INSERT."""
+        return EntregaWebhook.objects.bulk_create([
+            EntregaWebhook(assinatura=assinatura, eventos=eventos)
+            for assinatura, eventos in entregas
+        ])
+    
+    @transaction.atomic
+    def reivindicar_vencidas(self, limite, lease, max_eventos):
+        """
+        Reserva até `limite` entregas vencidas adiando proxima_tentativa_em por
+        `lease` segundos. Outras instâncias pulam as linhas travadas (SKIP LOCKED)
+        e, depois do commit, deixam de vê-las até o lease expirar; o envio HTTP
+        acontece fora da transação.
+
+        As reservadas de uma mesma assinatura viram uma só entrega (um POST), com
+        até `max_eventos` eventos: os eventos vão para a mais antiga e as demais
+        são apagadas. Retorna (entregas, quantidade de linhas reservadas).
+        """
+        agora = timezone.now()
+        reservadas = list(
+            EntregaWebhook.objects
+            .filter(proxima_tentativa_em__lte=agora)
+            .select_related('assinatura')
+            .select_for_update(skip_locked=True, of=('self',))
+            .order_by('proxima_tentativa_em', 'id')[:limite]
+        )
+        if not reservadas:
+            return [], 0
+
+        entregas, abertas, absorvidas = [], {}, []
+        for entrega in reservadas:
+            destino = abertas.get(entrega.assinatura_id)
+            if destino is not None and len(destino.eventos) + len(entrega.eventos) <= max_eventos:
+                destino.eventos = destino.eventos + entrega.eventos
+                # Eventos novos não herdam as tentativas já gastas pelos antigos
+                destino.tentativas = min(destino.tentativas, entrega.tentativas)
+                absorvidas.append(entrega.id)
+                continue
+            abertas[entrega.assinatura_id] = entrega
+            entregas.append(entrega)
+
+        for entrega in entregas:
+            entrega.proxima_tentativa_em = agora + timedelta(seconds=lease)
+        if absorvidas:
+            EntregaWebhook.objects.filter(id__in=absorvidas).delete()
+            EntregaWebhook.objects.bulk_update(entregas, ['eventos', 'tentativas', 'proxima_tentativa_em'])
+        else:
+            EntregaWebhook.objects.filter(id__in=[entrega.id for entrega in entregas]).update(
+                proxima_tentativa_em=agora + timedelta(seconds=lease)
+            )
+        return entregas, len(reservadas)
+    
+    def registrar_sucessos(self, entregas):
+        EntregaWebhook.objects.filter(id__in=[entrega.id for entrega in entregas]).delete()
+    
+    def registrar_falha(self, entrega, erro, proxima_tentativa_em):
+        entrega.tentativas += 1
+        entrega.ultimo_erro = erro
+        entrega.proxima_tentativa_em = proxima_tentativa_em
+        entrega.save(update_fields=['tentativas', 'ultimo_erro', 'proxima_tentativa_em', 'updated_at'])
+        return entrega
+    
+    @transaction.atomic
+    def mover_para_dead_letter(self, entrega, erro):
+        morta = EntregaWebhookMorta.objects.create(
+            assinatura=entrega.assinatura,
+            eventos=entrega.eventos,
+            tentativas=entrega.tentativas + 1,
+            ultimo_erro=erro,
+        )
+        entrega.delete()
+        return morta
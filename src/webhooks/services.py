@@ -0,0 +1,26 @@
+from django.conf import settings
+
+from .repositories import AssinaturaWebhookRepository, EntregaWebhookRepository
+
+
+class RegistrarEntregasService:
+    """
+    Transforma um lote de eventos em entregas: uma por assinatura ativa que
+    assina algum dos eventos, com até WEBHOOK_EVENTOS_POR_ENTREGA eventos cada.
+    """
+    
+    def __init__(self):
+        self.assinatura_repository = AssinaturaWebhookRepository()
+        self.entrega_repository = EntregaWebhookRepository()
+    
+    def executar(self, lote):
+        tamanho = settings.WEBHOOK_EVENTOS_POR_ENTREGA
+        entregas = []
+        for assinatura in self.assinatura_repository.listar_ativas():
+            eventos = [evento for evento in lote if assinatura.assina(evento['evento'])]
+            for inicio in range(0, len(eventos), tamanho):
+                entregas.append((assinatura, eventos[inicio:inicio + tamanho]))
+        
+        if not entregas:
+            return []
+        return self.entrega_repository.criar_em_lote(entregas)